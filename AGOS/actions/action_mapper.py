@@ -1,112 +1,317 @@
-from AGOS.gestures.gesture_labels import Gestures
 from AGOS.actions.mouse_control import MouseControl
 from AGOS.actions.system_control import SystemControl
+from AGOS.actions.dispatcher import ActionDispatcher
+from AGOS.actions.backends import make_backend
+from AGOS.actions.bindings import parse_bindings, read_bindings, EDGE, HELD
 from AGOS.config.settings import Settings
+from AGOS.utils import tracing
+from AGOS.utils.logger import log
+import math
+import os
 import time
 
-class ActionMapper:
+# Hand roles (see Settings.HAND_ROLES)
+ROLE_ALL = "all"
+ROLE_POINTER = "pointer"
+ROLE_SYSTEM = "system"
+
+INDEX_FINGER_TIP = 8
+
+class HandActions:
+    """
+    What one hand is currently doing: its active binding and the repeat / cooldown timers.
+    """
     def __init__(self):
-        self.mouse = MouseControl()
-        self.system = SystemControl()
-        self.prev_scroll_y = None
-        
-    def execute(self, gesture, landmarks, gesture_state):
+        self.binding = None      # Binding of the gesture being held, None if unbound
+        self.since = 0.0         # When that binding started
+        self.last_repeat = 0.0   # Last HELD repeat
+        self.last_fired = {}     # Binding.key -> time it last fired (per-action cooldowns)
+        self.missed = 0          # Consecutive frames the hand wasn't seen
+
+
+class ActionMapper:
+    """
+    Turns confirmed gestures into input through a dispatch table compiled from
+    Settings.GESTURE_BINDINGS (or BINDINGS_FILE, which is reloaded when it changes).
+
+    Per frame and hand this is one dict lookup plus the binding's handler. When a
+    hand's gesture changes, the old binding ends (releasing a drag, resetting the
+    scroll anchor) and the new one starts. Cooldowns are kept per hand and action,
+    so e.g. clicking doesn't delay volume changes. Motions (swipes, circles, flicks)
+    are one-shot events fired by trigger() next to the held gesture's binding.
+    """
+    def __init__(self, backend=None, threaded=None, clock=time.perf_counter, bindings=None):
+        """
+        backend: InputBackend to drive (defaults to Settings.INPUT_BACKEND)
+        threaded: dispatch input from a worker thread instead of the caller's (default Settings.ASYNC_INPUT)
+        clock: time source for cooldowns and the dispatcher's rate limit
+            (used when execute() gets no timestamp)
+        bindings: {gesture name: binding} spec (defaults to BINDINGS_FILE / GESTURE_BINDINGS)
+        """
+        if backend is None:
+            backend = make_backend(Settings.INPUT_BACKEND)
+        self.clock = clock
+        if threaded is None:
+            threaded = Settings.ASYNC_INPUT
+        self.dispatcher = ActionDispatcher(backend, threaded, clock=clock)
+        self.mouse = MouseControl(self.dispatcher)
+        self.system = SystemControl(self.dispatcher)
+        self.prev_scroll_y = {} # Scroll anchor per hand id
+        self.drag_anchor = {}   # Tip position where a pinch started, per hand id (None once dragging)
+        self.hands = {}         # hand id -> HandActions
+
+        # action name -> (start, hold, end); each is called with (hand_id, landmarks, timestamp, binding)
+        self.handlers = {
+            "move_cursor": (self._move_cursor, self._move_cursor, None),
+            "scroll": (self._scroll_start, self._scroll, self._scroll_end),
+            "drag": (self._drag_start, self._drag, self._drag_end),
+        }
+        self.discrete = {
+            "click": lambda: self.mouse.click(),
+            "volume_up": lambda: self.system.volume_up(),
+            "volume_down": lambda: self.system.volume_down(),
+            "lock_screen": lambda: self.system.lock_screen(),
+            "tab_left": lambda: self.system.switch_tab_left(),
+            "tab_right": lambda: self.system.switch_tab_right(),
+            "press": lambda *keys: self.dispatcher.submit("press", *keys),
+            "hotkey": lambda *keys: self.dispatcher.submit("hotkey", *keys),
+        }
+
+        self.bindings_file = Settings.BINDINGS_FILE if bindings is None else None
+        self._bindings_mtime = None
+        self._next_poll = 0.0
+        self._reload_requested = False
+        self.table = {}
+        self.load_bindings(bindings)
+
+    def close(self):
+        self.release_all()
+        self.dispatcher.close()
+
+    def load_bindings(self, spec=None):
+        """
+        Compiles bindings into the dispatch table and swaps it in. Hands in the middle of
+        a gesture are released first, so a drag never outlives its binding.
+        spec: {gesture name: binding} (defaults to BINDINGS_FILE, else GESTURE_BINDINGS)
+        Raises:
+            ValueError if the bindings are invalid (the current table is kept)
         """
-        Executes action based on gesture.
+        if spec is None:
+            if self.bindings_file:
+                self._bindings_mtime = os.path.getmtime(self.bindings_file)
+                spec = read_bindings(self.bindings_file)
+            else:
+                spec = Settings.GESTURE_BINDINGS
+        table = parse_bindings(spec)
+        for binding in table.values():
+            if binding.mode in (EDGE, HELD):
+                binding.start = self._fire
+                binding.hold = self._repeat if binding.mode == HELD else None
+            else:
+                binding.start, binding.hold, binding.end = self.handlers[binding.action]
+        self.release_all()
+        self.table = table
+        return table
+
+    def poll_bindings(self):
+        """
+        Reloads BINDINGS_FILE if it changed (checked at most every BINDINGS_RELOAD_INTERVAL_S).
+        A broken file is logged and the current bindings stay active.
+        """
+        if not self.bindings_file:
+            return False
+        now = time.monotonic()
+        if now < self._next_poll:
+            return False
+        self._next_poll = now + Settings.BINDINGS_RELOAD_INTERVAL_S
+        try:
+            if os.path.getmtime(self.bindings_file) == self._bindings_mtime:
+                return False
+            self.load_bindings()
+        except (OSError, ValueError) as e:
+            log.error(f"Keeping current gesture bindings: {e}")
+            return False
+        log.info(f"Reloaded {len(self.table)} gesture bindings from {self.bindings_file}")
+        return True
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py): schedules a bindings reload when they
+        changed and passes the rest on to the dispatcher and cursor control. The reload
+        happens in the next end_frame(), on the thread that executes gestures.
+        """
+        # Bindings bake in the default cooldown when they are compiled
+        if any(key in changes for key in ("GESTURE_BINDINGS", "BINDINGS_FILE", "ACTION_COOLDOWN_MS")):
+            self._reload_requested = True
+        self.dispatcher.configure(changes)
+        self.mouse.configure(changes)
+
+    @staticmethod
+    def role_for(handedness, hand_count=1):
+        """
+        Role of a hand given its handedness label and how many hands are visible.
+        """
+        if hand_count <= 1 and Settings.SINGLE_HAND_CONTROLS_ALL:
+            return ROLE_ALL
+        return Settings.HAND_ROLES.get(handedness, ROLE_ALL)
+
+    @staticmethod
+    def is_allowed(binding, role):
+        return role == ROLE_ALL or binding.role == "any" or binding.role == role
+
+    @tracing.traced("mapper.execute")
+    def execute(self, gesture, landmarks, hand_id=0, role=ROLE_ALL, timestamp=None):
+        """
+        Runs the binding of a hand's gesture for this frame.
         gesture: Confirmed Gesture enum
-        landmarks: MediaPipe landmarks
-        gesture_state: GestureState object (for cooldowns)
-        """
-        
-        # 1. Handle Navigation/System Swipes (High Priority, defined by dynamic state)
-        # Check for swipes explicitly if passed or handled via separate channel? 
-        # In main loop, we might check for swipes first. 
-        # But here, let's assume 'gesture' accounts for static, and we check swipes if 'gesture' is IDLE or OPEN?
-        # Actually user spec: "Swipe L/R -> Switch tabs".
-        # If 'gesture' argument can be SWIPE, handle it.
-        
-        if gesture == Gestures.SWIPE_RIGHT:
-            if not gesture_state.is_cooldown_active():
-                # Map Swipe Right -> Next Tab
-                self.system.switch_tab_right()
-                gesture_state.trigger_action()
+        landmarks: (21, 3) landmark array of the hand
+        hand_id: stable id of the hand (see HandRegistry)
+        role: ROLE_ALL / ROLE_POINTER / ROLE_SYSTEM, limits which bindings act
+        timestamp: capture time of the landmarks in seconds (drives cooldowns and cursor smoothing)
+        """
+        now = self.clock() if timestamp is None else timestamp
+        binding = self.table.get(gesture)
+        if binding is not None and not self.is_allowed(binding, role):
+            binding = None
+
+        hand = self.hands.get(hand_id)
+        if hand is None:
+            hand = self.hands[hand_id] = HandActions()
+        hand.missed = 0
+
+        if binding is hand.binding:
+            if binding is not None and binding.hold is not None:
+                binding.hold(hand_id, landmarks, now, binding)
             return
-            
-        if gesture == Gestures.SWIPE_LEFT:
-            if not gesture_state.is_cooldown_active():
-                self.system.switch_tab_left()
-                gesture_state.trigger_action()
+
+        self._end(hand_id, hand, landmarks, now)
+        hand.binding = binding
+        hand.since = hand.last_repeat = now
+        if binding is not None:
+            binding.start(hand_id, landmarks, now, binding)
+
+    @tracing.traced("mapper.trigger")
+    def trigger(self, gesture, landmarks, hand_id=0, role=ROLE_ALL, timestamp=None):
+        """
+        Fires the binding of a motion (swipe, circle, flick) completed on this frame.
+        The hand's held gesture keeps its binding, so e.g. a swipe during a drag
+        neither releases it nor clicks again when the pinch is seen next.
+        Arguments as in execute().
+        """
+        binding = self.table.get(gesture)
+        if binding is None or binding.mode not in (EDGE, HELD) or not self.is_allowed(binding, role):
             return
-            
-        # If no landmarks (e.g. swipe detected but lost hand?), return
-        if not landmarks:
+        if hand_id not in self.hands:
+            self.hands[hand_id] = HandActions()
+        self._fire(hand_id, landmarks, self.clock() if timestamp is None else timestamp, binding)
+
+    def end_frame(self, hand_ids, timestamp=None):
+        """
+        Call once per frame with the ids of the hands execute() saw. A hand missing for
+        more than HAND_LOST_FRAMES frames has its gesture ended (e.g. a drag released).
+        Also picks up changes to BINDINGS_FILE.
+        """
+        for hand_id in [h for h in self.hands if h not in hand_ids]:
+            hand = self.hands[hand_id]
+            hand.missed += 1
+            if hand.missed > Settings.HAND_LOST_FRAMES:
+                self._end(hand_id, hand, None, self.clock() if timestamp is None else timestamp)
+                del self.hands[hand_id]
+        if self._reload_requested:
+            self._reload_requested = False
+            self.bindings_file = Settings.BINDINGS_FILE
+            try:
+                self.load_bindings()
+                log.info(f"Loaded {len(self.table)} gesture bindings")
+            except (OSError, ValueError) as e:
+                log.error(f"Keeping current gesture bindings: {e}")
+        self.poll_bindings()
+
+    def release_all(self):
+        """
+        Ends every active gesture (pausing control, reloading bindings, shutdown).
+        """
+        now = self.clock()
+        for hand_id, hand in self.hands.items():
+            self._end(hand_id, hand, None, now)
+
+    def _end(self, hand_id, hand, landmarks, timestamp):
+        binding = hand.binding
+        hand.binding = None
+        if binding is not None and binding.end is not None:
+            binding.end(hand_id, landmarks, timestamp, binding)
+
+    # --- Discrete actions ---
+
+    def _fire(self, hand_id, landmarks, timestamp, binding):
+        hand = self.hands[hand_id]
+        last = hand.last_fired.get(binding.key)
+        if last is not None and timestamp - last < binding.cooldown_s:
             return
+        hand.last_fired[binding.key] = timestamp
+        self.discrete[binding.action](*binding.args)
 
-        # 2. Continuous Actions (Mouse, Scroll)
-        
-        if gesture == Gestures.INDEX_FINGER:
-            # Move Mouse
-            # Use Index Finger Tip (8)
-            tip = landmarks.landmark[8]
-            self.mouse.move(tip.x, tip.y)
-            self.prev_scroll_y = None # Reset scroll
-            
-        elif gesture == Gestures.TWO_FINGERS:
-            # Scroll
-            # Use Index Tip y or average of Index+Middle
-            tip_y = landmarks.landmark[8].y
-            
-            if self.prev_scroll_y is not None:
-                dy = self.prev_scroll_y - tip_y # Up movement -> Scroll Up?
-                if abs(dy) > 0.01: # Noise threshold
-                    self.mouse.scroll(dy)
-            
-            self.prev_scroll_y = tip_y
-            
-        elif gesture == Gestures.PINCH:
-            # Click
-            # Using cooldown to prevent double clicks
-            if not gesture_state.is_cooldown_active():
-                self.mouse.click()
-                gesture_state.trigger_action()
-            # Also allow movement while pinching? Drag and drop?
-            # User: "Click: Triggered only on confirmed pinch". 
-            # Doesn't explicitly say Drag. We'll just click.
-            # To support Drag, we'd mouseDown on entry, mouseMove, mouseUp on exit.
-            # Simplify for now: Click once.
-            
-            # Optional: Move while pinching (Drag)?
-            if gesture == Gestures.PINCH:
-                tip = landmarks.landmark[8]
-                self.mouse.move(tip.x, tip.y)
-        
-        else:
-            self.prev_scroll_y = None # Reset scroll anchor
-
-        # 3. Discrete Actions (System)
-        
-        if gesture == Gestures.FIST:
-            if not gesture_state.is_cooldown_active():
-                self.system.lock_screen()
-                gesture_state.trigger_action()
-                
-        elif gesture == Gestures.THUMBS_UP:
-             # Volume is continuous or discrete?
-             # "Thumbs Up -> Volume Up". Usually continuous if held.
-             # We'll allow it every frame or throttle it?
-             # Let's throttle slightly less than full cooldown, or standard cooldown.
-             # If handled every frame, volume zooms up. 
-             # Let's use a shorter cooldown or frame skip.
-             # Actually, simpler: trigger once per Cooldown.
-            if not gesture_state.is_cooldown_active():
-                self.system.volume_up()
-                # Short cooldown for volume?
-                # gesture_state.trigger_action() # Uses 500ms default. Too slow for volume?
-                # Hack: Manually set last_action time to allow 100ms?
-                # Or just let it be slow and steady. 
-                gesture_state.trigger_action()
-
-        elif gesture == Gestures.THUMBS_DOWN:
-            if not gesture_state.is_cooldown_active():
-                self.system.volume_down()
-                gesture_state.trigger_action()
+    def _repeat(self, hand_id, landmarks, timestamp, binding):
+        hand = self.hands[hand_id]
+        held = timestamp - hand.since
+        if held >= binding.delay_s and timestamp - hand.last_repeat >= binding.repeat_s:
+            hand.last_repeat = timestamp
+            # Repeats run at repeat_ms; the cooldown only separates distinct activations
+            hand.last_fired[binding.key] = timestamp
+            self.discrete[binding.action](*binding.args)
+
+    # --- Pointer actions ---
+
+    def _move_cursor(self, hand_id, landmarks, timestamp, binding):
+        if landmarks is None:
+            return
+        tip = landmarks[INDEX_FINGER_TIP]
+        self.mouse.move(tip[0], tip[1], timestamp)
+
+    def _scroll_start(self, hand_id, landmarks, timestamp, binding):
+        if landmarks is not None:
+            self.prev_scroll_y[hand_id] = float(landmarks[INDEX_FINGER_TIP, 1])
+
+    def _scroll(self, hand_id, landmarks, timestamp, binding):
+        if landmarks is None:
+            return
+        tip_y = float(landmarks[INDEX_FINGER_TIP, 1])
+        prev_y = self.prev_scroll_y.get(hand_id)
+        if prev_y is not None:
+            dy = prev_y - tip_y # Up movement -> Scroll Up
+            if abs(dy) > 0.01: # Noise threshold
+                self.mouse.scroll(dy)
+        self.prev_scroll_y[hand_id] = tip_y
+
+    def _scroll_end(self, hand_id, landmarks, timestamp, binding):
+        self.prev_scroll_y.pop(hand_id, None)
+
+    def _drag_start(self, hand_id, landmarks, timestamp, binding):
+        # The tip shifts as the fingers close, so nothing is pressed until it really moves
+        if landmarks is not None:
+            self.drag_anchor[hand_id] = (float(landmarks[INDEX_FINGER_TIP, 0]), float(landmarks[INDEX_FINGER_TIP, 1]))
+
+    def _drag(self, hand_id, landmarks, timestamp, binding):
+        if landmarks is None:
+            return
+        if hand_id not in self.drag_anchor:
+            self._drag_start(hand_id, landmarks, timestamp, binding)
+            return
+        anchor = self.drag_anchor[hand_id]
+        if anchor is not None:
+            tip = landmarks[INDEX_FINGER_TIP]
+            if math.hypot(tip[0] - anchor[0], tip[1] - anchor[1]) < Settings.DRAG_START_DIST:
+                return
+            # Press where the cursor is, then follow the fingers
+            self.mouse.press()
+            self.drag_anchor[hand_id] = None
+        self._move_cursor(hand_id, landmarks, timestamp, binding)
+
+    def _drag_end(self, hand_id, landmarks, timestamp, binding):
+        if hand_id not in self.drag_anchor:
+            return
+        if self.drag_anchor.pop(hand_id) is None:
+            self.mouse.release()
+        elif landmarks is not None:
+            # Let go without moving: an ordinary click (not when the hand was lost or control paused)
+            self.mouse.click()
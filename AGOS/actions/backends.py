@@ -0,0 +1,149 @@
+import time
+
+class InputBackend:
+    """
+    Something that can inject OS input. ActionDispatcher calls these from its worker thread.
+    """
+    def screen_size(self):
+        raise NotImplementedError
+
+    def move_to(self, x, y):
+        raise NotImplementedError
+
+    def click(self):
+        raise NotImplementedError
+
+    def mouse_down(self):
+        raise NotImplementedError
+
+    def mouse_up(self):
+        raise NotImplementedError
+
+    def scroll(self, amount):
+        raise NotImplementedError
+
+    def press(self, key):
+        raise NotImplementedError
+
+    def hotkey(self, *keys):
+        raise NotImplementedError
+
+
+class PyAutoGuiBackend(InputBackend):
+    def __init__(self):
+        # Imported here so headless runs (tests, replays) don't need a display
+        import pyautogui
+        self.pyautogui = pyautogui
+        pyautogui.FAILSAFE = False # We handle safety manually
+        # pyautogui sleeps PAUSE seconds after every call (0.1 s by default); the
+        # dispatcher already rate-limits, so don't stall the worker on top of that
+        pyautogui.PAUSE = 0
+
+    def screen_size(self):
+        return self.pyautogui.size()
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def click(self):
+        self.pyautogui.click()
+
+    def mouse_down(self):
+        self.pyautogui.mouseDown()
+
+    def mouse_up(self):
+        self.pyautogui.mouseUp()
+
+    def scroll(self, amount):
+        self.pyautogui.scroll(amount)
+
+    def press(self, key):
+        self.pyautogui.press(key)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+
+class NullBackend(InputBackend):
+    """
+    Swallows all input. For benchmarks and running without control of the desktop.
+    """
+    def __init__(self, width=1920, height=1080):
+        self.width = width
+        self.height = height
+
+    def screen_size(self):
+        return self.width, self.height
+
+    def move_to(self, x, y):
+        pass
+
+    def click(self):
+        pass
+
+    def mouse_down(self):
+        pass
+
+    def mouse_up(self):
+        pass
+
+    def scroll(self, amount):
+        pass
+
+    def press(self, key):
+        pass
+
+    def hotkey(self, *keys):
+        pass
+
+
+class RecordingBackend(NullBackend):
+    """
+    Records every call as (clock time, method, args). For tests and replays.
+    """
+    def __init__(self, width=1920, height=1080, clock=time.perf_counter):
+        super().__init__(width, height)
+        self.clock = clock
+        self.calls = []
+
+    def _record(self, name, *args):
+        self.calls.append((self.clock(), name, args))
+
+    def move_to(self, x, y):
+        self._record("move_to", x, y)
+
+    def click(self):
+        self._record("click")
+
+    def mouse_down(self):
+        self._record("mouse_down")
+
+    def mouse_up(self):
+        self._record("mouse_up")
+
+    def scroll(self, amount):
+        self._record("scroll", amount)
+
+    def press(self, key):
+        self._record("press", key)
+
+    def hotkey(self, *keys):
+        self._record("hotkey", *keys)
+
+    def actions(self, include_moves=False):
+        """
+        Recorded (method, args) pairs, optionally without cursor moves.
+        """
+        return [(name, args) for _, name, args in self.calls if include_moves or name != "move_to"]
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGuiBackend,
+    "null": NullBackend,
+    "recording": RecordingBackend,
+}
+
+def make_backend(name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown input backend {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
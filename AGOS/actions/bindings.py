@@ -0,0 +1,133 @@
+import json
+from AGOS.gestures.gesture_labels import Gestures, MOTION_GESTURES
+from AGOS.config.settings import Settings
+
+# Trigger modes
+EDGE = "edge"                    # Once when the gesture starts
+HELD = "held"                    # When it starts, then every repeat_ms while it is held
+CONTINUOUS = "continuous"        # Every frame while held (cursor, scroll)
+PRESS_RELEASE = "press_release"  # Press when it starts, update while held, release when it ends
+
+# Roles a binding can belong to (see Settings.HAND_ROLES); "any" works for both hands
+BINDING_ROLES = ("pointer", "system", "any")
+
+# Action name -> (allowed modes, first one is the default; default role; number of args)
+# args: None = no arguments, "keys" = one or more key names
+ACTIONS = {
+    "move_cursor": ((CONTINUOUS,), "pointer", None),
+    "scroll": ((CONTINUOUS,), "pointer", None),
+    "drag": ((PRESS_RELEASE,), "pointer", None),
+    "click": ((EDGE, HELD), "pointer", None),
+    "volume_up": ((EDGE, HELD), "system", None),
+    "volume_down": ((EDGE, HELD), "system", None),
+    "lock_screen": ((EDGE, HELD), "system", None),
+    "tab_left": ((EDGE, HELD), "system", None),
+    "tab_right": ((EDGE, HELD), "system", None),
+    "press": ((EDGE, HELD), "system", "keys"),
+    "hotkey": ((EDGE, HELD), "system", "keys"),
+}
+
+BINDING_KEYS = {"action", "mode", "role", "args", "cooldown_ms", "repeat_ms", "delay_ms"}
+
+class Binding:
+    """
+    One compiled gesture -> action mapping. Times are in seconds.
+    start / hold / end are filled in by ActionMapper when it compiles its dispatch table.
+    """
+    def __init__(self, gesture, action, mode, role, args=(), cooldown_ms=None, repeat_ms=None, delay_ms=None):
+        """
+        gesture: Gestures member that triggers the action
+        action: key of ACTIONS
+        mode: EDGE, HELD, CONTINUOUS or PRESS_RELEASE
+        role: "pointer", "system" or "any"
+        args: extra arguments for the action (key names for press / hotkey)
+        cooldown_ms: minimum time between two activations on the same hand
+            (default Settings.ACTION_COOLDOWN_MS)
+        repeat_ms: HELD only, interval between repeats (default: the cooldown)
+        delay_ms: HELD only, wait before the first repeat (default: repeat_ms)
+        """
+        self.gesture = gesture
+        self.action = action
+        self.mode = mode
+        self.role = role
+        self.args = tuple(args)
+        self.cooldown_s = (Settings.ACTION_COOLDOWN_MS if cooldown_ms is None else cooldown_ms) / 1000.0
+        self.repeat_s = self.cooldown_s if repeat_ms is None else repeat_ms / 1000.0
+        self.delay_s = self.repeat_s if delay_ms is None else delay_ms / 1000.0
+        self.key = (action, self.args)   # Cooldowns are per action, not per gesture
+        self.start = self.hold = self.end = None
+
+    def __repr__(self):
+        return f"Binding({self.gesture.name} -> {self.action}{list(self.args) or ''}, {self.mode})"
+
+
+def parse_bindings(spec):
+    """
+    Validates and compiles a {gesture name: {"action": ..., ...}} mapping.
+    Every problem is reported at once, so a broken config file can be fixed in one go.
+    Returns:
+        {Gestures: Binding}
+    Raises:
+        ValueError listing every invalid entry
+    """
+    bindings, problems = {}, []
+    for name, entry in spec.items():
+        if name not in Gestures.__members__:
+            problems.append(f"{name}: unknown gesture")
+            continue
+        if isinstance(entry, str):
+            entry = {"action": entry}
+        if not isinstance(entry, dict):
+            problems.append(f"{name}: expected an action name or an object")
+            continue
+        unknown = set(entry) - BINDING_KEYS
+        if unknown:
+            problems.append(f"{name}: unknown keys {sorted(unknown)}")
+        action = entry.get("action")
+        if not isinstance(action, str) or action not in ACTIONS:
+            problems.append(f"{name}: unknown action {action!r}, expected one of {sorted(ACTIONS)}")
+            continue
+
+        before = len(problems)
+        modes, default_role, arg_kind = ACTIONS[action]
+        mode = entry.get("mode", modes[0])
+        role = entry.get("role", default_role)
+        args = entry.get("args", [])
+        if isinstance(args, str):
+            args = [args]
+        if mode not in modes:
+            problems.append(f"{name}: {action} can't use mode {mode!r}, expected one of {list(modes)}")
+        elif Gestures[name] in MOTION_GESTURES and mode not in (EDGE, HELD):
+            problems.append(f"{name}: a motion lasts one frame, {action} needs a held gesture")
+        if role not in BINDING_ROLES:
+            problems.append(f"{name}: unknown role {role!r}, expected one of {list(BINDING_ROLES)}")
+        if arg_kind is None and args:
+            problems.append(f"{name}: {action} takes no args")
+        elif arg_kind == "keys" and (not args or not all(isinstance(a, str) for a in args)):
+            problems.append(f"{name}: {action} needs args with one or more key names")
+        for key in ("cooldown_ms", "repeat_ms", "delay_ms"):
+            value = entry.get(key)
+            if value is not None and (not isinstance(value, (int, float)) or value < 0):
+                problems.append(f"{name}: {key} must be a number >= 0")
+        if len(problems) > before:
+            continue
+
+        binding = Binding(Gestures[name], action, mode, role, args,
+                          entry.get("cooldown_ms"), entry.get("repeat_ms"), entry.get("delay_ms"))
+        if binding.mode == HELD and binding.repeat_s <= 0:
+            problems.append(f"{name}: held bindings need repeat_ms (or cooldown_ms) > 0")
+        bindings[binding.gesture] = binding
+
+    if problems:
+        raise ValueError("Invalid gesture bindings:\n  " + "\n  ".join(problems))
+    return bindings
+
+def read_bindings(path):
+    """
+    Loads a bindings file: a JSON object in the same format as Settings.GESTURE_BINDINGS.
+    """
+    with open(path) as f:
+        spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError(f"{path}: expected a JSON object of gesture name -> binding")
+    return spec
@@ -0,0 +1,178 @@
+import time
+import threading
+from collections import deque
+from AGOS.config.settings import Settings
+from AGOS.utils.logger import log
+from AGOS.utils import tracing
+
+class ActionDispatcher:
+    """
+    Executes input intents on a worker thread so OS input never stalls the vision loop.
+
+    - Cursor moves coalesce: only the newest pending position is sent.
+    - Scroll amounts coalesce by summing.
+    - Discrete actions (click, press, hotkey...) run in order, but an identical
+      action within `min_interval_ms` of the last one is dropped.
+    With threaded=False every intent runs immediately on the caller's thread
+    (deterministic, for replays and tests).
+    """
+    def __init__(self, backend, threaded=True, min_interval_ms=None, max_pending=None, clock=time.perf_counter):
+        """
+        backend: InputBackend doing the actual injection
+        threaded: run a worker thread (False = execute synchronously)
+        min_interval_ms: rate limit for repeats of the same discrete action (default Settings.INPUT_MIN_INTERVAL_MS)
+        max_pending: discrete actions allowed to wait; beyond that new ones are dropped
+            (default Settings.INPUT_MAX_PENDING)
+        clock: time source in seconds for the rate limit (replays pass session time)
+        """
+        self.backend = backend
+        self.threaded = threaded
+        self.min_interval_ms = Settings.INPUT_MIN_INTERVAL_MS if min_interval_ms is None else min_interval_ms
+        self.max_pending = Settings.INPUT_MAX_PENDING if max_pending is None else max_pending
+        self.clock = clock
+
+        self.moves_requested = 0
+        self.moves_sent = 0
+        self.actions_sent = 0
+        self.actions_dropped = 0
+        self.errors = 0
+
+        self._pending_move = None
+        self._pending_scroll = 0
+        self._actions = deque()
+        self._last_sent = {}   # action key -> clock() of last acceptance
+        self._cond = threading.Condition()
+        self._running = threaded
+        self._busy = False     # Worker is executing a batch outside the lock
+
+        if threaded:
+            self._thread = threading.Thread(target=self._worker, name="AGOS-Input", daemon=True)
+            self._thread.start()
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py).
+        """
+        self.min_interval_ms = Settings.INPUT_MIN_INTERVAL_MS
+        self.max_pending = Settings.INPUT_MAX_PENDING
+
+    def move(self, x, y):
+        """
+        Request a cursor move to screen pixel (x, y).
+        """
+        self.moves_requested += 1
+        if not self.threaded:
+            self._call("move_to", (x, y))
+            self.moves_sent += 1
+            return
+
+        with self._cond:
+            self._pending_move = (x, y)
+            self._cond.notify()
+
+    def scroll(self, amount):
+        if not amount:
+            return
+        if not self.threaded:
+            self._call("scroll", (amount,))
+            return
+
+        with self._cond:
+            self._pending_scroll += amount
+            self._cond.notify()
+
+    def submit(self, method, *args, limit=True):
+        """
+        Request a discrete backend call, e.g. submit("hotkey", "ctrl", "tab").
+        limit: False for calls that must never be dropped (releasing a held button),
+            they skip the rate limit and the queue bound
+        Returns:
+            True if accepted, False if rate-limited or the queue is full
+        """
+        key = (method, args)
+        now = self.clock()
+        last = self._last_sent.get(key)
+        if limit and last is not None and (now - last) * 1000 < self.min_interval_ms:
+            self.actions_dropped += 1
+            return False
+
+        if not self.threaded:
+            self._last_sent[key] = now
+            self._call(method, args)
+            self.actions_sent += 1
+            return True
+
+        with self._cond:
+            if limit and len(self._actions) >= self.max_pending:
+                self.actions_dropped += 1
+                return False
+            self._last_sent[key] = now
+            self._actions.append(key)
+            self._cond.notify()
+        return True
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._pending_move or self._pending_scroll or self._actions or not self._running
+                )
+                if not self._running and not self._actions:
+                    break
+                move, self._pending_move = self._pending_move, None
+                scroll, self._pending_scroll = self._pending_scroll, 0
+                actions = list(self._actions)
+                self._actions.clear()
+                self._busy = True
+
+            # Position first, so clicks land where the cursor was asked to be
+            if move is not None:
+                self._call("move_to", move)
+                self.moves_sent += 1
+            if scroll:
+                self._call("scroll", (scroll,))
+            for method, args in actions:
+                self._call(method, args)
+                self.actions_sent += 1
+
+            with self._cond:
+                self._busy = False
+
+    def _call(self, method, args):
+        try:
+            with tracing.span("input." + method):
+                getattr(self.backend, method)(*args)
+        except Exception as e:
+            self.errors += 1
+            log.warning(f"Input backend {method}{args} failed: {e}")
+
+    def flush(self, timeout=1.0):
+        """
+        Wait until everything queued so far has been sent (threaded mode).
+        """
+        deadline = time.perf_counter() + timeout
+        while self.threaded and time.perf_counter() < deadline:
+            with self._cond:
+                if (self._pending_move is None and not self._pending_scroll
+                        and not self._actions and not self._busy):
+                    return True
+            time.sleep(0.001)
+        return not self.threaded
+
+    def stats(self):
+        return {
+            "moves_requested": self.moves_requested,
+            "moves_sent": self.moves_sent,
+            "moves_coalesced": self.moves_requested - self.moves_sent,
+            "actions_sent": self.actions_sent,
+            "actions_dropped": self.actions_dropped,
+            "pending": len(self._actions),
+            "errors": self.errors,
+        }
+
+    def close(self):
+        if self.threaded and self._running:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+            self._thread.join(timeout=2.0)
@@ -1,17 +1,35 @@
-import pyautogui
 import numpy as np
 from AGOS.config.settings import Settings
+from AGOS.vision.filters import make_filter, FILTER_SETTINGS
 
 class MouseControl:
-    def __init__(self):
-        pyautogui.FAILSAFE = False # We handle safety manually
-        self.screen_w, self.screen_h = pyautogui.size()
+    def __init__(self, dispatcher, cursor_filter=None):
+        """
+        dispatcher: ActionDispatcher that performs the actual input
+        cursor_filter: smoothing filter name (default Settings.CURSOR_FILTER)
+        """
+        self.dispatcher = dispatcher
+        self.screen_w, self.screen_h = dispatcher.backend.screen_size()
         self.prev_x, self.prev_y = 0, 0
+        # Smoothing runs in normalized coordinates, driven by frame timestamps
+        self.filter = make_filter(Settings.CURSOR_FILTER if cursor_filter is None else cursor_filter, (2,))
+        self._point = np.zeros(2, dtype=np.float64)
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py): rebuilds the cursor filter when
+        CURSOR_FILTER or a filter parameter changed. The cursor restarts from the raw
+        position, so the switch is a single unsmoothed frame.
+        """
+        if "CURSOR_FILTER" in changes or any(key in changes for key in FILTER_SETTINGS):
+            self.filter = make_filter(Settings.CURSOR_FILTER, (2,))
         
-    def move(self, x, y):
+    def move(self, x, y, timestamp):
         """
         Move mouse to normalized (x, y) coordinates with smoothing.
         x, y: 0.0 to 1.0
+        timestamp: capture time of the landmarks in seconds, on the same clock as every
+            other frame (the filter keeps its state across calls)
         """
         # Map to screen
         # Note: Webcam x is mirrored usually, handled in main or here?
@@ -19,23 +37,35 @@ class MouseControl:
         # If we didn't flip in webcam, 0 is left. If flipped, 0 is right.
         # Webcam.py flips it! So 0 is left, 1 is right. Safe.
         
-        target_x = int(x * self.screen_w)
-        target_y = int(y * self.screen_h)
-        
         # Smoothing
-        curr_x = self.prev_x + (target_x - self.prev_x) / Settings.MOUSE_SENSITIVITY
-        curr_y = self.prev_y + (target_y - self.prev_y) / Settings.MOUSE_SENSITIVITY
+        if self.filter is not None:
+            self._point[0], self._point[1] = x, y
+            x, y = self.filter.filter(self._point, timestamp)
+
+        curr_x = x * self.screen_w
+        curr_y = y * self.screen_h
         
         # Clamping
-        curr_x = np.clip(curr_x, 0, self.screen_w)
-        curr_y = np.clip(curr_y, 0, self.screen_h)
+        curr_x = float(np.clip(curr_x, 0, self.screen_w - 1))
+        curr_y = float(np.clip(curr_y, 0, self.screen_h - 1))
         
-        pyautogui.moveTo(curr_x, curr_y)
+        self.dispatcher.move(curr_x, curr_y)
         
         self.prev_x, self.prev_y = curr_x, curr_y
 
     def click(self):
-        pyautogui.click()
+        self.dispatcher.submit("click")
+
+    def press(self):
+        """
+        Holds the left button down (start of a drag).
+        """
+        # Not rate-limited either: a dropped press turns the drag into a plain move
+        self.dispatcher.submit("mouse_down", limit=False)
+
+    def release(self):
+        # Never rate-limited: a dropped release would leave the button stuck
+        self.dispatcher.submit("mouse_up", limit=False)
         
     def scroll(self, dy):
         """
@@ -44,4 +74,4 @@ class MouseControl:
         """
         # amplify
         scroll_amount = int(dy * Settings.SCROLL_SENSITIVITY * 100) # multiplier
-        pyautogui.scroll(scroll_amount)
+        self.dispatcher.scroll(scroll_amount)
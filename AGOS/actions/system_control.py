@@ -1,25 +1,24 @@
-import pyautogui
-
 class SystemControl:
-    @staticmethod
-    def volume_up():
-        pyautogui.press('volumeup')
+    def __init__(self, dispatcher):
+        """
+        dispatcher: ActionDispatcher that performs the actual input
+        """
+        self.dispatcher = dispatcher
+
+    def volume_up(self):
+        self.dispatcher.submit("press", "volumeup")
         
-    @staticmethod
-    def volume_down():
-        pyautogui.press('volumedown')
+    def volume_down(self):
+        self.dispatcher.submit("press", "volumedown")
         
-    @staticmethod
-    def lock_screen():
+    def lock_screen(self):
         # Windows specific
-        pyautogui.hotkey('win', 'l')
+        self.dispatcher.submit("hotkey", "win", "l")
         
-    @staticmethod
-    def switch_tab_right():
+    def switch_tab_right(self):
         # Ctrl + Tab
-        pyautogui.hotkey('ctrl', 'tab')
+        self.dispatcher.submit("hotkey", "ctrl", "tab")
         
-    @staticmethod
-    def switch_tab_left():
+    def switch_tab_left(self):
         # Ctrl + Shift + Tab
-        pyautogui.hotkey('ctrl', 'shift', 'tab')
+        self.dispatcher.submit("hotkey", "ctrl", "shift", "tab")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+"""
+End-to-end AGOS benchmark: runs the full per-frame loop (capture, color conversion,
+landmarking, gesture classification, action dispatch, overlay) and reports throughput
+plus p50/p95/p99 latency per stage.
+
+Frames come from a video file or the synthetic source, unpaced. Landmarks come from
+the MediaPipe HandTracker, or with --session from a recorded session (see
+AGOS.replay), which needs no model and gives the gesture stages real hands to work on.
+Input goes to the null backend.
+
+Usage:
+    python -m AGOS.benchmarks.bench_pipeline --source clip.mp4 --frames 500 --json bench.json
+    python -m AGOS.benchmarks.bench_pipeline --session session.agr --baseline bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from AGOS.camera.webcam import WebcamStream
+from AGOS.camera.frame_source import VideoFileSource, SyntheticSource
+from AGOS.gestures.classifier import make_classifier
+from AGOS.gestures.hand_registry import HandRegistry
+from AGOS.gestures.recognition import recognize_hands, execute_actions, describe
+from AGOS.actions.action_mapper import ActionMapper
+from AGOS.actions.backends import make_backend
+from AGOS.replay.session import Session
+from AGOS.vision.fps_counter import FPSCounter
+from AGOS.ui.overlay import Overlay
+
+STAGES = ("capture", "color", "landmarks", "classify", "dispatch", "overlay")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="AGOS end-to-end pipeline benchmark")
+    parser.add_argument("--source", default="synthetic", help="Video file, or 'synthetic' (default)")
+    parser.add_argument("--frames", type=int, default=500, help="Frames to measure")
+    parser.add_argument("--warmup", type=int, default=20, help="Frames to run before measuring")
+    parser.add_argument(
+        "--session", default=None,
+        help="Take landmarks from this recorded session instead of running the landmarker"
+    )
+    parser.add_argument("--mode", default="VIDEO", choices=("IMAGE", "VIDEO"), help="Landmarker running mode")
+    parser.add_argument("--roi", action="store_true", help="ROI-cropped inference")
+    parser.add_argument("--inference-size", type=int, default=0, help="Downscale inference input to N px")
+    parser.add_argument("--input-backend", default="null", help="Input backend (default: null)")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    parser.add_argument(
+        "--baseline", default=None,
+        help="Results JSON to compare against; exit with status 1 on a regression"
+    )
+    parser.add_argument(
+        "--metric", default="p95_ms", choices=("mean_ms", "p50_ms", "p95_ms", "p99_ms"),
+        help="Statistic compared against the baseline"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed relative slowdown before failing (0.2 = 20%%)"
+    )
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=0.05,
+        help="Ignore slowdowns smaller than this (keeps sub-0.1ms stages from flapping)"
+    )
+    return parser.parse_args()
+
+def open_source(spec):
+    if spec == "synthetic":
+        return SyntheticSource(fps=0)
+    # Loop so --frames is honoured on short clips
+    return VideoFileSource(spec, realtime=False, loop=True)
+
+class SessionLandmarks:
+    """
+    Stands in for the HandTracker: cycles through a recording's landmarks and
+    does the same color conversion the tracker would.
+    """
+    def __init__(self, path):
+        self.session = Session(path)
+        if not len(self.session):
+            raise ValueError(f"Session {path} has no frames")
+        self.index = 0
+        self.preprocess_ms = 0.0
+        self._rgb = None
+        self._hands = np.zeros((self.session.max_hands, 21, 3), dtype=np.float32)
+        self.hands = self._hands[:0]
+        self.handedness = []
+
+    def process(self, frame):
+        start_ns = time.perf_counter_ns()
+        if self._rgb is None or self._rgb.shape != frame.shape:
+            self._rgb = np.empty_like(frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        self.preprocess_ms = (time.perf_counter_ns() - start_ns) / 1e6
+
+        self.hands, self.handedness = self.session.hands(self.index, out=self._hands)
+        self.index = (self.index + 1) % len(self.session)
+
+class TrackerLandmarks:
+    """
+    Adapts the HandTracker to the same surface as SessionLandmarks.
+    """
+    def __init__(self, mode, roi, inference_size):
+        # Imported here so --session runs don't need MediaPipe
+        from AGOS.vision.hand_tracker import HandTracker
+        self.tracker = HandTracker(mode, roi, inference_size)
+        self.preprocess_ms = 0.0
+        self.hands = self.tracker.landmarks.hands
+        self.handedness = []
+        self._timestamp_ms = 0
+
+    def process(self, frame):
+        # Fixed 30 FPS timeline so VIDEO-mode tracking behaves like a live camera
+        self._timestamp_ms += 33
+        self.tracker.process(frame, self._timestamp_ms)
+        self.preprocess_ms = self.tracker.preprocess_ms
+        self.hands = self.tracker.landmarks.hands
+        self.handedness = self.tracker.landmarks.handedness[:len(self.hands)]
+
+    def draw(self, frame):
+        self.tracker.draw_landmarks(frame)
+
+def summarize(ms):
+    return {
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+def run(args):
+    cam = WebcamStream(open_source(args.source), threaded=False)
+    if args.session:
+        landmarks = SessionLandmarks(args.session)
+    else:
+        landmarks = TrackerLandmarks(args.mode, args.roi, args.inference_size)
+    classifier = make_classifier()
+    registry = HandRegistry()
+    mapper = ActionMapper(make_backend(args.input_backend))
+    ui = Overlay()
+    fps_counter = FPSCounter()
+
+    total = args.warmup + args.frames
+    times = np.zeros((total, len(STAGES)), dtype=np.float64)
+    hand_frames = 0
+    frames = 0
+    start = None
+    try:
+        for i in range(total):
+            if i == args.warmup:
+                start = time.perf_counter()
+
+            t0 = time.perf_counter_ns()
+            frame, success = cam.read()
+            if not success:
+                break
+
+            t1 = time.perf_counter_ns()
+            landmarks.process(frame)
+            hands, handedness = landmarks.hands, landmarks.handedness
+            t2 = time.perf_counter_ns()
+
+            timestamp = t2 / 1e9
+            tracks = recognize_hands(hands, handedness, registry, classifier, timestamp)
+            t3 = time.perf_counter_ns()
+
+            execute_actions(tracks, hands, mapper, timestamp)
+            t4 = time.perf_counter_ns()
+
+            if tracks and isinstance(landmarks, TrackerLandmarks):
+                landmarks.draw(frame)
+            ui.draw(frame, describe(tracks), fps_counter.update())
+            t5 = time.perf_counter_ns()
+
+            # Color conversion happens inside the landmarking call; split it out
+            process_ms = (t2 - t1) / 1e6
+            times[i] = ((t1 - t0) / 1e6, landmarks.preprocess_ms, process_ms - landmarks.preprocess_ms,
+                        (t3 - t2) / 1e6, (t4 - t3) / 1e6, (t5 - t4) / 1e6)
+            frames = i + 1
+            if i >= args.warmup:
+                hand_frames += len(hands) > 0
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+    finally:
+        mapper.close()
+        cam.release()
+
+    measured = times[args.warmup:frames]
+    if not len(measured):
+        raise RuntimeError("No frames measured (source ended during warmup?)")
+
+    stages = {name: summarize(measured[:, j]) for j, name in enumerate(STAGES)}
+    return {
+        "config": {
+            "source": args.source,
+            "landmarks": f"session:{os.path.basename(args.session)}" if args.session else f"tracker:{args.mode}",
+            "roi": args.roi,
+            "inference_size": args.inference_size,
+            "resolution": f"{cam.width}x{cam.height}",
+            "frames": len(measured),
+        },
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+        },
+        "throughput_fps": len(measured) / elapsed if elapsed else 0.0,
+        "hand_frame_ratio": hand_frames / len(measured),
+        "total": summarize(measured.sum(axis=1)),
+        "stages": stages,
+    }
+
+def compare(results, baseline, metric, tolerance, min_delta_ms):
+    """
+    Prints a stage-by-stage comparison.
+    Returns:
+        names of the stages that regressed
+    """
+    regressions = []
+    rows = [("total", results["total"], baseline.get("total"))]
+    rows += [(name, stats, baseline.get("stages", {}).get(name)) for name, stats in results["stages"].items()]
+
+    print(f"\nAgainst baseline ({metric}, tolerance {tolerance * 100:.0f}%):")
+    for name, stats, base in rows:
+        if not base:
+            print(f"{name:>10}: {stats[metric]:8.3f} ms (not in baseline)")
+            continue
+        new, old = stats[metric], base[metric]
+        change = (new - old) / old if old else 0.0
+        regressed = new > old * (1 + tolerance) and new - old > min_delta_ms
+        if regressed:
+            regressions.append(name)
+        print(f"{name:>10}: {old:8.3f} -> {new:8.3f} ms ({change * 100:+6.1f}%)"
+              f"{'  REGRESSION' if regressed else ''}")
+
+    if "throughput_fps" in baseline:
+        print(f"{'fps':>10}: {baseline['throughput_fps']:8.1f} -> {results['throughput_fps']:8.1f}")
+    return regressions
+
+def main():
+    args = parse_args()
+    results = run(args)
+
+    config = results["config"]
+    print(f"{config['frames']} frames, {config['resolution']}, landmarks from {config['landmarks']}: "
+          f"{results['throughput_fps']:.1f} FPS, hands in {results['hand_frame_ratio'] * 100:.0f}% of frames")
+    print(f"{'stage':>10}  {'mean':>8}  {'p50':>8}  {'p95':>8}  {'p99':>8}  (ms)")
+    for name, s in list(results["stages"].items()) + [("total", results["total"])]:
+        print(f"{name:>10}  {s['mean_ms']:8.3f}  {s['p50_ms']:8.3f}  {s['p95_ms']:8.3f}  {s['p99_ms']:8.3f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.metric, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
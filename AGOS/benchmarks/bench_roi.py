@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Compare HandTracker cost on full frames vs ROI-cropped (and downscaled) frames.
+
+Frames are decoded up front so only tracker.process() is timed. Use a clip with a
+hand in view, otherwise the ROI mode never engages. ROI cropping runs in IMAGE mode
+(see HandTracker); the full-frame baseline runs in --mode, and in IMAGE mode too
+when that is another one, so ROI can be compared with tracking between full frames.
+
+Usage:
+    python -m AGOS.benchmarks.bench_roi <video> --frames 300 --max-side 256
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from AGOS.vision.hand_tracker import HandTracker
+from AGOS.config.settings import Settings
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HandTracker ROI benchmark")
+    parser.add_argument("video", help="Video file with a hand in view")
+    parser.add_argument("--frames", type=int, default=300, help="Frames to run per configuration")
+    parser.add_argument(
+        "--max-side", type=int, default=256, help="Inference resolution for the ROI+downscale run"
+    )
+    parser.add_argument("--mode", default=Settings.TRACKER_RUNNING_MODE, choices=HandTracker.RUNNING_MODES)
+    parser.add_argument("--json", default=None, help="Also write results to this JSON file")
+    return parser.parse_args()
+
+def load_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Failed to open {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or Settings.FPS_TARGET
+
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.flip(frame, 1))
+    cap.release()
+    return frames, fps
+
+def run(frames, fps, mode, roi_tracking, max_side):
+    tracker = HandTracker(mode, roi_tracking=roi_tracking, inference_max_side=max_side)
+    times_ms = np.empty(len(frames))
+    detected = 0
+
+    for i, frame in enumerate(frames):
+        start = time.perf_counter_ns()
+        tracker.process(frame, timestamp_ms=int(i * 1000 / fps))
+        times_ms[i] = (time.perf_counter_ns() - start) / 1e6
+        detected += len(tracker.landmarks) > 0
+
+    tracker.landmarker.close()
+    return {
+        "mean_ms": float(times_ms.mean()),
+        "p50_ms": float(np.percentile(times_ms, 50)),
+        "p95_ms": float(np.percentile(times_ms, 95)),
+        "detection_rate": detected / len(frames),
+    }
+
+def main():
+    args = parse_args()
+    frames, fps = load_frames(args.video, args.frames)
+    if not frames:
+        print("Error: no frames decoded.")
+        return
+
+    print(f"Benchmarking {len(frames)} frames ({frames[0].shape[1]}x{frames[0].shape[0]}, {args.mode} mode)")
+    results = {"full_frame": run(frames, fps, args.mode, False, 0)}
+    if args.mode != "IMAGE":
+        results["full_frame_image"] = run(frames, fps, "IMAGE", False, 0)
+    results["roi"] = run(frames, fps, "IMAGE", True, 0)
+    results[f"roi_max{args.max_side}"] = run(frames, fps, "IMAGE", True, args.max_side)
+
+    base = results["full_frame"]["mean_ms"]
+    for name, r in results.items():
+        r["speedup"] = base / r["mean_ms"] if r["mean_ms"] else 0.0
+        print(f"{name:>16}: {r['mean_ms']:6.2f} ms mean, {r['p95_ms']:6.2f} ms p95, "
+              f"{r['detection_rate'] * 100:5.1f}% detected, {r['speedup']:.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import cv2
+import time
+import numpy as np
+from AGOS.config.settings import Settings
+from AGOS.utils.logger import log
+
+class FrameSource:
+    """
+    Base class for anything WebcamStream can pull frames from.
+    Subclasses fill a caller-owned BGR buffer so no frame is allocated per read.
+    """
+    width = Settings.FRAME_WIDTH
+    height = Settings.FRAME_HEIGHT
+    fps = Settings.FPS_TARGET
+
+    # True once the source can never produce another frame (end of file, etc.)
+    exhausted = False
+
+    def read_into(self, buffer):
+        """
+        Reads the next frame into buffer (height x width x 3, uint8).
+        Returns:
+            success: Boolean indicating success
+        """
+        raise NotImplementedError
+
+    def set_fps(self, fps):
+        """
+        Asks the source for a new frame rate.
+        Returns:
+            True if the source supports changing it
+        """
+        return False
+
+    def release(self):
+        pass
+
+
+class _VideoCaptureSource(FrameSource):
+    """
+    Shared cv2.VideoCapture handling for cameras and video files.
+    """
+    def __init__(self, cap):
+        self.cap = cap
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or Settings.FRAME_WIDTH
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or Settings.FRAME_HEIGHT
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or Settings.FPS_TARGET
+
+    def read_into(self, buffer):
+        # VideoCapture decodes straight into `buffer` when shape and dtype match
+        success, frame = self.cap.read(buffer)
+        if not success or frame is None:
+            return False
+
+        if frame is not buffer:
+            # Driver ignored the requested size; scale into the buffer instead
+            cv2.resize(frame, (buffer.shape[1], buffer.shape[0]), dst=buffer)
+        return True
+
+    def release(self):
+        self.cap.release()
+
+
+class CameraSource(_VideoCaptureSource):
+    def __init__(self, camera_id=None):
+        cap = cv2.VideoCapture(Settings.CAMERA_ID if camera_id is None else camera_id)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, Settings.FRAME_WIDTH)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, Settings.FRAME_HEIGHT)
+        cap.set(cv2.CAP_PROP_FPS, Settings.FPS_TARGET)
+
+        if not cap.isOpened():
+            log.error("Could not open webcam.")
+            raise IOError("Cannot open webcam")
+
+        super().__init__(cap)
+
+    def set_fps(self, fps):
+        # Drivers may round or ignore the request; report what they settled on
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or fps
+        return True
+
+
+class VideoFileSource(_VideoCaptureSource):
+    """
+    Plays a video file as if it were a camera.
+    realtime: pace reads to the file's FPS (like a live camera would)
+    loop: rewind at the end instead of becoming exhausted
+    """
+    def __init__(self, path, realtime=True, loop=False):
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            log.error(f"Could not open video file: {path}")
+            raise IOError(f"Cannot open video file {path}")
+
+        super().__init__(cap)
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self._next_deadline = None
+
+    def read_into(self, buffer):
+        if self.realtime:
+            self._next_deadline = _pace(self._next_deadline, self.fps)
+
+        if super().read_into(buffer):
+            return True
+
+        if self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            return super().read_into(buffer)
+
+        self.exhausted = True
+        return False
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generates a moving test pattern, for running AGOS with no camera attached.
+    fps: frames per second to emulate (0 = as fast as possible)
+    num_frames: stop after this many frames (None = endless)
+    """
+    def __init__(self, width=None, height=None, fps=None, num_frames=None):
+        self.width = Settings.FRAME_WIDTH if width is None else width
+        self.height = Settings.FRAME_HEIGHT if height is None else height
+        self.fps = Settings.FPS_TARGET if fps is None else fps
+        self.num_frames = num_frames
+        self.count = 0
+        self._next_deadline = None
+
+        # Static background rendered once; each frame only copies it and draws a blob
+        ramp = np.linspace(0, 255, self.width, dtype=np.uint8)
+        self._background = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self._background[:] = ramp[None, :, None]
+
+    def set_fps(self, fps):
+        self.fps = fps
+        return True
+
+    def read_into(self, buffer):
+        if self.num_frames is not None and self.count >= self.num_frames:
+            self.exhausted = True
+            return False
+
+        if self.fps:
+            self._next_deadline = _pace(self._next_deadline, self.fps)
+
+        np.copyto(buffer, self._background)
+
+        # Blob sweeping left to right so mirroring and motion are visible
+        t = self.count / max(self.fps, 1)
+        cx = int((0.5 + 0.4 * np.sin(t)) * self.width)
+        cy = int((0.5 + 0.3 * np.cos(t * 0.7)) * self.height)
+        cv2.circle(buffer, (cx, cy), 40, (40, 180, 255), -1)
+
+        self.count += 1
+        return True
+
+
+def _pace(deadline, fps):
+    """
+    Sleeps until `deadline` and returns the next one, emulating a camera's frame clock.
+    """
+    now = time.perf_counter()
+    if deadline is None:
+        return now + 1.0 / fps
+
+    if deadline > now:
+        time.sleep(deadline - now)
+        return deadline + 1.0 / fps
+
+    # Fell behind; restart the clock rather than bursting to catch up
+    return now + 1.0 / fps
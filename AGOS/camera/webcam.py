@@ -1,37 +1,155 @@
 import cv2
 import time
+import threading
+import numpy as np
 from AGOS.config.settings import Settings
+from AGOS.camera.frame_source import CameraSource
 from AGOS.utils.logger import log
+from AGOS.utils import tracing
 
 class WebcamStream:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(Settings.CAMERA_ID)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, Settings.FRAME_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, Settings.FRAME_HEIGHT)
-        self.cap.set(cv2.CAP_PROP_FPS, Settings.FPS_TARGET)
-        
-        if not self.cap.isOpened():
-            log.error("Could not open webcam.")
-            raise IOError("Cannot open webcam")
-        
-        log.info(f"Webcam started: {Settings.FRAME_WIDTH}x{Settings.FRAME_HEIGHT} @ {Settings.FPS_TARGET}FPS")
+    def __init__(self, source=None, threaded=None, ring_size=None):
+        """
+        source: FrameSource to pull from (defaults to the configured camera)
+        threaded: capture on a background thread into a ring of reused buffers
+            (default Settings.THREADED_CAPTURE)
+        ring_size: number of preallocated buffers in threaded mode (default Settings.CAPTURE_RING_SIZE)
+        """
+        self.source = source if source is not None else CameraSource()
+        self.width, self.height = self.source.width, self.source.height
+        self.threaded = Settings.THREADED_CAPTURE if threaded is None else threaded
+        if ring_size is None:
+            ring_size = Settings.CAPTURE_RING_SIZE
+
+        self.frame_id = 0        # Id of the frame returned by the last read()
+        self.dropped_frames = 0  # Frames captured but overwritten before anyone read them
+        self.last_wait_ms = 0.0  # Time the last read() spent waiting on the camera
+        self._pending_fps = None # FPS_TARGET change to apply on the thread that reads the source
+
+        shape = (self.height, self.width, 3)
+        # Raw (unflipped) frames land here, then get mirrored into an output buffer
+        self._scratch = np.empty(shape, dtype=np.uint8)
+
+        if self.threaded:
+            # Need at least: one being written, one published, one held by the reader
+            self._ring = [np.empty(shape, dtype=np.uint8) for _ in range(max(3, ring_size))]
+            self._cond = threading.Condition()
+            self._latest = -1      # Ring slot of the newest published frame
+            self._latest_id = 0    # Frame id stored in that slot
+            self._held = -1        # Ring slot handed out by the last read()
+            self._ended = False
+            self._running = True
+            self._thread = threading.Thread(target=self._capture_loop, name="AGOS-Capture", daemon=True)
+            self._thread.start()
+        else:
+            self._frame = np.empty(shape, dtype=np.uint8)
+
+        log.info(f"Webcam started: {self.width}x{self.height} @ {Settings.FPS_TARGET}FPS"
+                 f" ({'threaded' if self.threaded else 'synchronous'} capture)")
 
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py): asks the source for a new FPS_TARGET
+        before its next read, from the thread that owns it. Resolution changes need new
+        buffers and only apply on restart.
+        """
+        if "FPS_TARGET" in changes:
+            self._pending_fps = Settings.FPS_TARGET
+
+    def _apply_fps(self):
+        fps, self._pending_fps = self._pending_fps, None
+        if self.source.set_fps(fps):
+            log.info(f"Capture rate set to {self.source.fps:g} FPS")
+
+    @tracing.traced("camera.read")
     def read(self):
         """
         Reads a frame from the webcam.
+        In threaded mode this returns the newest captured frame immediately; it only
+        waits (up to CAPTURE_TIMEOUT_S) when the caller has already seen the newest one.
+        The returned buffer is reused: it stays valid until the next read().
         Returns:
             frame: The captured frame (BGR)
             success: Boolean indicating success
         """
-        success, frame = self.cap.read()
+        if not self.threaded:
+            return self._read_sync()
+
+        start_ns = time.perf_counter_ns()
+        with self._cond:
+            fresh = self._cond.wait_for(
+                lambda: self._latest_id > self.frame_id or self._ended,
+                timeout=Settings.CAPTURE_TIMEOUT_S
+            )
+            self.last_wait_ms = (time.perf_counter_ns() - start_ns) / 1e6
+            if not fresh or self._latest_id == self.frame_id:
+                # Timed out, or the source ended and everything was delivered
+                return None, False
+
+            self._held = self._latest
+            self.frame_id = self._latest_id
+            return self._ring[self._held], True
+
+    def _read_sync(self):
+        if self._pending_fps is not None:
+            self._apply_fps()
+        start_ns = time.perf_counter_ns()
+        success = self.source.read_into(self._scratch)
+        self.last_wait_ms = (time.perf_counter_ns() - start_ns) / 1e6
         if not success:
             log.warning("Failed to read frame")
             return None, False
-        
-        # Mirror flip for natural interaction
-        frame = cv2.flip(frame, 1)
-        return frame, True
+
+        # Mirror flip for natural interaction (into the reused output buffer)
+        cv2.flip(self._scratch, 1, dst=self._frame)
+        self.frame_id += 1
+        return self._frame, True
+
+    def _capture_loop(self):
+        slot = 0
+        while self._running:
+            if self._pending_fps is not None:
+                self._apply_fps()
+            if not self.source.read_into(self._scratch):
+                if self.source.exhausted:
+                    break
+                log.warning("Failed to read frame")
+                time.sleep(0.01)  # Don't spin on a camera that keeps failing
+                continue
+
+            with self._cond:
+                slot = self._next_free_slot(slot)
+
+            # The reader can only ever take the published slot, so this one is ours
+            cv2.flip(self._scratch, 1, dst=self._ring[slot])
+
+            with self._cond:
+                if self._latest_id > self.frame_id:
+                    # Previous frame was never read; it is replaced by this one
+                    self.dropped_frames += 1
+                self._latest = slot
+                self._latest_id += 1
+                self._cond.notify_all()
+
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+
+    def _next_free_slot(self, slot):
+        """
+        Next ring slot that is neither published nor held by the reader.
+        Caller must hold the lock.
+        """
+        for _ in range(len(self._ring)):
+            slot = (slot + 1) % len(self._ring)
+            if slot != self._latest and slot != self._held:
+                return slot
+        raise RuntimeError("Capture ring has no free slot")
 
     def release(self):
-        self.cap.release()
+        if self.threaded:
+            self._running = False
+            self._thread.join(timeout=2.0)
+            log.info(f"Capture stopped after {self._latest_id} frames ({self.dropped_frames} dropped)")
+        self.source.release()
         log.info("Webcam released")
@@ -0,0 +1,393 @@
+"""
+Runtime configuration: overrides for Settings loaded from a TOML or JSON file,
+validated, watched for changes and applied while AGOS runs.
+
+File layout (TOML; JSON uses the same structure):
+
+    CONFIRM_WINDOW_MS = 250
+    CURSOR_FILTER = "one_euro"
+    profile = "desk"                 # Optional: profile active at startup
+
+    [profiles.desk]
+    ONE_EURO_BETA = 3.0
+
+    [profiles.presentation]
+    CONFIRM_WINDOW_MS = 300
+    GESTURE_BINDINGS = { SWIPE_LEFT = "tab_left", SWIPE_RIGHT = "tab_right" }
+
+Top-level keys are Settings names; the active profile's keys override them, and
+keys missing from both fall back to the defaults in settings.py.
+
+Changes are applied in two steps so the frame loop never waits on them: a watcher
+thread re-reads and validates the file when it changes, then the loop calls
+apply_pending() once per frame, which updates Settings and notifies subscribers
+with the keys that actually changed. Subscribers rebuild only what those keys
+affect (see the configure() methods of HandTracker, HandRegistry, ActionMapper...).
+"""
+
+import json
+import os
+import threading
+import time
+from AGOS.config.settings import Settings
+from AGOS.actions.backends import BACKENDS
+from AGOS.actions.bindings import parse_bindings
+from AGOS.gestures.classifier import CLASSIFIERS
+from AGOS.gestures.confirmation import VOTING_MODES
+from AGOS.gestures.gesture_labels import Gestures
+from AGOS.vision.filters import FILTERS
+from AGOS.utils.logger import log
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON config files only
+    tomllib = None
+
+# Defaults as written in settings.py, captured before any file is applied
+DEFAULTS = {name: value for name, value in vars(Settings).items() if name.isupper()}
+
+# Used before a config file can be read (logging is set up on import)
+FIXED_KEYS = {"APP_NAME", "FONT", "LOG_FORMAT", "LOG_FILE", "LOG_QUEUE_SIZE"}
+
+# Only read when components are built: applied from the file at startup,
+# later changes are reported and need a restart
+RESTART_KEYS = {
+    "CAMERA_ID", "FRAME_WIDTH", "FRAME_HEIGHT", "THREADED_CAPTURE", "CAPTURE_RING_SIZE",
+    "MAX_NUM_HANDS", "MODEL_COMPLEXITY", "TRACKER_RUNNING_MODE", "ADAPTIVE_INFERENCE",
+    "GESTURE_CLASSIFIER", "GESTURE_MODEL_PATH", "INPUT_BACKEND", "ASYNC_INPUT", "FPS_WINDOW",
+    "TRACING", "TRACE_BUFFER_SIZE", "TRACE_SUMMARY_INTERVAL_S", "CONFIG_FILE", "CONFIG_PROFILE", "CONFIG_POLL_INTERVAL_S",
+}
+
+FILTER_CHOICES = tuple(sorted(FILTERS)) + ("none",)
+CHOICES = {
+    "TRACKER_RUNNING_MODE": ("IMAGE", "VIDEO", "LIVE_STREAM"),  # HandTracker.RUNNING_MODES (needs mediapipe)
+    "CURSOR_FILTER": FILTER_CHOICES,
+    "LANDMARK_FILTER": FILTER_CHOICES,
+    "CONFIRM_MODE": VOTING_MODES,
+    "GESTURE_CLASSIFIER": tuple(sorted(CLASSIFIERS)),
+    "INPUT_BACKEND": tuple(sorted(BACKENDS)),
+}
+
+# Inclusive bounds; every other number must be >= 0
+RANGES = {
+    "FPS_TARGET": (1, 240),
+    "MAX_NUM_HANDS": (1, 4),
+    "MIN_DETECTION_CONFIDENCE": (0.0, 1.0),
+    "MIN_TRACKING_CONFIDENCE": (0.0, 1.0),
+    "SMOOTHING_FACTOR": (0.0, 1.0),
+    "CONFIRM_ENTER": (0.0, 1.0),
+    "CONFIRM_EXIT": (0.0, 1.0),
+    "CLASSIFIER_MIN_CONFIDENCE": (0.0, 1.0),
+    "CLICK_THRESHOLD_DIST": (0.0, 1.0),
+    "DRAG_START_DIST": (0.0, 1.0),
+    "TRAJ_EARLY_MIN_STRAIGHTNESS": (0.0, 1.0),
+    "CONFIRM_WINDOW_MS": (1, 10000),
+    "CAPTURE_RING_SIZE": (3, 64),
+    "TRAJECTORY_CAPACITY": (8, 4096),
+}
+
+HAND_ROLE_NAMES = ("pointer", "system", "all")
+
+def _check_type(name, value, default):
+    """
+    Checks a value against the type of the setting's default. Returns the value
+    converted to that type (TOML/JSON arrays become tuples where settings.py uses tuples).
+    """
+    if isinstance(default, bool):
+        ok = isinstance(value, bool)
+    elif isinstance(default, int):
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(default, float):
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        value = float(value) if ok else value
+    elif default is None or isinstance(default, str):
+        ok = isinstance(value, str)
+    elif isinstance(default, tuple):
+        ok = isinstance(value, list) and len(value) == len(default)
+        value = tuple(value) if ok else value
+    else:
+        ok = isinstance(value, type(default))
+    if not ok:
+        expected = "string" if default is None else type(default).__name__
+        raise ValueError(f"expected {expected}, got {value!r}")
+    return value
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _check_value(name, value):
+    if name in CHOICES and value not in CHOICES[name]:
+        raise ValueError(f"{value!r} is not one of {list(CHOICES[name])}")
+    if _is_number(value):
+        low, high = RANGES.get(name, (0, None))
+        if value < low or (high is not None and value > high):
+            raise ValueError(f"{value} is outside [{low}, {'inf' if high is None else high}]")
+
+    if name == "GESTURE_BINDINGS":
+        parse_bindings(value)
+    elif name == "DYNAMIC_GESTURES":
+        unknown = [g for g in value if not isinstance(g, str) or g not in Gestures.__members__]
+        if unknown:
+            raise ValueError(f"unknown gestures {unknown}")
+    elif name == "CONFIRM_HYSTERESIS":
+        converted = {}
+        for gesture, thresholds in value.items():
+            if gesture not in Gestures.__members__:
+                raise ValueError(f"unknown gesture {gesture!r}")
+            if (not isinstance(thresholds, (list, tuple)) or len(thresholds) != 2
+                    or not all(_is_number(t) and 0 <= t <= 1 for t in thresholds) or thresholds[0] < thresholds[1]):
+                raise ValueError(f"{gesture}: expected [enter, exit] with 0 <= exit <= enter <= 1")
+            converted[gesture] = tuple(thresholds)
+        return converted
+    elif name == "HAND_ROLES":
+        bad = {hand: role for hand, role in value.items() if not isinstance(role, str) or role not in HAND_ROLE_NAMES}
+        if bad:
+            raise ValueError(f"roles must be one of {list(HAND_ROLE_NAMES)}, got {bad}")
+    return value
+
+def validate(values, where="config"):
+    """
+    Validates {setting name: value} overrides.
+    Returns:
+        the values converted to the types settings.py uses
+    Raises:
+        ValueError listing every problem
+    """
+    problems, result = [], {}
+    for name, value in values.items():
+        if name not in DEFAULTS:
+            problems.append(f"{where}: unknown setting {name}")
+            continue
+        if name in FIXED_KEYS:
+            problems.append(f"{where}: {name} can only be set in settings.py")
+            continue
+        try:
+            value = _check_type(name, value, DEFAULTS[name])
+            result[name] = _check_value(name, value)
+        except Exception as e:
+            # Any malformed value is a problem to report, never a crash of the watcher
+            problems.append(f"{where}: {name}: " + str(e).replace("\n", "\n    "))
+
+    if problems:
+        raise ValueError("Invalid configuration:\n  " + "\n  ".join(problems))
+    return result
+
+def check_combined(values, where="config"):
+    """
+    Checks between settings, on the values that would actually be in effect:
+    the settings.py defaults with `values` (top level + profile) applied on top.
+    Raises:
+        ValueError listing every problem
+    """
+    merged = dict(DEFAULTS, **values)
+    problems = []
+    if merged["CONFIRM_EXIT"] > merged["CONFIRM_ENTER"]:
+        problems.append(f"{where}: CONFIRM_EXIT ({merged['CONFIRM_EXIT']}) must not exceed "
+                        f"CONFIRM_ENTER ({merged['CONFIRM_ENTER']})")
+    if problems:
+        raise ValueError("Invalid configuration:\n  " + "\n  ".join(problems))
+
+def merge_profile(base, profiles, profile):
+    """
+    Top-level overrides with the profile's on top (profile None = top level only).
+    """
+    values = dict(base)
+    if profile is not None:
+        values.update(profiles[profile])
+    return values
+
+def read_file(path):
+    """
+    Parses a TOML (.toml) or JSON config file.
+    Returns:
+        (top-level overrides, {profile name: overrides}, profile named in the file or None)
+    """
+    with open(path, "rb") as f:
+        if path.endswith(".toml"):
+            if tomllib is None:
+                raise ValueError(f"{path}: TOML needs Python 3.11+, use a .json config instead")
+            data = tomllib.load(f)
+        else:
+            data = json.loads(f.read().decode("utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a table / object at the top level")
+
+    profiles = data.pop("profiles", {})
+    active = data.pop("profile", None)
+    if not isinstance(profiles, dict) or not all(isinstance(values, dict) for values in profiles.values()):
+        raise ValueError(f"{path}: profiles must be tables / objects of settings")
+    base = validate(data, "top level")
+    profiles = {name: validate(values, f"profile {name}") for name, values in profiles.items()}
+    if active is not None and active not in profiles:
+        raise ValueError(f"{path}: profile {active!r} is not defined")
+
+    # Every combination that can be switched to, so set_profile() never meets a bad one
+    problems = []
+    for name in [None] + list(profiles):
+        try:
+            check_combined(merge_profile(base, profiles, name), "top level" if name is None else f"profile {name}")
+        except ValueError as e:
+            problems.extend(str(e).split("\n  ")[1:])
+    if problems:
+        raise ValueError("Invalid configuration:\n  " + "\n  ".join(problems))
+    return base, profiles, active
+
+
+class RuntimeConfig:
+    """
+    A config file applied on top of settings.py, with live reload and profiles.
+    """
+    def __init__(self, path, profile=None, poll_interval_s=None):
+        """
+        path: TOML or JSON config file
+        profile: profile to start with (default: the file's `profile` key, else none)
+        poll_interval_s: how often the watcher checks the file (default Settings.CONFIG_POLL_INTERVAL_S)
+        Raises:
+            OSError / ValueError if the file can't be read or is invalid
+        """
+        self.path = path
+        self.poll_interval_s = Settings.CONFIG_POLL_INTERVAL_S if poll_interval_s is None else poll_interval_s
+        self.subscribers = []     # (callback, keys or None)
+        self.applied = {}         # Overrides currently in Settings
+        self.reloads = 0
+
+        self._mtime = os.path.getmtime(path)
+        self._base, self._profiles, file_profile = read_file(path)
+        self.profile = profile if profile is not None else file_profile
+        if self.profile is not None and self.profile not in self._profiles:
+            raise ValueError(f"{path}: profile {self.profile!r} is not defined")
+
+        self._pending = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._apply(self._merged(self.profile), startup=True)
+        log.info(f"Config {path} loaded" + (f" (profile {self.profile})" if self.profile else ""))
+
+    @property
+    def profiles(self):
+        return list(self._profiles)
+
+    def _merged(self, profile, base=None, profiles=None):
+        """
+        Values that switching to `profile` would apply (default: the loaded file's), checked as a whole.
+        """
+        values = merge_profile(self._base if base is None else base,
+                               self._profiles if profiles is None else profiles, profile)
+        check_combined(values, "top level" if profile is None else f"profile {profile}")
+        return values
+
+    def subscribe(self, callback, keys=None):
+        """
+        callback(changes) is called from apply_pending() with {name: new value} of the
+        settings that changed. keys: only call it when one of these changed (None = any).
+        """
+        self.subscribers.append((callback, None if keys is None else set(keys)))
+        return callback
+
+    def start(self):
+        """
+        Starts the file watcher thread.
+        """
+        self._thread = threading.Thread(target=self._watch, name="AGOS-Config", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval_s):
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep watching: the next save may fix it
+                log.error(f"Config {self.path} reload failed: {e}")
+
+    def reload(self, force=False):
+        """
+        Re-reads the file if it changed and stages it for apply_pending().
+        A file that fails to parse or validate is logged and ignored.
+        Returns:
+            True if new values were staged
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self._mtime and not force:
+                return False
+            self._mtime = mtime
+            base, profiles, _ = read_file(self.path)
+            if self.profile is not None and self.profile not in profiles:
+                raise ValueError(f"profile {self.profile!r} was removed")
+            values = self._merged(self.profile, base, profiles)
+        except (OSError, ValueError) as e:
+            log.error(f"Config {self.path} not applied, keeping current settings: {e}")
+            return False
+        with self._lock:
+            self._base, self._profiles = base, profiles
+            self._pending = values
+        return True
+
+    def set_profile(self, name):
+        """
+        Switches profile (None = top-level values only). Takes effect on the next apply_pending().
+        """
+        if name is not None and name not in self._profiles:
+            raise ValueError(f"Unknown profile {name!r}, expected one of {self.profiles}")
+        with self._lock:
+            values = self._merged(name)
+            self.profile = name
+            self._pending = values
+
+    def next_profile(self):
+        """
+        Cycles through no profile and every defined profile. Returns the new profile name.
+        """
+        names = [None] + self.profiles
+        self.set_profile(names[(names.index(self.profile) + 1) % len(names)])
+        return self.profile
+
+    def apply_pending(self):
+        """
+        Call once per frame from the main loop. Does nothing (one attribute check)
+        unless the watcher or a profile switch staged new values.
+        Returns:
+            {name: value} of the settings that changed
+        """
+        if self._pending is None:
+            return {}
+        with self._lock:
+            values, self._pending = self._pending, None
+        return self._apply(values)
+
+    def _apply(self, values, startup=False):
+        # Keys dropped from the file go back to their settings.py defaults
+        targets = {name: DEFAULTS[name] for name in self.applied if name not in values}
+        targets.update(values)
+        changes = {name: value for name, value in targets.items() if getattr(Settings, name) != value}
+
+        if not startup:
+            restart = sorted(name for name in changes if name in RESTART_KEYS)
+            if restart:
+                log.warning(f"Config changes to {', '.join(restart)} take effect after a restart")
+                changes = {k: v for k, v in changes.items() if k not in RESTART_KEYS}
+                values = {k: v for k, v in values.items() if k not in restart}
+
+        for name, value in changes.items():
+            setattr(Settings, name, value)
+        self.applied = values
+        if startup or not changes:
+            return changes
+
+        self.reloads += 1
+        log.info(f"Config applied: {', '.join(f'{k}={v!r}' for k, v in changes.items() if k != 'GESTURE_BINDINGS')}"
+                 + (" + gesture bindings" if "GESTURE_BINDINGS" in changes else ""))
+        for callback, keys in self.subscribers:
+            if keys is None or not keys.isdisjoint(changes):
+                try:
+                    callback(changes)
+                except Exception as e:
+                    log.error(f"Config subscriber {getattr(callback, '__qualname__', callback)} failed: {e}")
+        return changes
@@ -6,23 +6,99 @@ class Settings:
     FRAME_WIDTH = 640
     FRAME_HEIGHT = 480
     FPS_TARGET = 30
+    FPS_WINDOW = 120  # Frames covered by the rolling FPS / frame-time statistics
+    LATE_FRAME_FACTOR = 1.5  # A frame taking longer than this many frame budgets counts as late
+    THREADED_CAPTURE = True  # Grab frames on a background thread (read() never waits on the camera)
+    CAPTURE_RING_SIZE = 3  # Preallocated frame buffers for threaded capture (minimum 3)
+    CAPTURE_TIMEOUT_S = 1.0  # Max wait for a fresh frame before read() reports failure
     
     # Hand Tracking
-    MAX_NUM_HANDS = 1
+    MAX_NUM_HANDS = 2
+    HAND_MATCH_MAX_DIST = 0.25  # Max centroid jump (normalized) to keep a hand's identity between frames
+    HAND_LOST_FRAMES = 10  # Frames a hand may go undetected before its state is discarded
     MIN_DETECTION_CONFIDENCE = 0.7
     MIN_TRACKING_CONFIDENCE = 0.7
     MODEL_COMPLEXITY = 1  # 0 or 1. 1 is more accurate but slower.
+    TRACKER_RUNNING_MODE = "VIDEO"  # IMAGE, VIDEO (synchronous, frame-accurate) or LIVE_STREAM (async)
+    ROI_TRACKING = False  # Run inference only on the region around the previous frame's hands (IMAGE mode only)
+    ROI_PADDING = 0.3  # Margin around the hand box, as a fraction of its size
+    ROI_MIN_SIZE = 0.25  # Smallest ROI side, as a fraction of the frame
+    ROI_REFRESH_FRAMES = 30  # Full-frame search this often so new hands are picked up (0 = only when lost)
+    INFERENCE_MAX_SIDE = 0  # Downscale the inference image so its longer side fits this (0 = off)
+    ADAPTIVE_INFERENCE = False  # Skip landmarker runs and extrapolate landmarks when behind FPS_TARGET
+    ADAPTIVE_MAX_SKIP = 4  # Run the landmarker at least every N frames
     
     # Smoothing
-    SMOOTHING_FACTOR = 0.5  # For mouse movement (exponential moving average)
+    CURSOR_FILTER = "one_euro"  # "one_euro", "kalman", "ema" or "none"
+    LANDMARK_FILTER = "none"  # Same choices, applied to each hand's full landmark array
+    SMOOTHING_FACTOR = 0.5  # EMA weight of a new sample at FPS_TARGET
+    ONE_EURO_MIN_CUTOFF = 1.0  # Hz when still; lower = less jitter
+    ONE_EURO_BETA = 5.0  # Cutoff increase per normalized unit/s; higher = less lag
+    ONE_EURO_D_CUTOFF = 1.0  # Hz, for the speed estimate
+    KALMAN_PROCESS_NOISE = 50.0  # Acceleration variance (normalized units/s^2)^2
+    KALMAN_MEASUREMENT_NOISE = 1e-4  # Landmark position variance (normalized units^2)
     
     # Gestures
-    GESTURE_CONFIRMATION_FRAMES = 5  # Number of frames a gesture must be held to be valid (temporal stability)
-    ACTION_COOLDOWN_MS = 500  # Cooldown between triggers like clicks
+    CONFIRM_WINDOW_MS = 200  # Voting window for gesture confirmation (see gestures/confirmation.py)
+    CONFIRM_MODE = "majority"  # "majority" (frames vote by duration) or "weighted" (also by confidence)
+    CONFIRM_ENTER = 0.5  # Share of the window a new gesture needs to be confirmed
+    CONFIRM_EXIT = 0.3  # Share below which the confirmed gesture is released (back to Idle)
+    CONFIRM_MIN_FRAMES = 2  # Votes a gesture needs in the window (fewer if the window holds fewer frames)
+    CONFIRM_HYSTERESIS = {"FIST": (0.75, 0.3)}  # Per-gesture (enter, exit); lock screen needs a steadier fist
+    GESTURE_CLASSIFIER = "rules"  # "rules" or "mlp" (learned, see gestures/classifier.py; rules remain the fallback)
+    GESTURE_MODEL_PATH = None  # .npz from gestures/train_classifier.py; None = gestures/gesture_model.npz
+    CLASSIFIER_MIN_CONFIDENCE = 0.6  # Below this the learned classifier defers to the rules
+    ACTION_COOLDOWN_MS = 500  # Default per-action cooldown of edge/held bindings
     
+    # Dynamic Gestures (see gestures/trajectory.py; speeds in normalized frame units per second)
+    DYNAMIC_GESTURES = ["SWIPE_LEFT", "SWIPE_RIGHT", "SWIPE_UP", "SWIPE_DOWN", "CIRCLE_CW", "CIRCLE_CCW", "FLICK"]
+    TRAJECTORY_CAPACITY = 128  # Palm positions kept per hand; longer strokes are ignored
+    TRAJ_SMOOTHING_S = 0.05  # Time constant of the velocity / acceleration estimates
+    TRAJ_START_SPEED = 0.5  # Palm speed that starts a stroke
+    TRAJ_STOP_SPEED = 0.2  # Speed below which the stroke ends and is classified
+    TRAJ_MAX_STROKE_S = 2.0  # Longer movements are not gestures
+    TRAJ_MIN_EXTENT = 0.08  # Smallest stroke bounding box matched against templates
+    TRAJ_MATCH_THRESHOLD = 0.2  # Max mean distance to a template (normalized shape units)
+    TRAJ_EARLY_SWIPE_DIST = 0.3  # Straight strokes this long are reported before the hand stops
+    TRAJ_EARLY_MIN_STRAIGHTNESS = 0.9  # ...if displacement / path length is at least this (a half circle is 0.64)
+    SWIPE_MIN_DIST = 0.15  # Must move at least 15% of the frame
+    SWIPE_MIN_SPEED = 0.3
+    FLICK_MAX_S = 0.3  # A flick is a short, fast stroke...
+    FLICK_MIN_SPEED = 0.6
+    FLICK_MIN_ACCEL = 4.0  # ...that snaps (peak acceleration along the motion, units/s^2; a flick reaches ~7)...
+    FLICK_MIN_DIST = 0.04  # ...and travels less than SWIPE_MIN_DIST
+
+    # Gesture -> Action Bindings (see actions/bindings.py for actions, modes and options)
+    # Modes: "edge" fires once when the gesture starts, "held" also repeats every repeat_ms;
+    # cursor, scroll and drag act on every frame (drag: click, or press once the pinch
+    # moves DRAG_START_DIST and release on let go)
+    GESTURE_BINDINGS = {
+        "INDEX_FINGER": {"action": "move_cursor"},
+        "TWO_FINGERS": {"action": "scroll"},
+        "PINCH": {"action": "click"},
+        "FIST": {"action": "lock_screen", "cooldown_ms": 2000},
+        "THUMBS_UP": {"action": "volume_up", "mode": "held", "repeat_ms": 150, "delay_ms": 400},
+        "THUMBS_DOWN": {"action": "volume_down", "mode": "held", "repeat_ms": 150, "delay_ms": 400},
+        "SWIPE_LEFT": {"action": "tab_left"},
+        "SWIPE_RIGHT": {"action": "tab_right"},
+    }
+    BINDINGS_FILE = None  # JSON file in the same format; replaces GESTURE_BINDINGS and is reloaded on change
+    BINDINGS_RELOAD_INTERVAL_S = 1.0  # How often BINDINGS_FILE is checked for changes
+
+    # Hand Roles (by MediaPipe handedness): "pointer" = cursor/scroll/click,
+    # "system" = swipes/volume/lock, "all" = everything
+    HAND_ROLES = {"Right": "pointer", "Left": "system"}
+    SINGLE_HAND_CONTROLS_ALL = True  # A lone hand gets every action regardless of its role
+
+    # Input Dispatch
+    INPUT_BACKEND = "pyautogui"  # "pyautogui", "null" (no input) or "recording" (tests/replays)
+    ASYNC_INPUT = True  # Inject input on a worker thread instead of the vision loop
+    INPUT_MIN_INTERVAL_MS = 100  # Repeats of the same discrete action closer than this are dropped
+    INPUT_MAX_PENDING = 16  # Discrete actions allowed to queue up before new ones are dropped
+
     # Mouse Control
-    MOUSE_SENSITIVITY = 1.5
     CLICK_THRESHOLD_DIST = 0.05  # Normalized distance for pinch
+    DRAG_START_DIST = 0.03  # Fingertip travel (normalized) before a "drag" pinch presses; less is a click
     SCROLL_SENSITIVITY = 30
     
     # Interface
@@ -31,5 +107,20 @@ class Settings:
     TEXT_THICKNESS = 1
     BOX_COLOR = (0, 255, 0)      # Green
 
+    # Diagnostics
+    LOG_FORMAT = "text"  # "text" or "json" (one JSON object per line)
+    LOG_FILE = None  # Also write DEBUG and above to this file
+    LOG_QUEUE_SIZE = 1024  # Records waiting for the log thread; beyond this new ones are dropped
+    LOG_RATE_PER_S = 2.0  # Sustained messages per second per call site (ERROR and above are never limited)
+    LOG_RATE_BURST = 10  # Messages a call site may emit at once before the rate limit applies
+    TRACING = False  # Record hot-path spans (see utils/tracing.py); main.py --trace also enables it
+    TRACE_BUFFER_SIZE = 65536  # Spans kept per thread; the oldest are overwritten
+    TRACE_SUMMARY_INTERVAL_S = 10.0  # Seconds between span summaries in the log
+
+    # Runtime Config (see config/runtime.py)
+    CONFIG_FILE = None  # TOML / JSON overrides for these settings, reloaded while running; main.py --config
+    CONFIG_PROFILE = None  # Profile from CONFIG_FILE to start with; None = the file's own `profile` key
+    CONFIG_POLL_INTERVAL_S = 1.0  # How often CONFIG_FILE is checked for changes
+
     # Application
     APP_NAME = "AGOS - Air Gesture Operating System"
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Check gesture confirmation (gestures/confirmation.py) across frame rates.
+
+A steadily held gesture must be confirmed, and released after it ends, within one
+window plus a frame at every rate, from 3 FPS up. Also checks that a single noisy
+frame doesn't switch the gesture and that repeated timestamps don't vote.
+
+Usage:
+    python -m AGOS.gestures.check_confirmation
+    python -m AGOS.gestures.check_confirmation --fps 3 5 10 30 60 --window-ms 250
+
+Prints every failed check; exits with status 1 if any failed.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from AGOS.config.settings import Settings
+from AGOS.gestures.confirmation import GestureConfirmer
+from AGOS.gestures.gesture_labels import Gestures
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gesture confirmation checks")
+    parser.add_argument("--fps", type=float, nargs="+", default=[3, 5, 10, 30], help="Frame rates to check")
+    parser.add_argument(
+        "--window-ms", type=int, default=Settings.CONFIRM_WINDOW_MS, help="Voting window (CONFIRM_WINDOW_MS)"
+    )
+    return parser.parse_args()
+
+def latency(confirmer, gesture, fps, start, frames=40):
+    """
+    Feeds `gesture` at `fps` from time `start`.
+    Returns:
+        (seconds until it was confirmed or None, time of the last frame fed)
+    """
+    t = start
+    for i in range(frames):
+        t = start + i / fps
+        confirmed = confirmer.update(gesture, t)
+        if confirmed == gesture:
+            return t - start, t
+    return None, t
+
+def check_fps(fps, window_ms):
+    problems = []
+    confirmer = GestureConfirmer(window_ms=window_ms)
+    limit = window_ms / 1000.0 + 1.0 / fps + 1e-6
+
+    held, t = latency(confirmer, Gestures.PINCH, fps, 1.0)
+    if held is None or held > limit:
+        problems.append(f"{fps:g} FPS: held Pinch confirmed after {held}, expected within {limit * 1000:.0f} ms")
+        return problems
+    # Hold it a while, then let go
+    for i in range(1, 20):
+        confirmer.update(Gestures.PINCH, t + i / fps)
+    released, _ = latency(confirmer, Gestures.IDLE, fps, t + 20 / fps)
+    if released is None or released > limit:
+        problems.append(f"{fps:g} FPS: Pinch released after {released}, expected within {limit * 1000:.0f} ms")
+    return problems
+
+def check_noise(window_ms, fps=30):
+    """
+    One misclassified frame in a held gesture must not change it (where the window spans several frames).
+    """
+    confirmer = GestureConfirmer(window_ms=window_ms)
+    for i in range(30):
+        confirmer.update(Gestures.PINCH, 1.0 + i / fps)
+    confirmed = [confirmer.update(Gestures.FIST, 1.0 + 30 / fps)]
+    confirmed += [confirmer.update(Gestures.PINCH, 1.0 + i / fps) for i in range(31, 35)]
+    if any(gesture != Gestures.PINCH for gesture in confirmed):
+        return [f"one Fist frame changed a held Pinch: {[g.name for g in confirmed]}"]
+    return []
+
+def check_repeats(window_ms):
+    """
+    Frames that repeat a timestamp cover no time and must not confirm on their own.
+    """
+    confirmer = GestureConfirmer(window_ms=window_ms)
+    for i in range(10):
+        confirmer.update(Gestures.IDLE, 1.0 + i / 30)
+    confirmed = [confirmer.update(Gestures.FIST, 2.0) for _ in range(10)]
+    if any(gesture != Gestures.IDLE for gesture in confirmed):
+        return ["repeated timestamps confirmed a gesture"]
+    return []
+
+def main():
+    args = parse_args()
+    problems = []
+    for fps in args.fps:
+        problems += check_fps(fps, args.window_ms)
+    problems += check_noise(args.window_ms) + check_repeats(args.window_ms)
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    checks = len(args.fps) + 2
+    print(f"Confirmation checks passed at {', '.join(f'{fps:g}' for fps in args.fps)} FPS" if not problems
+          else f"{len(problems)} problems in {checks} checks")
+    if problems:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Check the dynamic gesture recognizer (gestures/trajectory.py) on palm trajectories.
+
+The built-in suite runs generated trajectories sampled like a 30 FPS camera:
+swipes in every direction (stopping, and leaving the frame), flicks (and a short fast
+move that speeds up gradually, which is not one), and a sweep of
+circles over radius, duration, start angle and direction. Big circles must stay
+circles: half of one is as long as a swipe and must not be reported early as one.
+Recorded sessions can be checked too, each against the gestures it should produce.
+
+Usage:
+    python -m AGOS.gestures.check_trajectories
+    python -m AGOS.main --record circle.agr
+    python -m AGOS.gestures.check_trajectories --session CIRCLE_CW=circle.agr
+
+Prints every case that produced the wrong gestures; exits with status 1 if any did.
+"""
+
+import argparse
+import math
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from AGOS.replay.session import Session
+from AGOS.gestures.gesture_labels import Gestures
+from AGOS.gestures.trajectory import palm_centroid, recognize_trajectory
+
+FPS = 30
+REST_FRAMES = 10   # Still frames before and after every generated gesture
+
+CIRCLE_RADII = (0.1, 0.12, 0.15, 0.2, 0.25)
+CIRCLE_DURATIONS = (0.6, 0.8, 1.2)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Dynamic gesture trajectory checks")
+    parser.add_argument(
+        "--session", action="append", default=[], metavar="GESTURE[,GESTURE...]=PATH",
+        help="Recorded session (first hand) and the gestures it must produce, in order; repeatable"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Print passing cases too")
+    return parser.parse_args()
+
+def _timeline(duration, leave=False):
+    """
+    Frame times with rest before (and after, unless leave) and the progress 0..1 at each.
+    """
+    frames = int(round(duration * FPS))
+    t = np.arange(-REST_FRAMES, frames + (0 if leave else REST_FRAMES)) / FPS
+    return t + 1.0, np.clip(t / duration, 0.0, 1.0)
+
+def swipe(dx, dy, duration, leave=False):
+    """
+    Straight move with an eased start and stop; leave=True ends at full speed (out of view).
+    """
+    t, s = _timeline(duration, leave)
+    if not leave:
+        s = 0.5 - 0.5 * np.cos(math.pi * s)
+    return 0.5 + np.outer(s, (dx, dy)), t
+
+def ramp(dx, duration):
+    """
+    Straight move at constant acceleration, then an abrupt stop: fast, but no snap.
+    """
+    t, s = _timeline(duration)
+    return 0.5 + np.outer(s * s, (dx, 0.0)), t
+
+def circle(radius, duration, phase, clockwise):
+    """
+    One full turn at constant speed (clockwise on screen, y pointing down).
+    """
+    t, s = _timeline(duration)
+    angle = phase + (1.0 if clockwise else -1.0) * 2 * math.pi * s
+    return 0.5 + radius * np.stack([np.cos(angle), np.sin(angle)], axis=1), t
+
+def generated_cases():
+    """
+    Returns:
+        list of (name, points, times, expected list of Gestures)
+    """
+    cases = []
+    for gesture, dx, dy in ((Gestures.SWIPE_RIGHT, 0.5, 0.0), (Gestures.SWIPE_LEFT, -0.5, 0.0),
+                            (Gestures.SWIPE_DOWN, 0.0, 0.4), (Gestures.SWIPE_UP, 0.0, -0.4)):
+        for leave in (False, True):
+            name = f"{gesture.name.lower()} {'out of view' if leave else 'and stop'}"
+            cases.append((name, *swipe(dx, dy, 0.4, leave), [gesture]))
+
+    cases.append(("flick", *swipe(0.08, 0.0, 0.12), [Gestures.FLICK]))
+    cases.append(("gradual speed-up", *ramp(0.12, 0.3), []))
+
+    for radius in CIRCLE_RADII:
+        for duration in CIRCLE_DURATIONS:
+            for phase in range(4):
+                for gesture in (Gestures.CIRCLE_CW, Gestures.CIRCLE_CCW):
+                    name = f"{gesture.name.lower()} r={radius} {duration}s from {90 * phase} deg"
+                    points, times = circle(radius, duration, phase * math.pi / 2, gesture == Gestures.CIRCLE_CW)
+                    cases.append((name, points, times, [gesture]))
+    return cases
+
+def session_case(spec):
+    """
+    spec: "GESTURE[,GESTURE...]=path"; the palm of the first hand in every frame that has one
+    """
+    expected, path = spec.split("=", 1)
+    records = Session(path).records
+    records = records[records["count"] > 0]
+    points = np.array([palm_centroid(hand) for hand in records["landmarks"][:, 0]])
+    return path, points.reshape(-1, 2), records["timestamp"], [Gestures[name] for name in expected.split(",")]
+
+def main():
+    args = parse_args()
+    cases = generated_cases() + [session_case(spec) for spec in args.session]
+
+    failures = 0
+    for name, points, times, expected in cases:
+        got = [gesture for _, gesture in recognize_trajectory(points, times)]
+        if got != expected:
+            failures += 1
+            print(f"FAIL {name}: got {[g.name for g in got]}, expected {[g.name for g in expected]}")
+        elif args.verbose:
+            print(f"ok   {name}")
+
+    print(f"{len(cases) - failures}/{len(cases)} trajectories recognized as expected")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
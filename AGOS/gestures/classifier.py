@@ -0,0 +1,220 @@
+import os
+import numpy as np
+from AGOS.config.settings import Settings
+from AGOS.utils import tracing
+from AGOS.utils.logger import log
+from AGOS.gestures.features import hand_features, NUM_FEATURES
+from AGOS.gestures.gesture_labels import Gestures, GESTURE_LIST, GESTURE_CODES
+from AGOS.gestures.gesture_rules import GestureRules
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "gesture_model.npz")
+
+def _relu(x):
+    return np.maximum(x, 0.0, out=x)
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+class GestureMLP:
+    """
+    One hidden layer perceptron over hand_features: standardize -> W1 -> ReLU -> W2 -> softmax.
+    With the default 32 hidden units that is ~3k weights, two small matmuls per batch.
+    Pure NumPy for both inference and training (Adam, cross-entropy, L2).
+    """
+    def __init__(self, labels, hidden=32, seed=0):
+        """
+        labels: Gestures the model outputs, in output order
+        hidden: hidden layer width
+        """
+        rng = np.random.default_rng(seed)
+        self.labels = list(labels)
+        self.codes = np.array([GESTURE_CODES[g] for g in self.labels], dtype=np.int8)
+        self.mean = np.zeros(NUM_FEATURES, dtype=np.float32)
+        self.std = np.ones(NUM_FEATURES, dtype=np.float32)
+        self.w1 = (rng.standard_normal((NUM_FEATURES, hidden)) * np.sqrt(2.0 / NUM_FEATURES)).astype(np.float32)
+        self.b1 = np.zeros(hidden, dtype=np.float32)
+        self.w2 = (rng.standard_normal((hidden, len(self.labels))) * np.sqrt(1.0 / hidden)).astype(np.float32)
+        self.b2 = np.zeros(len(self.labels), dtype=np.float32)
+
+    def probabilities(self, features):
+        """
+        features: (N, NUM_FEATURES) array
+        Returns:
+            (N, K) class probabilities, columns in self.labels order
+        """
+        x = (features - self.mean) / self.std
+        h = _relu(x @ self.w1 + self.b1)
+        return _softmax(h @ self.w2 + self.b2)
+
+    def fit(self, features, targets, epochs=200, lr=1e-2, batch_size=256, l2=1e-4, seed=0):
+        """
+        Trains on labelled features.
+        features: (N, NUM_FEATURES) array
+        targets: (N,) indices into self.labels
+        Returns:
+            list of the mean training loss per epoch
+        """
+        rng = np.random.default_rng(seed)
+        features = np.asarray(features, dtype=np.float32)
+        targets = np.asarray(targets, dtype=np.int64)
+        self.mean = features.mean(axis=0)
+        self.std = np.maximum(features.std(axis=0), 1e-3).astype(np.float32)
+        x_all = (features - self.mean) / self.std
+
+        params = [self.w1, self.b1, self.w2, self.b2]
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        step = 0
+        losses = []
+
+        for _ in range(epochs):
+            order = rng.permutation(len(x_all))
+            total = 0.0
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                x, y = x_all[idx], targets[idx]
+                n = len(idx)
+
+                # Forward
+                z1 = x @ self.w1 + self.b1
+                h = np.maximum(z1, 0.0)
+                p = _softmax(h @ self.w2 + self.b2)
+                total += -np.log(p[np.arange(n), y] + 1e-12).sum()
+
+                # Backward (softmax + cross-entropy)
+                p[np.arange(n), y] -= 1.0
+                p /= n
+                g_w2 = h.T @ p + l2 * self.w2
+                g_b2 = p.sum(axis=0)
+                g_h = (p @ self.w2.T) * (z1 > 0)
+                g_w1 = x.T @ g_h + l2 * self.w1
+                g_b1 = g_h.sum(axis=0)
+
+                step += 1
+                for i, grad in enumerate((g_w1, g_b1, g_w2, g_b2)):
+                    m[i] = beta1 * m[i] + (1 - beta1) * grad
+                    v[i] = beta2 * v[i] + (1 - beta2) * grad * grad
+                    m_hat = m[i] / (1 - beta1 ** step)
+                    v_hat = v[i] / (1 - beta2 ** step)
+                    params[i] -= (lr * m_hat / (np.sqrt(v_hat) + eps)).astype(np.float32)
+            losses.append(total / len(x_all))
+        return losses
+
+    def save(self, path):
+        np.savez(path, labels=np.array([g.name for g in self.labels]), mean=self.mean, std=self.std,
+                 w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            labels = [Gestures[name] for name in data["labels"]]
+            model = cls(labels, hidden=data["w1"].shape[1])
+            for name in ("mean", "std", "w1", "b1", "w2", "b2"):
+                setattr(model, name, data[name].astype(np.float32))
+        if model.w1.shape[0] != NUM_FEATURES:
+            raise ValueError(f"{path} was trained on {model.w1.shape[0]} features, expected {NUM_FEATURES}")
+        return model
+
+
+class LearnedGestureClassifier:
+    """
+    Static gesture classifier backed by a GestureMLP, with the rules as fallback.
+
+    Same interface as GestureRules (detect_static_gesture / detect_static_gestures /
+    predict), so it can be swapped in anywhere. Hands the model isn't confident
+    about (below min_confidence) get the rule-based label instead; without a model
+    file every hand does. Those hands pay for both classifiers (train_classifier
+    reports the cost per hand with and without the fallback).
+    """
+    def __init__(self, model_path=None, fallback=None, min_confidence=None):
+        """
+        model_path: .npz written by train_classifier (default: gestures/gesture_model.npz)
+        fallback: classifier used for low-confidence hands (default: GestureRules())
+        min_confidence: model probability needed to override the fallback
+            (default Settings.CLASSIFIER_MIN_CONFIDENCE)
+        """
+        self.fallback = fallback if fallback is not None else GestureRules()
+        self.min_confidence = Settings.CLASSIFIER_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        model_path = model_path or DEFAULT_MODEL_PATH
+        self.model_path = model_path
+        self.model = None
+        if os.path.exists(model_path):
+            self.model = GestureMLP.load(model_path)
+            log.info(f"Gesture model loaded from {model_path} ({len(self.model.labels)} gestures)")
+        else:
+            log.warning(f"No gesture model at {model_path}, using rule-based classification")
+        self._features = np.empty((0, NUM_FEATURES), dtype=np.float32)
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py).
+        """
+        self.min_confidence = Settings.CLASSIFIER_MIN_CONFIDENCE
+
+    @tracing.traced("classifier.predict")
+    def predict(self, hands, handedness=None):
+        """
+        hands: (N, 21, 3) landmark array
+        handedness: N labels, lets left hands be mirrored
+        Returns:
+            (N,) int8 gesture codes, (N,) float32 confidences
+        """
+        if self.model is None or not len(hands):
+            return self.fallback.predict(hands, handedness)
+
+        if len(self._features) < len(hands):
+            self._features = np.empty((len(hands), NUM_FEATURES), dtype=np.float32)
+        features = hand_features(hands, handedness, out=self._features[:len(hands)])
+        probs = self.model.probabilities(features)
+        best = probs.argmax(axis=1)
+        confidence = probs[np.arange(len(best)), best].astype(np.float32)
+        codes = self.model.codes[best]
+
+        unsure = confidence < self.min_confidence
+        if unsure.all():
+            # Usually the single visible hand: skip the masking, which costs as much as the rules
+            return self.fallback.predict(hands, handedness)
+        if unsure.any():
+            labels = None if handedness is None else [label for label, u in zip(handedness, unsure) if u]
+            codes[unsure], confidence[unsure] = self.fallback.predict(hands[unsure], labels)
+        return codes, confidence
+
+    def detect_static_gesture(self, landmarks, handedness=None):
+        """
+        Classifies one (21, 3) hand.
+        """
+        if landmarks is None:
+            return Gestures.IDLE
+        labels = None if handedness is None else [handedness]
+        return GESTURE_LIST[self.predict(landmarks[None], labels)[0][0]]
+
+    def detect_static_gestures(self, hands, handedness=None):
+        """
+        Classifies every hand in an (N, 21, 3) array.
+        Returns:
+            list of N Gestures
+        """
+        return [GESTURE_LIST[code] for code in self.predict(hands, handedness)[0]]
+
+
+CLASSIFIERS = {
+    "rules": GestureRules,
+    "mlp": LearnedGestureClassifier,
+}
+
+def make_classifier(name=None, model_path=None):
+    """
+    Builds the static gesture classifier by name ("rules" or "mlp").
+    Defaults to Settings.GESTURE_CLASSIFIER and Settings.GESTURE_MODEL_PATH.
+    """
+    name = name or Settings.GESTURE_CLASSIFIER
+    if name not in CLASSIFIERS:
+        raise ValueError(f"Unknown gesture classifier {name!r}, expected one of {sorted(CLASSIFIERS)}")
+    if name == "mlp":
+        return LearnedGestureClassifier(model_path or Settings.GESTURE_MODEL_PATH)
+    return CLASSIFIERS[name]()
@@ -0,0 +1,149 @@
+import math
+from collections import deque
+from AGOS.gestures.gesture_labels import Gestures, GESTURE_LIST, GESTURE_CODES
+from AGOS.config.settings import Settings
+
+VOTING_MODES = ("majority", "weighted")
+IDLE_CODE = GESTURE_CODES[Gestures.IDLE]
+
+# Settings baked into a GestureConfirmer when it is built
+CONFIRM_SETTINGS = ("CONFIRM_WINDOW_MS", "CONFIRM_MODE", "CONFIRM_ENTER", "CONFIRM_EXIT",
+                    "CONFIRM_HYSTERESIS", "CONFIRM_MIN_FRAMES", "FPS_TARGET")
+
+class GestureConfirmer:
+    """
+    Confirms gestures by voting over a sliding time window instead of N identical frames.
+
+    Each raw classification votes for its label over the interval it covers (the gap
+    since the previous frame, at most one window), with weight equal to that time,
+    times its confidence in "weighted" mode. Running per-label totals make every
+    update O(1) amortized: add the new vote, subtract whatever part of the oldest
+    votes slid out of the window. Votes are trimmed rather than dropped whole, so a
+    single vote can fill the window when frames are further apart than its length.
+
+    A label's support is its vote weight divided by the window length, so thresholds
+    mean the same thing at 15 or 60 FPS. Hysteresis per gesture:
+    - the confirmed gesture is kept until its support drops below its `exit`
+      threshold, then the state falls back to IDLE
+    - from IDLE, the best supported gesture is confirmed once its support reaches
+      its `enter` threshold (and it has at least `min_frames` votes, or as many
+      frames as fit in the window at the observed frame rate, if fewer)
+    One noisy frame only removes a frame's worth of support, so it no longer
+    restarts confirmation, and a short burst of noise can't switch gestures.
+    """
+    def __init__(self, window_ms=None, mode=None, enter=None, exit=None, overrides=None,
+                 min_frames=None, nominal_fps=None):
+        """
+        Every argument defaults to its Settings.CONFIRM_* value (nominal_fps: FPS_TARGET).
+        window_ms: length of the voting window
+        mode: "majority" (every frame votes by its duration) or "weighted" (also by confidence)
+        enter, exit: default support thresholds (0..1, enter > exit)
+        overrides: {gesture name: (enter, exit)} for gestures that need other thresholds
+        min_frames: votes a gesture needs in the window to be confirmed (guards against a
+            single frame after a stall); capped by the frames the window holds at the observed FPS
+        nominal_fps: frame interval assumed for the first vote
+        """
+        window_ms = Settings.CONFIRM_WINDOW_MS if window_ms is None else window_ms
+        mode = Settings.CONFIRM_MODE if mode is None else mode
+        enter = Settings.CONFIRM_ENTER if enter is None else enter
+        exit = Settings.CONFIRM_EXIT if exit is None else exit
+        overrides = Settings.CONFIRM_HYSTERESIS if overrides is None else overrides
+        min_frames = Settings.CONFIRM_MIN_FRAMES if min_frames is None else min_frames
+        nominal_fps = Settings.FPS_TARGET if nominal_fps is None else nominal_fps
+        if mode not in VOTING_MODES:
+            raise ValueError(f"Unknown voting mode {mode!r}, expected one of {VOTING_MODES}")
+        self.window_s = window_ms / 1000.0
+        self.weighted = mode == "weighted"
+        self.nominal_dt = 1.0 / nominal_fps
+        self.min_frames = min_frames
+        self.frame_dt = None   # Smoothed frame interval (stalls count as two windows at most)
+
+        self.enter = [enter] * len(GESTURE_LIST)
+        self.exit = [exit] * len(GESTURE_LIST)
+        for name, (g_enter, g_exit) in overrides.items():
+            code = GESTURE_CODES[Gestures[name]]
+            self.enter[code] = g_enter
+            self.exit[code] = g_exit
+
+        self.votes = deque()                      # [start, end, code, weight per second]
+        self.weights = [0.0] * len(GESTURE_LIST)  # Running vote weight per label
+        self.counts = [0] * len(GESTURE_LIST)     # Votes per label in the window
+        self.current = IDLE_CODE
+        self._last_t = None
+
+    def update(self, gesture, timestamp, confidence=1.0):
+        """
+        gesture: raw classification of this frame
+        timestamp: its capture time in seconds
+        confidence: classifier confidence (used in "weighted" mode)
+        Returns:
+            confirmed Gesture
+        """
+        if self._last_t is None:
+            dt = self.nominal_dt
+        elif timestamp <= self._last_t:
+            # Repeated frame (stale or predicted result): it covers no time, so it doesn't vote
+            return GESTURE_LIST[self.current]
+        else:
+            interval = min(timestamp - self._last_t, 2 * self.window_s)
+            self.frame_dt = interval if self.frame_dt is None else self.frame_dt + 0.1 * (interval - self.frame_dt)
+            dt = min(interval, self.window_s)
+        self._last_t = timestamp
+
+        rate = confidence if self.weighted else 1.0
+        code = GESTURE_CODES[gesture]
+        self.votes.append([timestamp - dt, timestamp, code, rate])
+        self.weights[code] += dt * rate
+        self.counts[code] += 1
+        self._evict(timestamp - self.window_s)
+
+        # Leaving: the confirmed gesture lost too much support
+        if self.support(self.current) < self.exit[self.current]:
+            self.current = IDLE_CODE
+
+        # Entering (only from IDLE): the best supported label, out of a fixed, small set
+        if self.current == IDLE_CODE:
+            best = max(range(len(self.weights)), key=self.weights.__getitem__)
+            # At low FPS the window can't hold min_frames frames; don't demand more than fit
+            frame_dt = self.nominal_dt if self.frame_dt is None else self.frame_dt
+            min_frames = min(self.min_frames, max(1, math.ceil(self.window_s / frame_dt - 1e-6)))
+            if self.support(best) >= self.enter[best] and self.counts[best] >= min_frames:
+                self.current = best
+
+        return GESTURE_LIST[self.current]
+
+    def _evict(self, cutoff):
+        votes = self.votes
+        # Votes are contiguous, so only the oldest one can straddle the cutoff
+        while votes and votes[0][0] < cutoff:
+            vote = votes[0]
+            start, end, code, rate = vote
+            if end <= cutoff + 1e-9:
+                votes.popleft()
+                self.weights[code] -= (end - start) * rate
+                self.counts[code] -= 1
+            else:
+                self.weights[code] -= (cutoff - start) * rate
+                vote[0] = cutoff
+                break
+        if not votes:
+            # Clear accumulated float error whenever the window empties
+            self.weights = [0.0] * len(GESTURE_LIST)
+
+    def support(self, code):
+        """
+        Fraction of the window voting for the label with this code.
+        """
+        return max(self.weights[code], 0.0) / self.window_s
+
+    @property
+    def gesture(self):
+        return GESTURE_LIST[self.current]
+
+    def reset(self):
+        self.votes.clear()
+        self.weights = [0.0] * len(GESTURE_LIST)
+        self.counts = [0] * len(GESTURE_LIST)
+        self.current = IDLE_CODE
+        self.frame_dt = None
+        self._last_t = None
@@ -0,0 +1,51 @@
+import numpy as np
+from AGOS.vision.landmark_utils import WRIST, MIDDLE_FINGER_MCP
+
+# Features per hand: 21 (x, y) in the hand frame, 21 z, hand direction (2)
+NUM_FEATURES = 21 * 2 + 21 + 2
+
+def hand_features(hands, handedness=None, out=None):
+    """
+    Rotation/scale-normalized features for a batch of hands.
+
+    Landmarks are moved so the wrist is at the origin, rotated so the wrist ->
+    middle-finger MCP axis points up, and scaled by that axis' length, so the
+    shape doesn't change when the hand turns or moves closer to the camera.
+    Left hands are mirrored onto right ones. Because rotation is divided out,
+    the hand's direction in the frame is appended as its own feature (thumbs up
+    and down only differ by orientation).
+
+    hands: (N, 21, 3) landmark array
+    handedness: N labels ("Left" hands are mirrored), or None
+    out: optional (N, NUM_FEATURES) float32 array to write into
+    Returns:
+        (N, NUM_FEATURES) float32 array
+    """
+    hands = np.asarray(hands, dtype=np.float32)
+    n = len(hands)
+    if out is None:
+        out = np.empty((n, NUM_FEATURES), dtype=np.float32)
+
+    rel = hands[:, :, :2] - hands[:, WRIST:WRIST + 1, :2]            # (N, 21, 2)
+    axis = rel[:, MIDDLE_FINGER_MCP]                                  # (N, 2)
+    scale = np.maximum(np.hypot(axis[:, 0], axis[:, 1]), 1e-6)
+    ux, uy = axis[:, 0] / scale, axis[:, 1] / scale                   # Unit hand direction
+
+    # Hand frame: y along the hand axis (towards the fingers), x perpendicular to it,
+    # pointing to image-right for an upright hand (image y points down)
+    inv = (1.0 / scale)[:, None]
+    x_h = (rel[:, :, 0] * -uy[:, None] + rel[:, :, 1] * ux[:, None]) * inv
+    y_h = (rel[:, :, 0] * ux[:, None] + rel[:, :, 1] * uy[:, None]) * inv
+
+    if handedness is not None:
+        mirror = np.array([label == "Left" for label in handedness[:n]], dtype=bool)
+        if mirror.any():
+            x_h[mirror] *= -1
+            ux = np.where(mirror, -ux, ux)
+
+    out[:, 0:42:2] = x_h
+    out[:, 1:42:2] = y_h
+    out[:, 42:63] = hands[:, :, 2] * inv
+    out[:, 63] = ux
+    out[:, 64] = uy
+    return out
@@ -11,3 +11,17 @@ class Gestures(Enum):
     THUMBS_DOWN = "Thumbs Down"
     SWIPE_LEFT = "Swipe Left"
     SWIPE_RIGHT = "Swipe Right"
+    # Appended, not inserted: GESTURE_CODES must stay stable for recordings and models
+    SWIPE_UP = "Swipe Up"
+    SWIPE_DOWN = "Swipe Down"
+    CIRCLE_CW = "Circle CW"
+    CIRCLE_CCW = "Circle CCW"
+    FLICK = "Flick"
+
+# Recognized from the palm path and reported once, on the frame they complete
+MOTION_GESTURES = frozenset({Gestures.SWIPE_LEFT, Gestures.SWIPE_RIGHT, Gestures.SWIPE_UP, Gestures.SWIPE_DOWN,
+                             Gestures.CIRCLE_CW, Gestures.CIRCLE_CCW, Gestures.FLICK})
+
+# Stable integer codes for array-based (batch) classification
+GESTURE_LIST = list(Gestures)
+GESTURE_CODES = {g: i for i, g in enumerate(GESTURE_LIST)}
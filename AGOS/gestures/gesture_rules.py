@@ -1,7 +1,45 @@
-import mediapipe as mp
+import numpy as np
 from AGOS.vision.landmark_utils import LandmarkUtils
 from AGOS.config.settings import Settings
-from AGOS.gestures.gesture_labels import Gestures
+from AGOS.utils import tracing
+from AGOS.gestures.gesture_labels import Gestures, GESTURE_LIST, GESTURE_CODES
+
+# Rule inputs per hand: pinch, 5 finger extensions (thumb..pinky), upright,
+# thumb tip above its IP joint, thumb tip below it
+NUM_RULE_INPUTS = 9
+RULE_BITS = (1 << np.arange(NUM_RULE_INPUTS)).astype(np.int16)
+
+def _rule_table():
+    """
+    Gesture code for every combination of rule inputs (index bit i = input i), so
+    classify_batch is one table lookup per hand instead of a chain of masks.
+    """
+    state = (np.arange(1 << NUM_RULE_INPUTS)[:, None] & RULE_BITS) != 0
+    is_pinch, thumb, index, middle, ring, pinky, is_upright, tip_above, tip_below = state.T
+    folded = ~(index | middle | ring | pinky)
+
+    # Same priority order as the if-chain in detect_static_gesture
+    conditions = [
+        is_pinch,
+        state[:, 1:6].all(axis=1),
+        index & ~middle & ~ring & ~pinky,
+        index & middle & ~ring & ~pinky,
+        folded & tip_above & is_upright,
+        folded & tip_below,
+        folded,
+    ]
+    choices = [GESTURE_CODES[g] for g in (
+        Gestures.PINCH,
+        Gestures.OPEN_PALM,
+        Gestures.INDEX_FINGER,
+        Gestures.TWO_FINGERS,
+        Gestures.THUMBS_UP,
+        Gestures.THUMBS_DOWN,
+        Gestures.FIST,
+    )]
+    return np.select(conditions, choices, default=GESTURE_CODES[Gestures.IDLE]).astype(np.int8)
+
+RULE_TABLE = _rule_table()
 
 class GestureRules:
     def __init__(self):
@@ -28,18 +66,20 @@ class GestureRules:
         self.PINKY_DIP = 19
         self.PINKY_TIP = 20
 
+    @tracing.traced("rules.detect_static_gesture")
     def detect_static_gesture(self, landmarks):
         """
         Classifies the static gesture from landmarks.
+        landmarks: (21, 3) array of one hand (see LandmarkArray)
         """
-        if not landmarks:
+        if landmarks is None:
             return Gestures.IDLE
 
-        lm = landmarks.landmark
+        lm = landmarks
         
         # Check Hand Orientation (Upright vs Inverted)
         # Upright: Wrist Y > Middle Finger MCP Y (since Y increases downwards)
-        is_upright = lm[self.WRIST].y > lm[self.MIDDLE_FINGER_MCP].y
+        is_upright = lm[self.WRIST, 1] > lm[self.MIDDLE_FINGER_MCP, 1]
         
         # Finger states (True = extended, False = folded)
         fingers = self._get_finger_states(landmarks, is_upright)
@@ -60,7 +100,7 @@ class GestureRules:
             return Gestures.PINCH
         
         # 2. Open Palm: All fingers extended
-        if all(fingers):
+        if fingers.all():
             return Gestures.OPEN_PALM
         
         # 3. Index Finger (Pointing)
@@ -75,12 +115,12 @@ class GestureRules:
             
         # 5. Thumbs Up / Thumbs Down / Fist
         # Common trait: Fingers (Index-Pinky) are folded.
-        if not any(fingers[1:]): # Index, Middle, Ring, Pinky are folded
+        if not fingers[1:].any(): # Index, Middle, Ring, Pinky are folded
             
             # Analyze Thumb
-            thumb_tip_y = lm[self.THUMB_TIP].y
-            thumb_ip_y = lm[self.THUMB_IP].y
-            thumb_mcp_y = lm[self.THUMB_MCP].y
+            thumb_tip_y = lm[self.THUMB_TIP, 1]
+            thumb_ip_y = lm[self.THUMB_IP, 1]
+            thumb_mcp_y = lm[self.THUMB_MCP, 1]
             
             # Helper to check if thumb is significantly pointing vertical
             # Threshold to ensure it's not just "kinda" up
@@ -110,48 +150,68 @@ class GestureRules:
         # Default
         return Gestures.IDLE
 
+    @tracing.traced("rules.detect_static_gestures")
+    def detect_static_gestures(self, hands, handedness=None):
+        """
+        Classifies every hand in an (N, 21, 3) array.
+        handedness: unused, accepted for interface parity with LearnedGestureClassifier
+        Returns:
+            list of N Gestures
+        """
+        return [GESTURE_LIST[code] for code in self.classify_batch(hands)]
+
+    def predict(self, hands, handedness=None):
+        """
+        classify_batch in the classifier interface (see gestures/classifier.py).
+        Rules are either satisfied or not, so every confidence is 1.
+        Returns:
+            (N,) int8 gesture codes, (N,) float32 confidences
+        """
+        return self.classify_batch(hands), np.ones(len(hands), dtype=np.float32)
+
+    def classify_batch(self, hands, pinch_threshold=None, chunk_size=65536):
+        """
+        Vectorized detect_static_gesture: same rules, one NumPy pass per chunk.
+        Meant for multi-hand frames and re-scoring recorded sessions (e.g. threshold tuning).
+        hands: (N, 21, 3) landmark array
+        pinch_threshold: override for Settings.CLICK_THRESHOLD_DIST
+        chunk_size: hands per pass, bounds temporary memory on huge inputs
+        Returns:
+            (N,) int8 array of gesture codes (see GESTURE_CODES / GESTURE_LIST)
+        """
+        if pinch_threshold is None:
+            pinch_threshold = Settings.CLICK_THRESHOLD_DIST
+        hands = np.asarray(hands, dtype=np.float32)
+        codes = np.empty(len(hands), dtype=np.int8)
+        for start in range(0, len(hands), chunk_size):
+            chunk = hands[start:start + chunk_size]
+            codes[start:start + len(chunk)] = self._classify_chunk(chunk, pinch_threshold)
+        return codes
+
+    def _classify_chunk(self, hands, pinch_threshold):
+        # Each hand's rule inputs packed into the bits of RULE_TABLE's index
+        state = np.empty((len(hands), NUM_RULE_INPUTS), dtype=bool)
+        is_upright = LandmarkUtils.is_upright(hands)
+        state[:, 1:6] = LandmarkUtils.finger_extension(hands, is_upright)
+        state[:, 6] = is_upright
+
+        # Pinch distance in float64, like the scalar path (math.hypot), so thresholds agree exactly
+        delta = (hands[:, self.THUMB_TIP, :2].astype(np.float64) -
+                 hands[:, self.INDEX_FINGER_TIP, :2].astype(np.float64))
+        state[:, 0] = np.hypot(delta[:, 0], delta[:, 1]) < pinch_threshold
+
+        thumb_tip_y = hands[:, self.THUMB_TIP, 1]
+        thumb_ip_y = hands[:, self.THUMB_IP, 1]
+        state[:, 7] = thumb_tip_y < thumb_ip_y
+        state[:, 8] = thumb_tip_y > thumb_ip_y
+        return RULE_TABLE[state @ RULE_BITS]
+
     def _get_finger_states(self, landmarks, is_upright):
         """
-        Returns list of booleans [Thumb, Index, Middle, Ring, Pinky]
+        Returns bool array [Thumb, Index, Middle, Ring, Pinky]
         True if extended, False if folded.
         Adjusts logic based on hand orientation.
         """
-        states = []
-        lm = landmarks.landmark
-        
-        # Index (8), Middle (12), Ring (16), Pinky (20)
-        # PIPs: 6, 10, 14, 18
-        for tip, pip in [(8, 6), (12, 10), (16, 14), (20, 18)]:
-            if is_upright:
-                # Upright: Extended if Tip Y < PIP Y (Tip above PIP)
-                extended = lm[tip].y < lm[pip].y
-            else:
-                # Inverted: Extended if Tip Y > PIP Y (Tip below PIP)
-                extended = lm[tip].y > lm[pip].y
-            states.append(extended)
-            
-        # Thumb Logic:
-        # Thumb doesn't follow strict Up/Down logic like fingers due to rotation.
-        # We'll consider thumb "Extended" if it's far from the Palm Center (Index MCP roughly).
-        # Or simpler: Is Tip further from MCP than IP is?
-        # Let's use a generic openness check for the thumb.
-        thumb_tip = lm[4]
-        thumb_mcp = lm[2]
-        thumb_ip = lm[3]
-        pinky_mcp = lm[17]
-        
-        # Check distance from Pinky MCP (opposite side of palm)
-        # If open, thumb tip is far from pinky. If closed (fist), it's closer.
-        # This is robust to rotation.
-        dist_tip_pinky = LandmarkUtils.calculate_distance(thumb_tip, pinky_mcp)
-        dist_ip_pinky = LandmarkUtils.calculate_distance(thumb_ip, pinky_mcp)
-        
-        # If Tip is further away -> Extended.
-        # But for "Thumbs Up", it might not be maximizing this distance.
-        # Let's stick to the calling function handling specific Thumb Up/Down cases.
-        # Here we just want a generic "Is Thumb participating in open hand?"
-        # For "Open Palm", thumb is extended.
-        
-        thumb_extended = dist_tip_pinky > dist_ip_pinky
-        
-        return [thumb_extended] + states
+        # Thumb doesn't follow strict Up/Down logic like fingers due to rotation,
+        # so finger_extension checks its distance from the Pinky MCP instead.
+        return LandmarkUtils.finger_extension(landmarks[None], np.array([is_upright]))[0]
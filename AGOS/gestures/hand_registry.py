@@ -0,0 +1,121 @@
+import time
+import numpy as np
+from AGOS.gestures.gesture_state import GestureState
+from AGOS.gestures.gesture_labels import Gestures
+from AGOS.vision.filters import make_filter, FILTER_SETTINGS
+from AGOS.config.settings import Settings
+
+class HandTrack:
+    """
+    One physical hand followed across frames, with its own gesture history.
+    """
+    def __init__(self, track_id, handedness, centroid, clock=time.time):
+        self.id = track_id
+        self.handedness = handedness  # "Left" / "Right" / None
+        self.centroid = centroid      # Normalized (x, y) palm centroid
+        self.state = GestureState(clock)  # Confirmation history, palm trajectory
+        self.gesture = Gestures.IDLE  # Confirmed static gesture for the current frame
+        self.motion = None            # Dynamic gesture completed on this frame, if any (one-shot)
+        self.index = -1               # Row in this frame's landmark array, -1 if not seen
+        self.missed = 0               # Consecutive frames without a detection
+        # Optional smoothing of this hand's (21, 3) landmarks
+        self.filter = make_filter(Settings.LANDMARK_FILTER, (21, 3))
+
+    def configure(self, changes):
+        self.state.configure(changes)
+        if "LANDMARK_FILTER" in changes or any(key in changes for key in FILTER_SETTINGS):
+            self.filter = make_filter(Settings.LANDMARK_FILTER, (21, 3))
+
+    def smooth(self, landmarks, timestamp):
+        """
+        Filters the hand's landmarks in place (no-op if LANDMARK_FILTER is "none").
+        """
+        if self.filter is not None:
+            landmarks[...] = self.filter.filter(landmarks, timestamp)
+        return landmarks
+
+class HandRegistry:
+    """
+    Gives detected hands stable ids across frames.
+    A detection continues an existing track if the handedness agrees and its centroid
+    is the nearest one within HAND_MATCH_MAX_DIST; otherwise it starts a new track.
+    """
+    def __init__(self, max_dist=None, max_missed=None, clock=time.time):
+        """
+        max_dist, max_missed: default to Settings.HAND_MATCH_MAX_DIST / HAND_LOST_FRAMES
+        clock: time source handed to each track's GestureState
+        """
+        self.clock = clock
+        self.max_dist = Settings.HAND_MATCH_MAX_DIST if max_dist is None else max_dist
+        self.max_missed = Settings.HAND_LOST_FRAMES if max_missed is None else max_missed
+        self.tracks = []
+        self._next_id = 0
+
+    def update(self, hands, handedness):
+        """
+        hands: (N, 21, 3) landmark array for this frame
+        handedness: list of N labels (entries may be None)
+        Returns:
+            tracks visible this frame, ordered by their row in `hands`
+        """
+        centroids = hands[:, :, :2].mean(axis=1) if len(hands) else np.empty((0, 2), dtype=np.float32)
+        for track in self.tracks:
+            track.index = -1
+
+        self._match(centroids, handedness)
+
+        visible = []
+        for i, centroid in enumerate(centroids):
+            track = next((t for t in self.tracks if t.index == i), None)
+            if track is None:
+                track = HandTrack(self._next_id, handedness[i], centroid, self.clock)
+                track.index = i
+                self._next_id += 1
+                self.tracks.append(track)
+            track.centroid = centroid
+            track.handedness = handedness[i] or track.handedness
+            visible.append(track)
+
+        for track in self.tracks:
+            track.missed = 0 if track.index >= 0 else track.missed + 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        return visible
+
+    def _match(self, centroids, handedness):
+        """
+        Greedy nearest-centroid assignment of detections to existing tracks.
+        """
+        if not self.tracks or not len(centroids):
+            return
+
+        track_centroids = np.array([t.centroid for t in self.tracks], dtype=np.float32)
+        dist = np.linalg.norm(centroids[:, None, :] - track_centroids[None, :, :], axis=2)
+
+        for i, label in enumerate(handedness):
+            for j, track in enumerate(self.tracks):
+                if label and track.handedness and label != track.handedness:
+                    dist[i, j] = np.inf
+        dist[dist > self.max_dist] = np.inf
+
+        # At most min(N, T) rounds; N and T are the (small) hand counts
+        for _ in range(min(dist.shape)):
+            i, j = np.unravel_index(np.argmin(dist), dist.shape)
+            if not np.isfinite(dist[i, j]):
+                break
+            self.tracks[j].index = int(i)
+            dist[i, :] = np.inf
+            dist[:, j] = np.inf
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py): updates matching limits and every
+        live track's gesture state and filter. New tracks read the new settings anyway.
+        """
+        self.max_dist = Settings.HAND_MATCH_MAX_DIST
+        self.max_missed = Settings.HAND_LOST_FRAMES
+        for track in self.tracks:
+            track.configure(changes)
+
+    def reset(self):
+        self.tracks = []
@@ -0,0 +1,90 @@
+"""
+Per-frame gesture logic shared by the live loop (main.py) and session replays.
+Each step is a separate function so callers can time them individually.
+"""
+
+from AGOS.utils import tracing
+from AGOS.gestures.gesture_labels import GESTURE_LIST
+
+@tracing.traced("gestures.track_hands")
+def track_hands(hands, handedness, registry, timestamp):
+    """
+    Matches this frame's hands to tracks and smooths their landmarks in place.
+    hands: (N, 21, 3) landmark array, handedness: N labels
+    timestamp: capture time of the frame in seconds
+    Returns:
+        visible HandTracks
+    """
+    tracks = registry.update(hands, handedness)
+    for track in tracks:
+        track.smooth(hands[track.index], timestamp)
+    return tracks
+
+@tracing.traced("gestures.confirm")
+def confirm_gestures(tracks, hands, raw_gestures, timestamp, confidences=None):
+    """
+    Runs each track's confirmation and dynamic-gesture detection and sets track.gesture
+    (confirmed static gesture) and track.motion (swipe, circle or flick completed on this
+    frame, else None). Motions are separate one-shot events, so a swipe in the middle of
+    a pinch doesn't interrupt it.
+    raw_gestures: per-row static classification of `hands`
+    confidences: per-row classifier confidence (weights votes in "weighted" mode)
+    """
+    for track in tracks:
+        confidence = 1.0 if confidences is None else float(confidences[track.index])
+        track.gesture = track.state.update_gesture(raw_gestures[track.index], timestamp, confidence)
+        track.motion = track.state.check_dynamic(hands[track.index], timestamp)
+    return tracks
+
+def classify_hands(hands, handedness, classifier):
+    """
+    Static classification of every row of `hands` in one batched call.
+    classifier: GestureRules or LearnedGestureClassifier (see make_classifier)
+    Returns:
+        list of Gestures, (N,) confidences
+    """
+    codes, confidences = classifier.predict(hands, handedness)
+    return [GESTURE_LIST[code] for code in codes], confidences
+
+def recognize_hands(hands, handedness, registry, classifier, timestamp):
+    """
+    Static + dynamic recognition for every visible hand.
+    Returns:
+        visible HandTracks with .gesture and .motion set
+    """
+    tracks = track_hands(hands, handedness, registry, timestamp)
+    if not tracks:
+        return tracks
+
+    # One vectorized pass for all hands
+    raw_gestures, confidences = classify_hands(hands, handedness, classifier)
+    return confirm_gestures(tracks, hands, raw_gestures, timestamp, confidences)
+
+def execute_actions(tracks, hands, mapper, timestamp=None):
+    """
+    Routes each hand's gesture, and its motion if one completed, to the mapper
+    according to its role. Call on every frame in control mode, also without hands,
+    so the mapper can end the gestures of hands that left.
+    """
+    for track in tracks:
+        role = mapper.role_for(track.handedness, len(tracks))
+        mapper.execute(track.gesture, hands[track.index], track.id, role, timestamp)
+        if track.motion is not None:
+            mapper.trigger(track.motion, hands[track.index], track.id, role, timestamp)
+    mapper.end_frame({track.id for track in tracks}, timestamp)
+
+def gesture_label(track):
+    """
+    Gesture to show for a track: its motion on the frame one completes, else its static gesture.
+    """
+    return (track.motion or track.gesture).value
+
+def describe(tracks):
+    """
+    HUD text for the visible hands.
+    """
+    if not tracks:
+        return "No Hand"
+    if len(tracks) == 1:
+        return gesture_label(tracks[0])
+    return " | ".join(f"{(t.handedness or '?')[0]}: {gesture_label(t)}" for t in tracks)
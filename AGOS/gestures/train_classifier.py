@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Train the learned static gesture classifier (gestures/classifier.py) from recorded sessions.
+
+Record one session per gesture while holding it (moving and turning the hand helps),
+then train on all of them. A session given without a label is labelled frame by frame
+by the rules, which is a quick way to bootstrap a model from normal use.
+
+Usage:
+    python -m AGOS.main --record fist.agr          # repeat for each gesture
+    python -m AGOS.gestures.train_classifier --data FIST=fist.agr --data PINCH=pinch.agr \\
+        --data IDLE=idle.agr --out AGOS/gestures/gesture_model.npz
+    python -m AGOS.main --classifier mlp
+
+Prints validation accuracy, the confusion matrix and the inference cost per hand: for the
+model alone, and end to end from landmarks for a confident hand and for one that falls back
+to the rules (below CLASSIFIER_MIN_CONFIDENCE).
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from AGOS.replay.session import Session, HANDEDNESS_LABELS, FLAG_PREDICTED
+from AGOS.gestures.classifier import GestureMLP, LearnedGestureClassifier, DEFAULT_MODEL_PATH
+from AGOS.gestures.features import hand_features
+from AGOS.gestures.gesture_labels import Gestures, GESTURE_LIST
+from AGOS.gestures.gesture_rules import GestureRules
+
+def load_hands(path, trim_s=0.0, include_predicted=False):
+    """
+    Every detected hand in a session.
+    trim_s: seconds dropped at the start and end (getting into / out of the pose)
+    include_predicted: keep extrapolated (AdaptiveTracker) frames
+    Returns:
+        (M, 21, 3) landmarks, list of M handedness labels
+    """
+    records = Session(path).records
+    keep = np.ones(len(records), dtype=bool)
+    if trim_s > 0 and len(records):
+        t = records["timestamp"]
+        keep &= (t >= t[0] + trim_s) & (t <= t[-1] - trim_s)
+    if not include_predicted:
+        keep &= (records["flags"] & FLAG_PREDICTED) == 0
+    records = records[keep]
+
+    slots = np.arange(records["landmarks"].shape[1]) < records["count"][:, None]
+    hands = np.asarray(records["landmarks"][slots], dtype=np.float32)
+    labels = [HANDEDNESS_LABELS.get(int(c)) for c in records["handedness"][slots]]
+    return hands, labels
+
+def load_dataset(specs, trim_s, include_predicted):
+    """
+    specs: "GESTURE=path" (every hand is that gesture) or "path" (labelled by the rules)
+    Returns:
+        (M, 21, 3) landmarks, list of M handedness labels, (M, F) features, (M,) gesture codes
+    """
+    rules = GestureRules()
+    all_hands, all_labels, features, codes = [], [], [], []
+    for spec in specs:
+        name, sep, path = spec.rpartition("=")
+        hands, handedness = load_hands(path, trim_s, include_predicted)
+        if sep:
+            gesture_codes = np.full(len(hands), GESTURE_LIST.index(Gestures[name]), dtype=np.int8)
+        else:
+            gesture_codes = rules.classify_batch(hands)
+        print(f"{path}: {len(hands)} hands ({name or 'labelled by rules'})")
+        all_hands.append(hands)
+        all_labels += handedness
+        features.append(hand_features(hands, handedness))
+        codes.append(gesture_codes)
+    return np.concatenate(all_hands), all_labels, np.concatenate(features), np.concatenate(codes)
+
+def confusion_matrix(targets, predicted, k):
+    matrix = np.zeros((k, k), dtype=np.int64)
+    np.add.at(matrix, (targets, predicted), 1)
+    return matrix
+
+def print_confusion(matrix, labels):
+    names = [g.name[:10] for g in labels]
+    print(" " * 12 + "".join(f"{n:>11}" for n in names))
+    for name, row in zip(names, matrix):
+        print(f"{name:>12}" + "".join(f"{v:>11}" for v in row))
+
+def time_per_hand(classify, batch_size, repeats=200):
+    """
+    Mean time per hand in microseconds of classify(), which handles batch_size hands.
+    """
+    classify()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        classify()
+    return (time.perf_counter() - start) / (repeats * batch_size) * 1e6
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the learned AGOS gesture classifier")
+    parser.add_argument(
+        "--data", action="append", required=True, metavar="[GESTURE=]SESSION",
+        help="Recorded session, optionally labelled with a Gestures name (repeatable)"
+    )
+    parser.add_argument("--out", default=DEFAULT_MODEL_PATH, help="Model file to write")
+    parser.add_argument("--hidden", type=int, default=32, help="Hidden layer width")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--lr", type=float, default=1e-2)
+    parser.add_argument("--val", type=float, default=0.2, help="Share of hands held out for validation")
+    parser.add_argument("--trim", type=float, default=0.5, help="Seconds dropped at each end of a session")
+    parser.add_argument("--include-predicted", action="store_true", help="Train on extrapolated frames too")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    hands, handedness, features, codes = load_dataset(args.data, args.trim, args.include_predicted)
+    if not len(features):
+        sys.exit("No hands in the given sessions")
+
+    labels = [GESTURE_LIST[c] for c in np.unique(codes)]
+    index = {GESTURE_LIST.index(g): i for i, g in enumerate(labels)}
+    targets = np.array([index[c] for c in codes], dtype=np.int64)
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(features))
+    n_val = int(len(order) * args.val)
+    val, train = order[:n_val], order[n_val:]
+
+    model = GestureMLP(labels, hidden=args.hidden, seed=args.seed)
+    start = time.perf_counter()
+    losses = model.fit(features[train], targets[train], epochs=args.epochs, lr=args.lr, seed=args.seed)
+    print(f"Trained on {len(train)} hands, {len(labels)} gestures in {time.perf_counter() - start:.1f}s "
+          f"(final loss {losses[-1]:.4f})")
+
+    if n_val:
+        predicted = model.probabilities(features[val]).argmax(axis=1)
+        accuracy = float((predicted == targets[val]).mean())
+        print(f"Validation accuracy: {accuracy:.2%} on {n_val} hands")
+        print_confusion(confusion_matrix(targets[val], predicted, len(labels)), labels)
+
+    model.save(args.out)
+    print(f"Model saved to {args.out}")
+
+    # Hands below min_confidence also run the rules; confidences never exceed 1
+    classifier = LearnedGestureClassifier(args.out)
+    for batch_size in (1, 2, 64):
+        if batch_size > len(features):
+            continue
+        batch, labels = hands[:batch_size], handedness[:batch_size]
+        model_us = time_per_hand(lambda: model.probabilities(features[:batch_size]), batch_size)
+        classifier.min_confidence = 0.0
+        predict_us = time_per_hand(lambda: classifier.predict(batch, labels), batch_size)
+        classifier.min_confidence = 2.0
+        fallback_us = time_per_hand(lambda: classifier.predict(batch, labels), batch_size)
+        print(f"Inference at batch {batch_size}: model {model_us:.2f} us/hand, from landmarks "
+              f"{predict_us:.2f} us/hand, with the rules fallback {fallback_us:.2f} us/hand")
+
+if __name__ == "__main__":
+    main()
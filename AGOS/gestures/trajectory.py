@@ -0,0 +1,271 @@
+import math
+import numpy as np
+from AGOS.gestures.gesture_labels import Gestures
+from AGOS.config.settings import Settings
+
+# Wrist and the four finger MCPs: a palm centre that doesn't move when fingers do
+PALM_POINTS = [0, 5, 9, 13, 17]
+
+# Points every stroke and template is resampled to
+RESAMPLE_POINTS = 32
+
+# Settings baked into a TrajectoryRecognizer when it is built (the TRAJ_* thresholds are read live)
+TRAJECTORY_SETTINGS = ("DYNAMIC_GESTURES", "TRAJECTORY_CAPACITY")
+
+LINE_GESTURES = {Gestures.SWIPE_LEFT, Gestures.SWIPE_RIGHT, Gestures.SWIPE_UP, Gestures.SWIPE_DOWN}
+
+def palm_centroid(landmarks):
+    """
+    Normalized (x, y) palm centre of one (21, 3) hand.
+    """
+    return landmarks[PALM_POINTS, :2].mean(axis=0)
+
+def resample(points, n=RESAMPLE_POINTS):
+    """
+    n points evenly spaced along the path (by arc length).
+    """
+    seg = np.hypot(*np.diff(points, axis=0).T)
+    dist = np.concatenate(([0.0], np.cumsum(seg)))
+    if dist[-1] <= 0:
+        return np.repeat(points[:1], n, axis=0)
+    target = np.linspace(0.0, dist[-1], n)
+    return np.stack([np.interp(target, dist, points[:, 0]), np.interp(target, dist, points[:, 1])], axis=1)
+
+def normalize(points):
+    """
+    $1-style normalization: centroid to the origin, uniform scale so the larger
+    side of the bounding box is 1. Uniform scaling keeps straight strokes straight
+    (the classic $1 non-uniform scale breaks 1-D gestures); no rotation search, so
+    direction is part of the shape.
+    """
+    points = points - points.mean(axis=0)
+    extent = np.ptp(points, axis=0).max()
+    return points / extent if extent > 0 else points
+
+def build_templates(n=RESAMPLE_POINTS, circle_phases=8):
+    """
+    Template library in image coordinates (x right, y down).
+    Circles get one template per start angle so no rotation search is needed.
+    Returns:
+        list of Gestures, (T, n, 2) array of normalized templates
+    """
+    labels, shapes = [], []
+    s = np.linspace(-0.5, 0.5, n)
+    z = np.zeros(n)
+    for gesture, xy in ((Gestures.SWIPE_RIGHT, (s, z)), (Gestures.SWIPE_LEFT, (-s, z)),
+                        (Gestures.SWIPE_DOWN, (z, s)), (Gestures.SWIPE_UP, (z, -s))):
+        labels.append(gesture)
+        shapes.append(np.stack(xy, axis=1))
+
+    sweep = np.linspace(0.0, 2 * math.pi, n)
+    for phase in np.linspace(0.0, 2 * math.pi, circle_phases, endpoint=False):
+        # With y pointing down, increasing angle runs clockwise on screen
+        for gesture, direction in ((Gestures.CIRCLE_CW, 1.0), (Gestures.CIRCLE_CCW, -1.0)):
+            angle = phase + direction * sweep
+            labels.append(gesture)
+            shapes.append(np.stack([np.cos(angle), np.sin(angle)], axis=1))
+
+    return labels, np.stack([normalize(shape) for shape in shapes])
+
+TEMPLATE_LABELS, TEMPLATES = build_templates()
+
+
+class TrajectoryRecognizer:
+    """
+    Streaming recognizer for dynamic gestures (swipes, circles, flicks).
+
+    Palm positions go into a fixed ring buffer together with velocity and
+    acceleration, both updated incrementally (time-constant EMA of the finite
+    differences, so they don't depend on the frame rate). Motion is segmented
+    into strokes: a stroke starts when speed rises above TRAJ_START_SPEED and ends
+    when it falls below TRAJ_STOP_SPEED. A finished stroke is either a flick
+    (short, fast, small, and sharply accelerated) or resampled and matched against
+    the template library.
+    A long, nearly straight stroke is reported as a swipe while still moving, so
+    swiping the hand out of view works.
+
+    Per-frame cost is O(1) except on frames that classify a stroke, which are
+    bounded by the buffer capacity (a few tens of microseconds).
+    """
+    def __init__(self, gestures=None, capacity=None):
+        """
+        gestures: names of the Gestures to report, others are never returned
+            (default Settings.DYNAMIC_GESTURES)
+        capacity: samples kept; strokes longer than this are abandoned (default Settings.TRAJECTORY_CAPACITY)
+        """
+        self.enabled = {Gestures[name] for name in (Settings.DYNAMIC_GESTURES if gestures is None else gestures)}
+        self.capacity = Settings.TRAJECTORY_CAPACITY if capacity is None else capacity
+        self.t = np.zeros(self.capacity, dtype=np.float64)
+        self.xy = np.zeros((self.capacity, 2), dtype=np.float64)
+        self.velocity = np.zeros(2, dtype=np.float64)       # Smoothed, units/s
+        self.acceleration = np.zeros(2, dtype=np.float64)   # Smoothed, units/s^2
+        self.n = 0                 # Samples written so far (ring index = n % capacity)
+
+        self.stroke_start = None   # Sample number where the current stroke began
+        self.path_length = 0.0     # Distance travelled along the current stroke
+        self.peak_speed = 0.0
+        self.peak_accel = 0.0
+        self.resting = True        # Must slow down before a new stroke can start
+
+    @property
+    def speed(self):
+        return math.hypot(self.velocity[0], self.velocity[1])
+
+    @property
+    def accel(self):
+        """
+        Acceleration along the direction of motion (speeding up > 0, braking < 0).
+        """
+        speed = self.speed
+        if speed == 0.0:
+            return 0.0
+        return (self.acceleration[0] * self.velocity[0] + self.acceleration[1] * self.velocity[1]) / speed
+
+    def update(self, x, y, timestamp):
+        """
+        x, y: normalized palm position
+        timestamp: capture time in seconds
+        Returns:
+            recognized Gesture, or None
+        """
+        step = 0.0
+        if self.n:
+            prev = (self.n - 1) % self.capacity
+            dt = timestamp - self.t[prev]
+            if dt <= 0:
+                return None
+            dx, dy = x - self.xy[prev, 0], y - self.xy[prev, 1]
+            self._update_motion(dx, dy, dt)
+            step = math.hypot(dx, dy)
+
+        i = self.n % self.capacity
+        self.t[i] = timestamp
+        self.xy[i] = x, y
+        self.n += 1
+
+        speed = self.speed
+        if self.stroke_start is None:
+            if speed < Settings.TRAJ_STOP_SPEED:
+                self.resting = True
+            elif self.resting and speed >= Settings.TRAJ_START_SPEED:
+                # Include the sample before the speed-up as the stroke's start point
+                self.stroke_start = max(self.n - 2, 0)
+                self.path_length = step
+                self.peak_speed = speed
+                self.peak_accel = self.accel
+            return None
+
+        self.path_length += step
+        self.peak_speed = max(self.peak_speed, speed)
+        self.peak_accel = max(self.peak_accel, self.accel)
+        length = self.n - self.stroke_start
+
+        if speed < Settings.TRAJ_STOP_SPEED:
+            gesture = self._classify(final=True)
+            self._end_stroke(resting=True)
+            return gesture
+
+        if length >= self.capacity or timestamp - self.t[self.stroke_start % self.capacity] > Settings.TRAJ_MAX_STROKE_S:
+            # Too long to be a gesture (e.g. repositioning the hand)
+            self._end_stroke(resting=False)
+            return None
+
+        start = self.stroke_start % self.capacity
+        displacement = math.hypot(x - self.xy[start, 0], y - self.xy[start, 1])
+        # Only nearly straight strokes: half of a big circle is as long and matches a line template
+        if (displacement >= Settings.TRAJ_EARLY_SWIPE_DIST
+                and displacement >= Settings.TRAJ_EARLY_MIN_STRAIGHTNESS * self.path_length):
+            gesture = self._classify(final=False)
+            if gesture in LINE_GESTURES:
+                # Report now; the rest of the movement mustn't start another stroke
+                self._end_stroke(resting=False)
+                return gesture
+        return None
+
+    def _update_motion(self, dx, dy, dt):
+        alpha = 1.0 - math.exp(-dt / Settings.TRAJ_SMOOTHING_S)
+        vx, vy = dx / dt, dy / dt
+        prev_vx, prev_vy = self.velocity
+        self.velocity[0] += alpha * (vx - prev_vx)
+        self.velocity[1] += alpha * (vy - prev_vy)
+        ax = (self.velocity[0] - prev_vx) / dt
+        ay = (self.velocity[1] - prev_vy) / dt
+        self.acceleration[0] += alpha * (ax - self.acceleration[0])
+        self.acceleration[1] += alpha * (ay - self.acceleration[1])
+
+    def _end_stroke(self, resting):
+        self.stroke_start = None
+        self.resting = resting
+
+    def stroke(self):
+        """
+        (points, times) of the current stroke, oldest first.
+        """
+        idx = np.arange(self.stroke_start, self.n) % self.capacity
+        return self.xy[idx], self.t[idx]
+
+    def _classify(self, final):
+        points, times = self.stroke()
+        return classify_stroke(points, times, self.peak_speed, self.peak_accel, self.enabled, final)
+
+    def reset(self):
+        self.n = 0
+        self.velocity[:] = 0.0
+        self.acceleration[:] = 0.0
+        self._end_stroke(resting=True)
+
+
+def classify_stroke(points, times, peak_speed, peak_accel, enabled, final=True):
+    """
+    Classifies one stroke.
+    points: (N, 2) positions, times: N timestamps in seconds
+    peak_speed: highest smoothed speed during the stroke
+    peak_accel: highest smoothed acceleration, from the frame the stroke started
+    enabled: set of Gestures that may be returned
+    final: the stroke has ended (flicks are only decided then)
+    Returns:
+        Gesture or None
+    """
+    if len(points) < 3:
+        return None
+    duration = times[-1] - times[0]
+    dx, dy = points[-1] - points[0]
+    displacement = math.hypot(dx, dy)
+
+    if (final and Gestures.FLICK in enabled and duration <= Settings.FLICK_MAX_S
+            and peak_speed >= Settings.FLICK_MIN_SPEED and peak_accel >= Settings.FLICK_MIN_ACCEL
+            and Settings.FLICK_MIN_DIST <= displacement < Settings.SWIPE_MIN_DIST):
+        return Gestures.FLICK
+
+    if np.ptp(points, axis=0).max() < Settings.TRAJ_MIN_EXTENT:
+        return None
+
+    shape = normalize(resample(points))
+    # Mean point-to-point distance to every template at once
+    scores = np.linalg.norm(TEMPLATES - shape, axis=2).mean(axis=1)
+    best = int(np.argmin(scores))
+    gesture = TEMPLATE_LABELS[best]
+    if scores[best] > Settings.TRAJ_MATCH_THRESHOLD or gesture not in enabled:
+        return None
+
+    if gesture in LINE_GESTURES:
+        if displacement < Settings.SWIPE_MIN_DIST or displacement / duration < Settings.SWIPE_MIN_SPEED:
+            return None
+    elif not final:
+        return None
+    return gesture
+
+def recognize_trajectory(points, times, gestures=None):
+    """
+    Runs a recorded palm trajectory through a fresh recognizer.
+    points: (N, 2) normalized positions, times: N timestamps in seconds
+    Returns:
+        list of (timestamp, Gesture) for every recognized gesture
+    """
+    recognizer = TrajectoryRecognizer(gestures)
+    events = []
+    for (x, y), t in zip(points, times):
+        gesture = recognizer.update(float(x), float(y), float(t))
+        if gesture is not None:
+            events.append((float(t), gesture))
+    return events
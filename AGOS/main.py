@@ -2,101 +2,402 @@ import cv2
 import time
 import sys
 import os
+import argparse
+import threading
 
 # Add project root to path if needed, though running as module is better
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from AGOS.camera.webcam import WebcamStream
+from AGOS.camera.frame_source import CameraSource, VideoFileSource, SyntheticSource
 from AGOS.vision.hand_tracker import HandTracker
+from AGOS.vision.adaptive_tracker import AdaptiveTracker
 from AGOS.vision.fps_counter import FPSCounter
-from AGOS.gestures.gesture_rules import GestureRules
-from AGOS.gestures.gesture_state import GestureState
-from AGOS.gestures.gesture_labels import Gestures
+from AGOS.gestures.classifier import make_classifier, CLASSIFIERS
+from AGOS.gestures.hand_registry import HandRegistry
+from AGOS.gestures.recognition import recognize_hands, execute_actions, describe
 from AGOS.actions.action_mapper import ActionMapper
+from AGOS.actions.backends import BACKENDS, make_backend
+from AGOS.pipeline.executor import PipelineExecutor, Stage
+from AGOS.replay.session import SessionWriter, FLAG_ACTIVE, FLAG_PREDICTED
 from AGOS.ui.overlay import Overlay
 from AGOS.config.settings import Settings
-from AGOS.utils.logger import log
+from AGOS.config.runtime import RuntimeConfig
+from AGOS.utils.logger import log, Logger
+from AGOS.utils import tracing
+from AGOS.utils.tracing import TraceReporter
+
+def load_config(argv=None):
+    """
+    Reads --config / --profile before the other flags, so the file's values become
+    their defaults.
+    Returns:
+        (parser holding the two flags, RuntimeConfig or None)
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--config", default=Settings.CONFIG_FILE, metavar="PATH",
+        help="TOML / JSON settings overrides, reloaded when the file changes (see config/runtime.py)"
+    )
+    parser.add_argument(
+        "--profile", default=Settings.CONFIG_PROFILE,
+        help="Profile from the config file to start with ('c' cycles profiles while running)"
+    )
+    args, _ = parser.parse_known_args(argv)
+    if not args.config:
+        return parser, None
+    try:
+        return parser, RuntimeConfig(args.config, args.profile)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+def parse_args(config_parser):
+    parser = argparse.ArgumentParser(description=Settings.APP_NAME, parents=[config_parser])
+    parser.add_argument(
+        "--source", default=None,
+        help="Camera id, path to a video file, or 'synthetic' (default: Settings.CAMERA_ID)"
+    )
+    parser.add_argument(
+        "--pipelined", action="store_true",
+        help="Run capture, vision, gestures and rendering on separate threads"
+    )
+    parser.add_argument(
+        "--tracker-mode", choices=HandTracker.RUNNING_MODES, default=Settings.TRACKER_RUNNING_MODE,
+        help="MediaPipe running mode for the hand tracker"
+    )
+    parser.add_argument(
+        "--roi", action="store_true", default=Settings.ROI_TRACKING,
+        help="Only run the landmarker on the region around the previous hands (IMAGE tracker mode)"
+    )
+    parser.add_argument(
+        "--inference-size", type=int, default=Settings.INFERENCE_MAX_SIDE,
+        help="Downscale the landmarker input to this longer side in pixels (0 = off)"
+    )
+    parser.add_argument(
+        "--adaptive", action="store_true", default=Settings.ADAPTIVE_INFERENCE,
+        help="Skip landmarker runs and extrapolate landmarks when behind FPS_TARGET"
+    )
+    parser.add_argument(
+        "--classifier", choices=sorted(CLASSIFIERS), default=Settings.GESTURE_CLASSIFIER,
+        help="Static gesture classifier ('mlp' needs a model from AGOS.gestures.train_classifier)"
+    )
+    parser.add_argument(
+        "--input-backend", choices=sorted(BACKENDS), default=Settings.INPUT_BACKEND,
+        help="Where gestures send input ('null' = observe only)"
+    )
+    parser.add_argument(
+        "--headless", action="store_true", help="Don't open a preview window (benchmarks / CI)"
+    )
+    parser.add_argument(
+        "--max-frames", type=int, default=0, help="Stop after this many frames (0 = until quit)"
+    )
+    parser.add_argument(
+        "--record", default=None, metavar="PATH",
+        help="Record per-frame landmarks to a session file for AGOS.replay.replayer"
+    )
+    parser.add_argument(
+        "--record-frames", action="store_true", help="Also store JPEG-compressed frames with --record"
+    )
+    parser.add_argument(
+        "--trace", default=None, metavar="PATH",
+        help="Record hot-path spans and write a Chrome trace (chrome://tracing, Perfetto) on exit"
+    )
+    parser.add_argument(
+        "--stats-interval", type=float, default=5.0, help="Seconds between pipeline stats log lines"
+    )
+    return parser.parse_args()
+
+def open_source(spec):
+    """
+    Builds a FrameSource from the --source argument.
+    """
+    if spec is None:
+        return CameraSource()
+    if spec == "synthetic":
+        return SyntheticSource()
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    return VideoFileSource(spec)
+
+def frame_time(result, tracker):
+    """
+    Capture time of the frame in seconds (drives filters and swipe velocity).
+    Frames without a result fall back to the tracker's clock, never another one:
+    timestamps must not jump between clocks or filters see time run backwards.
+    """
+    return (result.timestamp_ms if result is not None else tracker.now_ms()) / 1000.0
+
+def record_frame(recorder, frame_id, timestamp, hands, handedness, frame, result, active):
+    """
+    Writes the tracker output for one frame to the session recorder.
+    """
+    flags = (FLAG_ACTIVE if active else 0) | (FLAG_PREDICTED if result is not None and result.predicted else 0)
+    recorder.write(frame_id, timestamp, hands, handedness, frame, flags)
+
+def show(frame, headless, active_mode, config=None):
+    """
+    Displays the frame and handles keys.
+    Returns False when the user asked to quit.
+    """
+    if headless:
+        return True
+
+    cv2.imshow(Settings.APP_NAME, frame)
+
+    key = cv2.waitKey(1) & 0xFF
+    if key == ord('q'):
+        log.info("Exit requested.")
+        return False
+    elif key == ord('p'):
+        if active_mode.is_set():
+            active_mode.clear()
+        else:
+            active_mode.set()
+        log.info(f"Mode switched to: {'Control' if active_mode.is_set() else 'Paused'}")
+    elif key == ord('c') and config is not None:
+        # Applied by the loop's next apply_pending(), between two frames
+        try:
+            log.info(f"Switching to profile: {config.next_profile() or '(none)'}")
+        except ValueError as e:
+            log.error(f"Profile not switched: {e}")
+    return True
+
+def subscribe_components(config, cam, tracker, classifier, registry, mapper, fps_counter):
+    """
+    Registers everything that caches settings with the runtime config.
+    """
+    for component in (cam, tracker, classifier, registry, mapper, fps_counter, Logger.rate_limiter):
+        if hasattr(component, "configure"):
+            config.subscribe(component.configure)
+
+def run_sequential(cam, tracker, classifier, registry, mapper, ui, fps_counter, active_mode, args,
+                   recorder=None, config=None):
+    frames = 0
+    last_stats = time.perf_counter()
+    while True:
+        # 0. Config changes (file edits, profile switches) land between frames
+        if config is not None:
+            config.apply_pending()
+
+        # 1. Capture
+        t_capture = time.perf_counter_ns()
+        try:
+            # Capture frame
+            frame, success = cam.read()
+            if not success or frame is None:
+                log.warning("Frame read unsuccessful, exiting.")
+                break
+        except Exception as e:
+            log.warning(f"Error reading from webcam: {e}")
+            break
+
+        # 2. Vision
+        t_vision = time.perf_counter_ns()
+        results = tracker.process(frame)
+        hands = tracker.landmarks.hands
+        handedness = tracker.landmarks.handedness[:len(hands)]
+        timestamp = frame_time(results, tracker)
+        if recorder is not None:
+            # Before recognition: smoothing rewrites the landmarks in place
+            record_frame(recorder, cam.frame_id, timestamp, hands, handedness, frame, results, active_mode.is_set())
+
+        # 3. Recognition
+        t_gesture = time.perf_counter_ns()
+        tracks = recognize_hands(hands, handedness, registry, classifier, timestamp)
+        gesture_name = describe(tracks)
+
+        t_action = time.perf_counter_ns()
+        # 4. Action
+        if active_mode.is_set():
+            execute_actions(tracks, hands, mapper, timestamp)
+        else:
+            mapper.release_all()
+
+        t_render = time.perf_counter_ns()
+        if tracks:
+            # Visualization
+            tracker.draw_landmarks(frame)
+
+        # 5. UI & Performance
+        fps = fps_counter.update()
+        ui.draw(frame, gesture_name, fps, "Control" if active_mode.is_set() else "Paused", fps_counter)
+        t_end = time.perf_counter_ns()
+
+        fps_counter.add_stage("capture", (t_vision - t_capture) / 1e6)
+        fps_counter.add_stage("vision", (t_gesture - t_vision) / 1e6)
+        fps_counter.add_stage("gesture", (t_action - t_gesture) / 1e6)
+        fps_counter.add_stage("action", (t_render - t_action) / 1e6)
+        fps_counter.add_stage("render", (t_end - t_render) / 1e6)
+
+        # 6. Display & Inputs
+        if not show(frame, args.headless, active_mode, config):
+            break
+
+        frames += 1
+        if time.perf_counter() - last_stats >= args.stats_interval:
+            log.info(f"Loop: {fps_counter.summary()}")
+            last_stats = time.perf_counter()
+
+        if args.max_frames and frames >= args.max_frames:
+            break
+
+    log.info(f"Loop: {fps_counter.summary()}")
+
+def run_pipelined(cam, tracker, classifier, registry, mapper, ui, fps_counter, active_mode, args,
+                  recorder=None, config=None):
+    # Each stage runs on its own thread; imshow stays on the main thread
+    def vision_stage(packet):
+        result = tracker.process(packet.frame)
+        # The tracker's array is reused for the next frame, so the packet keeps a copy
+        hands = tracker.landmarks.hands.copy()
+        handedness = tracker.landmarks.handedness[:len(hands)]
+        packet.data["hands"] = hands
+        packet.data["handedness"] = handedness
+        packet.data["timestamp"] = frame_time(result, tracker)
+        if recorder is not None:
+            record_frame(recorder, packet.frame_id, packet.data["timestamp"], hands, handedness,
+                         packet.frame, result, active_mode.is_set())
+
+    def gesture_stage(packet):
+        # Config changes apply on the thread that owns the gesture and action state;
+        # the tracker and camera stage them for their own threads
+        if config is not None:
+            config.apply_pending()
+        hands = packet.data["hands"]
+        timestamp = packet.data["timestamp"]
+        tracks = recognize_hands(hands, packet.data["handedness"], registry, classifier, timestamp)
+        if active_mode.is_set():
+            execute_actions(tracks, hands, mapper, timestamp)
+        else:
+            mapper.release_all()
+        packet.data["gesture_name"] = describe(tracks)
+
+    def render_stage(packet):
+        gesture_name = packet.data["gesture_name"]
+        if len(packet.data["hands"]):
+            tracker.draw_landmarks(packet.frame, packet.data["hands"])
+        for name, ms in packet.stage_ms.items():
+            fps_counter.add_stage(name, ms)
+        fps = fps_counter.update()
+        ui.draw(packet.frame, gesture_name, fps, "Control" if active_mode.is_set() else "Paused", fps_counter)
+
+    pipeline = PipelineExecutor(cam.read, [
+        Stage("vision", vision_stage),
+        Stage("gesture", gesture_stage),
+        Stage("render", render_stage),
+    ])
+    pipeline.start()
+
+    frames = 0
+    last_stats = time.perf_counter()
+    try:
+        while not pipeline.finished:
+            packet = pipeline.get(timeout=0.1)
+            if packet is None:
+                continue
+
+            keep_running = show(packet.frame, args.headless, active_mode, config)
+            pipeline.release(packet)
+            frames += 1
+
+            if time.perf_counter() - last_stats >= args.stats_interval:
+                log_pipeline_stats(pipeline.stats())
+                log.info(f"Display: {fps_counter.summary()}")
+                last_stats = time.perf_counter()
+
+            if not keep_running or (args.max_frames and frames >= args.max_frames):
+                break
+    finally:
+        pipeline.stop()
+        log_pipeline_stats(pipeline.stats())
+
+def log_pipeline_stats(stats):
+    stages = ", ".join(
+        f"{name} {s['avg_ms']:.1f}ms q{s['queue_depth']} drop {s['dropped']}"
+        for name, s in stats["stages"].items()
+    )
+    log.info(
+        f"Pipeline: {stats['throughput_fps']:.1f} FPS, latency {stats['avg_latency_ms']:.1f}ms avg"
+        f" / {stats['last_latency_ms']:.1f}ms last | {stages}"
+    )
 
 def main():
+    config_parser, config = load_config()
+    args = parse_args(config_parser)
     try:
         # Initialize Modules
         log.info("Initializing AGOS...")
-        cam = WebcamStream()
-        tracker = HandTracker()
-        rules = GestureRules()
-        state = GestureState()
-        mapper = ActionMapper()
+        reporter = None
+        if args.trace or Settings.TRACING:
+            tracing.enable()
+            reporter = TraceReporter().start()
+        cam = WebcamStream(open_source(args.source))
+        tracker = HandTracker(args.tracker_mode, args.roi, args.inference_size)
+        if args.adaptive:
+            # In pipelined mode the vision thread does nothing but track
+            idle_ms = None if args.pipelined else (lambda: cam.last_wait_ms)
+            tracker = AdaptiveTracker(tracker, idle_ms=idle_ms)
+        # Recorded sessions must name the classifier actually used, so replays use it too
+        Settings.GESTURE_CLASSIFIER = args.classifier
+        classifier = make_classifier(args.classifier)
+        registry = HandRegistry()
+        mapper = ActionMapper(make_backend(args.input_backend))
         ui = Overlay()
         fps_counter = FPSCounter()
-        
-        active_mode = True # Control vs Observation
-        
-        log.info("System Ready. Press 'q' to exit, 'p' to pause/resume control.")
-        
-        while True:
-            # 1. Capture
-            try:
-                # Capture frame
-                frame, success = cam.read()
-                if not success or frame is None:
-                    log.warning("Frame read unsuccessful, exiting.")
-                    break
-            except Exception as e:
-                log.warning(f"Error reading from webcam: {e}")
-                break
 
+        active_mode = threading.Event() # Control vs Observation
+        active_mode.set()
 
-            
-            # 2. Vision
-            results = tracker.process(frame)
-            landmarks = tracker.get_landmarks()
-            
-            gesture_name = "No Hand"
-            final_gesture = Gestures.IDLE
-            
-            if landmarks:
-                # 3. Recognition
-                # Static
-                raw_gesture = rules.detect_static_gesture(landmarks)
-                confirmed_gesture = state.update_gesture(raw_gesture)
-                
-                # Dynamic (Swipe)
-                swipe_gesture = state.check_swipe(landmarks)
-                
-                # Priority: Swipe > Confirmed Static
-                final_gesture = swipe_gesture if swipe_gesture else confirmed_gesture
-                gesture_name = final_gesture.value
-                
-                # 4. Action
-                if active_mode:
-                    mapper.execute(final_gesture, landmarks, state)
-                
-                # Visualization
-                tracker.draw_landmarks(frame)
-            
-            # 5. UI & Performance
-            fps = fps_counter.update()
-            ui.draw(frame, gesture_name, fps, "Control" if active_mode else "Paused")
-            
-            # 6. Display
-            cv2.imshow(Settings.APP_NAME, frame)
-            
-            # 7. Inputs
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                log.info("Exit requested.")
-                break
-            elif key == ord('p'):
-                active_mode = not active_mode
-                log.info(f"Mode switched to: {'Control' if active_mode else 'Paused'}")
+        if config is not None:
+            subscribe_components(config, cam, tracker, classifier, registry, mapper, fps_counter)
+            config.start()
+
+        log.info("System Ready. Press 'q' to exit, 'p' to pause/resume control"
+                 + (", 'c' to switch profile." if config is not None and config.profiles else "."))
+
+        recorder = None
+        if args.record:
+            recorder = SessionWriter(args.record, save_frames=args.record_frames, meta={
+                "source": args.source, "width": cam.width, "height": cam.height,
+                "fps": cam.source.fps, "tracker_mode": args.tracker_mode, "adaptive": args.adaptive,
+                "model_path": getattr(classifier, "model_path", None),
+            })
+            log.info(f"Recording session to {args.record}")
+
+        run = run_pipelined if args.pipelined else run_sequential
+        run(cam, tracker, classifier, registry, mapper, ui, fps_counter, active_mode, args, recorder, config)
 
     except Exception as e:
         log.error(f"Critical Error: {e}")
         raise e
     finally:
+        if config is not None:
+            config.stop()
+        if isinstance(locals().get('tracker'), AdaptiveTracker):
+            stats = tracker.stats()
+            log.info(f"Adaptive inference: {stats['inferred_frames']} inferred / {stats['predicted_frames']} predicted"
+                     f" ({stats['inference_ratio'] * 100:.0f}% inferred, final k={stats['k']})")
+        if 'mapper' in locals():
+            mapper.close()
+            stats = mapper.dispatcher.stats()
+            log.info(f"Input: {stats['moves_sent']} moves sent ({stats['moves_coalesced']} coalesced),"
+                     f" {stats['actions_sent']} actions sent, {stats['actions_dropped']} dropped")
+        if locals().get('reporter') is not None:
+            reporter.stop()
+            tracing.log_summary()
+            if args.trace:
+                count = tracing.export_chrome_trace(args.trace)
+                log.info(f"Wrote {count} trace spans to {args.trace}")
+        if locals().get('recorder') is not None:
+            recorder.close()
+            log.info(f"Recorded {recorder.frames_written} frames to {recorder.path}")
         if 'cam' in locals():
             cam.release()
-        cv2.destroyAllWindows()
+        if not args.headless:
+            cv2.destroyAllWindows()
+        stats = Logger.stats()
+        if stats["suppressed"] or stats["dropped"]:
+            log.info(f"Logging: {stats['suppressed']} messages rate-limited, {stats['dropped']} dropped (queue full)")
         log.info("AGOS Shutdown Complete.")
 
 if __name__ == "__main__":
@@ -0,0 +1,266 @@
+import time
+import queue
+import threading
+from collections import deque
+import numpy as np
+from AGOS.utils.logger import log
+
+class FramePacket:
+    """
+    One frame travelling through the pipeline plus everything stages attach to it.
+    """
+    def __init__(self, buffer):
+        self.frame = buffer       # Pooled BGR buffer owned by the pipeline
+        self.frame_id = 0
+        self.t_capture_ns = 0     # perf_counter_ns when the frame was captured
+        self.latency_ms = 0.0     # Capture -> pipeline output, stamped on exit
+        self.stage_ms = {}        # Per-stage processing time for this frame
+        self.data = {}            # Stage outputs (landmarks, gesture, ...)
+
+    def reset(self):
+        self.stage_ms.clear()
+        self.data.clear()
+        self.latency_ms = 0.0
+
+
+class LatestValueQueue:
+    """
+    Bounded handoff queue that never blocks the producer.
+    When full, the oldest item is evicted and returned by put() so its owner can recycle it.
+    """
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self.items = deque()
+        self.dropped = 0
+        self.closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        """
+        Returns the evicted item, or None if nothing was dropped.
+        """
+        with self._cond:
+            evicted = None
+            if len(self.items) >= self.maxsize:
+                evicted = self.items.popleft()
+                self.dropped += 1
+            self.items.append(item)
+            self._cond.notify()
+            return evicted
+
+    def get(self, timeout=None):
+        """
+        Returns the next item, or None on timeout or once closed and drained.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.items or self.closed, timeout=timeout)
+            if self.items:
+                return self.items.popleft()
+            return None
+
+    def drain(self):
+        with self._cond:
+            items = list(self.items)
+            self.items.clear()
+            return items
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Stage:
+    """
+    A pipeline step running on its own worker thread.
+    fn(packet) fills packet.data; returning False drops the packet.
+    """
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+        self.processed = 0
+        self.failed = 0
+        self.total_ns = 0
+        self.last_ns = 0
+        self.max_ns = 0
+        self.inbox = None
+
+    def stats(self):
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.inbox.dropped if self.inbox is not None else 0,
+            "queue_depth": len(self.inbox) if self.inbox is not None else 0,
+            "avg_ms": self.total_ns / self.processed / 1e6 if self.processed else 0.0,
+            "last_ms": self.last_ns / 1e6,
+            "max_ms": self.max_ns / 1e6,
+        }
+
+
+class PipelineExecutor:
+    """
+    Runs capture and each stage on separate threads joined by latest-value queues,
+    so throughput is bounded by the slowest stage instead of the sum of all of them.
+    A slow stage drops stale frames rather than letting a backlog build up.
+
+    Frame buffers come from a fixed pool: the capture thread copies each frame into a
+    free buffer, and the consumer hands it back with release() once done with it.
+    """
+    def __init__(self, read_frame, stages, queue_size=1):
+        """
+        read_frame: callable returning (frame, success), e.g. WebcamStream.read
+        stages: list of Stage, run in order
+        queue_size: capacity of each inter-stage queue
+        """
+        self.read_frame = read_frame
+        self.stages = stages
+        self.queue_size = queue_size
+
+        for stage in self.stages:
+            stage.inbox = LatestValueQueue(queue_size)
+        self.output = LatestValueQueue(queue_size)
+
+        # Places a packet can be: every queue, every stage, capture, and the consumer
+        self.pool_size = (len(stages) + 1) * queue_size + len(stages) + 2
+        self._pool = queue.Queue()
+        self._pool_ready = False
+
+        self.frames_captured = 0
+        self.frames_completed = 0
+        self.last_latency_ms = 0.0
+        self.total_latency_ms = 0.0
+        self.running = False
+        self._threads = []
+        self._start_time = None
+
+    def start(self):
+        self.running = True
+        self._start_time = time.perf_counter()
+
+        self._threads.append(threading.Thread(target=self._capture_loop, name="AGOS-Pipeline-Capture", daemon=True))
+        for i, stage in enumerate(self.stages):
+            outbox = self.stages[i + 1].inbox if i + 1 < len(self.stages) else self.output
+            self._threads.append(threading.Thread(
+                target=self._stage_loop, args=(stage, outbox), name=f"AGOS-Pipeline-{stage.name}", daemon=True
+            ))
+
+        for t in self._threads:
+            t.start()
+        log.info(f"Pipeline started: capture -> {' -> '.join(s.name for s in self.stages)}")
+
+    def get(self, timeout=None):
+        """
+        Next completed packet, or None on timeout / once the pipeline has drained.
+        Call release(packet) when finished with it.
+        """
+        packet = self.output.get(timeout)
+        if packet is not None:
+            packet.latency_ms = (time.perf_counter_ns() - packet.t_capture_ns) / 1e6
+            self.frames_completed += 1
+            self.last_latency_ms = packet.latency_ms
+            self.total_latency_ms += packet.latency_ms
+        return packet
+
+    def release(self, packet):
+        if packet is not None:
+            packet.reset()
+            self._pool.put(packet)
+
+    @property
+    def finished(self):
+        return self.output.closed and not len(self.output)
+
+    def stop(self):
+        self.running = False
+        for stage in self.stages:
+            stage.inbox.close()
+        self.output.close()
+        for t in self._threads:
+            t.join(timeout=2.0)
+        self._threads = []
+        log.info(f"Pipeline stopped: {self.frames_completed}/{self.frames_captured} frames completed")
+
+    def stats(self):
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_completed": self.frames_completed,
+            "throughput_fps": self.frames_completed / elapsed if elapsed > 0 else 0.0,
+            "last_latency_ms": self.last_latency_ms,
+            "avg_latency_ms": self.total_latency_ms / self.frames_completed if self.frames_completed else 0.0,
+            "output_dropped": self.output.dropped,
+            "stages": {stage.name: stage.stats() for stage in self.stages},
+        }
+
+    def _acquire(self, frame):
+        if not self._pool_ready:
+            # Size the pool from the first frame's shape
+            for _ in range(self.pool_size):
+                self._pool.put(FramePacket(np.empty_like(frame)))
+            self._pool_ready = True
+
+        while self.running:
+            try:
+                return self._pool.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _capture_loop(self):
+        first = self.stages[0].inbox if self.stages else self.output
+        try:
+            while self.running:
+                frame, success = self.read_frame()
+                if not success or frame is None:
+                    log.info("Pipeline source ended.")
+                    break
+
+                t_capture_ns = time.perf_counter_ns()
+                packet = self._acquire(frame)
+                if packet is None:
+                    break
+
+                np.copyto(packet.frame, frame)
+                self.frames_captured += 1
+                packet.frame_id = self.frames_captured
+                packet.t_capture_ns = t_capture_ns
+                self.release(first.put(packet))
+        except Exception as e:
+            log.error(f"Pipeline capture failed: {e}")
+        finally:
+            first.close()
+
+    def _stage_loop(self, stage, outbox):
+        try:
+            while True:
+                packet = stage.inbox.get()
+                if packet is None:
+                    break
+
+                start_ns = time.perf_counter_ns()
+                try:
+                    keep = stage.fn(packet) is not False
+                except Exception as e:
+                    log.warning(f"Stage '{stage.name}' failed on frame {packet.frame_id}: {e}")
+                    stage.failed += 1
+                    keep = False
+                elapsed_ns = time.perf_counter_ns() - start_ns
+
+                stage.processed += 1
+                stage.total_ns += elapsed_ns
+                stage.last_ns = elapsed_ns
+                stage.max_ns = max(stage.max_ns, elapsed_ns)
+                packet.stage_ms[stage.name] = elapsed_ns / 1e6
+
+                if keep:
+                    self.release(outbox.put(packet))
+                else:
+                    self.release(packet)
+        finally:
+            # Return anything left behind and let the next stage wind down
+            for packet in stage.inbox.drain():
+                self.release(packet)
+            outbox.close()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+"""
+Replay a recorded session through the gesture stack, as fast as the CPU allows.
+
+Landmarks from the recording go through HandRegistry, the gesture classifier, GestureState
+and ActionMapper exactly as in the live loop, but input lands in a RecordingBackend
+and every clock (cooldowns, rate limits, filters) runs on the recorded timestamps,
+so a replay is deterministic. Reports the gestures and actions it produced and
+per-stage timings.
+
+Usage:
+    python -m AGOS.main --record session.agr
+    python -m AGOS.replay.replayer session.agr --json report.json
+    python -m AGOS.replay.replayer session.agr --expect report.json   # regression check
+    python -m AGOS.replay.replayer session.agr --classifier mlp --model new_model.npz
+
+The static gesture classifier (and model file) are the ones the session was recorded
+with unless --classifier / --model override them.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from AGOS.replay.session import Session, FLAG_ACTIVE
+from AGOS.gestures.classifier import make_classifier, CLASSIFIERS
+from AGOS.gestures.hand_registry import HandRegistry
+from AGOS.gestures.recognition import track_hands, classify_hands, confirm_gestures, execute_actions, gesture_label
+from AGOS.actions.action_mapper import ActionMapper
+from AGOS.actions.backends import RecordingBackend
+from AGOS.config.settings import Settings
+from AGOS.utils.logger import log
+
+class SessionClock:
+    """
+    Stands in for time.time / perf_counter during a replay: returns the
+    timestamp of the record being replayed.
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Replayer:
+    STAGES = ("load", "track", "classify", "confirm", "actions")
+
+    def __init__(self, session, respect_active=True, classifier=None, model_path=None):
+        """
+        session: Session to replay
+        respect_active: only execute actions on frames recorded in control mode
+        classifier: static gesture classifier name (default: the one the session was recorded with)
+        model_path: model file for "mlp" (default: the one the session was recorded with)
+        """
+        self.session = session
+        self.respect_active = respect_active
+        self.clock = SessionClock()
+        # Settings as recorded; main.py also stores the model file the classifier actually loaded
+        self.recorded = dict(session.settings)
+        model_used = session.header.get("meta", {}).get("model_path")
+        if model_used:
+            self.recorded["GESTURE_MODEL_PATH"] = model_used
+        self.classifier_name = classifier or self.recorded.get("GESTURE_CLASSIFIER") or Settings.GESTURE_CLASSIFIER
+        self.model_path = model_path or self.recorded.get("GESTURE_MODEL_PATH") or Settings.GESTURE_MODEL_PATH
+        self.classifier = make_classifier(self.classifier_name, self.model_path)
+        self.registry = HandRegistry(clock=self.clock)
+        self.backend = RecordingBackend(clock=self.clock)
+        self.mapper = ActionMapper(self.backend, threaded=False, clock=self.clock)
+        self._hands = np.zeros((session.max_hands, 21, 3), dtype=np.float32)
+
+    def check_settings(self):
+        """
+        Warns about settings that differ from the ones the session was recorded with.
+        """
+        # The classifier comes from the session unless overridden, not from Settings
+        used = {"GESTURE_CLASSIFIER": self.classifier_name, "GESTURE_MODEL_PATH": self.model_path}
+        for name, recorded in self.recorded.items():
+            if name == "GESTURE_MODEL_PATH" and self.classifier_name != "mlp":
+                continue
+            current = used[name] if name in used else getattr(Settings, name, None)
+            if current != recorded:
+                log.warning(f"Settings.{name} is {current!r}, session was recorded with {recorded!r}")
+
+    def run(self, limit=None):
+        """
+        Replays the session (or its first `limit` frames).
+        Returns:
+            report dict (see module docstring)
+        """
+        records = self.session.records
+        n = len(records) if limit is None else min(limit, len(records))
+        t0 = float(records["timestamp"][0]) if n else 0.0
+        timings = np.zeros((n, len(self.STAGES)), dtype=np.int64)
+        gesture_frames = Counter()
+        events = []
+        last_gesture = {}   # hand id -> label
+
+        start = time.perf_counter_ns()
+        for i in range(n):
+            t_load = time.perf_counter_ns()
+            hands, handedness = self.session.hands(i, out=self._hands)
+            timestamp = float(records["timestamp"][i])
+            active = bool(records["flags"][i] & FLAG_ACTIVE) or not self.respect_active
+            self.clock.now = timestamp
+
+            t_track = time.perf_counter_ns()
+            tracks = track_hands(hands, handedness, self.registry, timestamp)
+
+            t_classify = time.perf_counter_ns()
+            raw_gestures, confidences = classify_hands(hands, handedness, self.classifier) if tracks else ([], None)
+
+            t_confirm = time.perf_counter_ns()
+            confirm_gestures(tracks, hands, raw_gestures, timestamp, confidences)
+
+            t_actions = time.perf_counter_ns()
+            if active:
+                execute_actions(tracks, hands, self.mapper, timestamp)
+            else:
+                self.mapper.release_all()
+            t_end = time.perf_counter_ns()
+
+            timings[i] = (t_track - t_load, t_classify - t_track, t_confirm - t_classify,
+                          t_actions - t_confirm, t_end - t_actions)
+
+            seen = set()
+            for track in tracks:
+                shown = gesture_label(track)
+                gesture_frames[shown] += 1
+                seen.add(track.id)
+                if last_gesture.get(track.id) != shown:
+                    events.append([round(timestamp - t0, 4), int(records["frame_id"][i]), track.id, shown])
+                    last_gesture[track.id] = shown
+            for hand_id in list(last_gesture):
+                if hand_id not in seen:
+                    del last_gesture[hand_id]
+
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        self.mapper.close()
+        return self._report(n, elapsed, timings, gesture_frames, events, t0)
+
+    def _report(self, n, elapsed, timings, gesture_frames, events, t0):
+        actions = [[round(t - t0, 4), method, list(args)]
+                   for t, method, args in self.backend.calls if method != "move_to"]
+        moves = sum(1 for _, method, _ in self.backend.calls if method == "move_to")
+        duration = float(self.session.records["timestamp"][n - 1]) - t0 if n else 0.0
+
+        stages = {}
+        for j, name in enumerate(self.STAGES):
+            us = timings[:, j] / 1000.0 if n else np.zeros(1)
+            stages[name] = {
+                "mean_us": float(us.mean()),
+                "p50_us": float(np.percentile(us, 50)),
+                "p95_us": float(np.percentile(us, 95)),
+                "p99_us": float(np.percentile(us, 99)),
+                "max_us": float(us.max()),
+            }
+
+        return {
+            "session": self.session.path,
+            "frames": n,
+            "duration_s": duration,
+            "elapsed_s": elapsed,
+            "replay_fps": n / elapsed if elapsed else 0.0,
+            "realtime_factor": duration / elapsed if elapsed else 0.0,
+            "gesture_frames": dict(gesture_frames),
+            "events": events,
+            "action_counts": dict(Counter(a[1] for a in actions)),
+            "actions": actions,
+            "moves": moves,
+            "stages": stages,
+        }
+
+
+def compare(report, expected):
+    """
+    Differences in gesture events and actions between two reports.
+    Returns:
+        list of human-readable mismatch descriptions (empty if they agree)
+    """
+    problems = []
+    for key in ("events", "actions"):
+        got, want = report[key], expected[key]
+        for i, (g, w) in enumerate(zip(got, want)):
+            if g != w:
+                problems.append(f"{key}[{i}]: expected {w}, got {g}")
+                break
+        if len(got) != len(want):
+            problems.append(f"{key}: expected {len(want)} entries, got {len(got)}")
+    return problems
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a recorded AGOS session")
+    parser.add_argument("session", help="Session file written by main.py --record")
+    parser.add_argument("--frames", type=int, default=None, help="Only replay the first N frames")
+    parser.add_argument(
+        "--all-actions", action="store_true",
+        help="Execute actions on every frame, including ones recorded while paused"
+    )
+    parser.add_argument(
+        "--classifier", choices=sorted(CLASSIFIERS), default=None,
+        help="Static gesture classifier (default: the one the session was recorded with)"
+    )
+    parser.add_argument(
+        "--model", default=None, metavar="PATH",
+        help="Model for --classifier mlp (default: the one the session was recorded with)"
+    )
+    parser.add_argument("--json", default=None, help="Write the full report to this JSON file")
+    parser.add_argument(
+        "--expect", default=None,
+        help="Report JSON from a previous replay; exit with status 1 if gestures or actions differ"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    session = Session(args.session)
+    replayer = Replayer(session, respect_active=not args.all_actions, classifier=args.classifier,
+                        model_path=args.model)
+    print(f"Classifier: {replayer.classifier_name}"
+          + (f" ({replayer.classifier.model_path})" if replayer.classifier_name == "mlp" else ""))
+    replayer.check_settings()
+    report = replayer.run(args.frames)
+
+    print(f"Replayed {report['frames']} frames ({report['duration_s']:.1f}s recorded) in "
+          f"{report['elapsed_s'] * 1000:.1f} ms: {report['replay_fps']:.0f} FPS, "
+          f"{report['realtime_factor']:.0f}x real time")
+    for name, s in report["stages"].items():
+        print(f"{name:>9}: {s['mean_us']:8.1f} us mean, {s['p95_us']:8.1f} us p95, {s['p99_us']:8.1f} us p99")
+    print(f"Gestures (frames): {report['gesture_frames']}")
+    print(f"Actions: {report['action_counts']} + {report['moves']} cursor moves")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.json}")
+
+    if args.expect:
+        with open(args.expect) as f:
+            problems = compare(report, json.load(f))
+        if problems:
+            for problem in problems:
+                print(f"MISMATCH {problem}")
+            sys.exit(1)
+        print("Gestures and actions match the expected report.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Session recording format (.agr)
+
+    magic     8 bytes  b"AGOSREC1"
+    length    uint32   size of the JSON header in bytes
+    header    JSON     version, max_hands, source size/fps, settings snapshot...
+    padding   up to the next 64-byte boundary
+    records   fixed-size little-endian structs (see record_dtype), one per frame
+
+Records are read back with np.memmap, so opening a session costs nothing and a
+file cut short by a crash is still readable up to its last complete record.
+Compressed frames, when saved, go to a "<path>.frames" sidecar of concatenated
+JPEGs; each record holds the offset and size of its image.
+"""
+
+import json
+import os
+import time
+import cv2
+import numpy as np
+from AGOS.vision.landmark_array import LandmarkArray
+from AGOS.config.settings import Settings
+
+MAGIC = b"AGOSREC1"
+VERSION = 1
+ALIGN = 64
+
+HANDEDNESS_CODES = {None: 0, "Left": 1, "Right": 2}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+# Record flags
+FLAG_ACTIVE = 1      # Control mode was on (actions were executed)
+FLAG_PREDICTED = 2   # Landmarks were extrapolated, not inferred (AdaptiveTracker)
+
+# Settings that change what the gesture stack does with the same landmarks
+RECORDED_SETTINGS = (
+    "FPS_TARGET", "MAX_NUM_HANDS", "CONFIRM_WINDOW_MS", "CONFIRM_MODE", "CONFIRM_ENTER", "CONFIRM_EXIT",
+    "GESTURE_CLASSIFIER", "GESTURE_MODEL_PATH", "CLASSIFIER_MIN_CONFIDENCE", "ACTION_COOLDOWN_MS", "GESTURE_BINDINGS",
+    "CLICK_THRESHOLD_DIST", "LANDMARK_FILTER", "CURSOR_FILTER", "INPUT_MIN_INTERVAL_MS",
+)
+
+def record_dtype(max_hands):
+    return np.dtype([
+        ("frame_id", "<i8"),
+        ("timestamp", "<f8"),        # Seconds, as given to the gesture stack
+        ("count", "u1"),             # Hands detected
+        ("flags", "u1"),
+        ("handedness", "u1", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, LandmarkArray.NUM_LANDMARKS, 3)),
+        ("frame_offset", "<i8"),     # Into the .frames sidecar, -1 if no image
+        ("frame_size", "<i4"),
+    ])
+
+def frames_path(path):
+    return path + ".frames"
+
+
+class SessionWriter:
+    """
+    Appends per-frame landmark records to a session file.
+    Records are staged in a preallocated batch and written out in blocks, so
+    write() is a handful of array copies and only touches the disk every
+    `batch_size` frames.
+    """
+    def __init__(self, path, max_hands=None, save_frames=False, jpeg_quality=80,
+                 batch_size=256, meta=None):
+        """
+        path: session file to create (overwritten if it exists)
+        save_frames: also store JPEG-compressed frames in the sidecar
+        meta: extra JSON-serializable info for the header (source, resolution...)
+        """
+        if max_hands is None:
+            max_hands = Settings.MAX_NUM_HANDS
+        self.path = path
+        self.max_hands = max_hands
+        self.save_frames = save_frames
+        self.jpeg_params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self.frames_written = 0
+
+        self._batch = np.zeros(batch_size, dtype=record_dtype(max_hands))
+        self._pending = 0
+
+        header = {
+            "version": VERSION,
+            "max_hands": max_hands,
+            "num_landmarks": LandmarkArray.NUM_LANDMARKS,
+            "created": time.time(),
+            "frames_file": os.path.basename(frames_path(path)) if save_frames else None,
+            "settings": {name: getattr(Settings, name) for name in RECORDED_SETTINGS},
+            "meta": meta or {},
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        prefix_len = len(MAGIC) + 4 + len(header_bytes)
+        padding = b" " * (-prefix_len % ALIGN)
+
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._file.write(np.uint32(len(header_bytes) + len(padding)).tobytes())
+        self._file.write(header_bytes + padding)
+
+        self._frames_file = open(frames_path(path), "wb") if save_frames else None
+        self._frames_offset = 0
+
+    def write(self, frame_id, timestamp, hands, handedness, frame=None, flags=0):
+        """
+        frame_id: id of the camera frame
+        timestamp: capture time in seconds
+        hands: (N, 21, 3) landmark array, handedness: N labels
+        frame: BGR image to compress into the sidecar (ignored unless save_frames)
+        flags: FLAG_* bits
+        """
+        rec = self._batch[self._pending]
+        n = min(len(hands), self.max_hands)
+        rec["frame_id"] = frame_id
+        rec["timestamp"] = timestamp
+        rec["count"] = n
+        rec["flags"] = flags
+        rec["landmarks"][:n] = hands[:n]
+        rec["landmarks"][n:] = 0.0
+        rec["handedness"][:] = 0
+        for i in range(n):
+            rec["handedness"][i] = HANDEDNESS_CODES.get(handedness[i], 0)
+
+        rec["frame_offset"] = -1
+        rec["frame_size"] = 0
+        if self._frames_file is not None and frame is not None:
+            ok, jpeg = cv2.imencode(".jpg", frame, self.jpeg_params)
+            if ok:
+                self._frames_file.write(jpeg.tobytes())
+                rec["frame_offset"] = self._frames_offset
+                rec["frame_size"] = len(jpeg)
+                self._frames_offset += len(jpeg)
+
+        self._pending += 1
+        self.frames_written += 1
+        if self._pending == len(self._batch):
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._batch[:self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+        if self._frames_file is not None:
+            self._frames_file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        if self._frames_file is not None:
+            self._frames_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Session:
+    """
+    Read-only view of a recorded session.
+    session.records is a memory-mapped structured array with one row per frame.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an AGOS session recording")
+            header_len = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+            self.header = json.loads(f.read(header_len).decode("utf-8"))
+
+        if self.header["version"] != VERSION:
+            raise ValueError(f"Unsupported session version {self.header['version']}")
+
+        self.max_hands = self.header["max_hands"]
+        self.dtype = record_dtype(self.max_hands)
+        offset = len(MAGIC) + 4 + header_len
+        # A trailing partial record (interrupted write) is ignored
+        count = (os.path.getsize(path) - offset) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+        self._frames = None
+        if self.header.get("frames_file"):
+            sidecar = os.path.join(os.path.dirname(path), self.header["frames_file"])
+            if os.path.exists(sidecar) and os.path.getsize(sidecar) > 0:
+                self._frames = np.memmap(sidecar, dtype=np.uint8, mode="r")
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def settings(self):
+        return self.header.get("settings", {})
+
+    @property
+    def duration(self):
+        """
+        Recorded time span in seconds.
+        """
+        if len(self.records) < 2:
+            return 0.0
+        return float(self.records["timestamp"][-1] - self.records["timestamp"][0])
+
+    def hands(self, index, out=None):
+        """
+        Landmarks and handedness labels of one record.
+        out: (max_hands, 21, 3) float32 array to copy into (the gesture stack
+            modifies landmarks in place, so never hand out the memmap itself)
+        Returns:
+            (N, 21, 3) array, list of N labels
+        """
+        rec = self.records[index]
+        n = int(rec["count"])
+        if out is None:
+            out = np.empty(rec["landmarks"].shape, dtype=np.float32)
+        out[:n] = rec["landmarks"][:n]
+        labels = [HANDEDNESS_LABELS.get(int(c)) for c in rec["handedness"][:n]]
+        return out[:n], labels
+
+    def has_frames(self):
+        return self._frames is not None
+
+    def frame(self, index):
+        """
+        Decoded BGR frame of one record, or None if it wasn't saved.
+        """
+        rec = self.records[index]
+        if self._frames is None or rec["frame_offset"] < 0:
+            return None
+        start = int(rec["frame_offset"])
+        return cv2.imdecode(self._frames[start:start + int(rec["frame_size"])], cv2.IMREAD_COLOR)
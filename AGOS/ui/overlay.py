@@ -1,18 +1,22 @@
 import cv2
 from AGOS.config.settings import Settings
+from AGOS.utils import tracing
 
 class Overlay:
     def __init__(self):
         pass
 
-    def draw(self, frame, gesture_name, fps, mode="Control"):
+    @tracing.traced("overlay.draw")
+    def draw(self, frame, gesture_name, fps, mode="Control", frame_stats=None):
         """
         Draws the HUD overlay on the frame.
+        frame_stats: optional FPSCounter; adds last frame time and late/dropped counts
         """
         h, w, _ = frame.shape
         
         # 1. Background Panel for Text (Top Left)
-        cv2.rectangle(frame, (0, 0), (250, 110), (0, 0, 0), -1)
+        panel_h = 140 if frame_stats is not None else 110
+        cv2.rectangle(frame, (0, 0), (250, panel_h), (0, 0, 0), -1)
         # Add transparency? (Simulated by blending, but plain black is faster/clearer for now, or just low alpha)
         # OpenCV doesn't do alpha rects easily without arithmetic. Stick to solid for clarity.
         
@@ -20,6 +24,11 @@ class Overlay:
         self._put_text(frame, f"FPS: {int(fps)}", (10, 30))
         self._put_text(frame, f"Mode: {mode}", (10, 60), color=(0, 255, 255))
         self._put_text(frame, f"Gesture: {gesture_name}", (10, 90), color=(0, 255, 0) if gesture_name != "Idle" else (200, 200, 200))
+        if frame_stats is not None:
+            # Only O(1) fields here; percentiles are for the periodic log line
+            late_color = (0, 165, 255) if frame_stats.late_frames else (200, 200, 200)
+            self._put_text(frame, f"{frame_stats.frame_ms.last:.0f}ms late {frame_stats.late_frames}"
+                                  f" drop {frame_stats.dropped_frames}", (10, 120), color=late_color)
         
         # 3. Safety/Active Indicator (Top Right)
         color = (0, 255, 0) if mode == "Control" else (0, 0, 255)
@@ -1,36 +1,213 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+import time
 from datetime import datetime
+from AGOS.config.settings import Settings
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, thread, message, plus
+    the rate-limit bookkeeping when present.
+    """
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        key = getattr(record, "key", None)
+        if key is not None:
+            entry["key"] = key
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" (+{suppressed} similar suppressed)"
+        return text
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per-key token bucket, applied on the caller's thread before anything is queued.
+    The key is `extra={"key": ...}` if given, else the call site (file:line), which
+    is stable even for f-string messages. ERROR and above always pass.
+    Sampling: `extra={"sample": 0.1}` keeps every 10th occurrence of that key.
+    """
+    def __init__(self, rate_per_s=None, burst=None):
+        super().__init__()
+        self.rate_per_s = Settings.LOG_RATE_PER_S if rate_per_s is None else rate_per_s
+        self.burst = Settings.LOG_RATE_BURST if burst is None else burst
+        self.suppressed_total = 0
+        self._buckets = {}   # key -> [tokens, last_refill, suppressed_since_last_emit, seen]
+        self._lock = threading.Lock()
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py).
+        """
+        self.rate_per_s = Settings.LOG_RATE_PER_S
+        self.burst = Settings.LOG_RATE_BURST
+
+    def filter(self, record):
+        key = getattr(record, "key", None) or f"{record.pathname}:{record.lineno}"
+        sample = getattr(record, "sample", None)
+        now = time.monotonic()
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0, 0]
+            bucket[3] += 1
+
+            if sample is not None and sample < 1.0:
+                every = max(int(round(1.0 / sample)), 1) if sample > 0 else 0
+                if not every or (bucket[3] - 1) % every:
+                    bucket[2] += 1
+                    self.suppressed_total += 1
+                    return False
+
+            if record.levelno < logging.ERROR and self.rate_per_s > 0:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_per_s)
+                bucket[1] = now
+                if bucket[0] < 1.0:
+                    bucket[2] += 1
+                    self.suppressed_total += 1
+                    return False
+                bucket[0] -= 1.0
+
+            record.suppressed = bucket[2]
+            bucket[2] = 0
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never waits: when the bounded queue is full the record is
+    dropped and counted. Formatting is left to the listener thread; only the
+    message text is resolved here so later changes to its arguments don't leak in.
+    """
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Traceback objects keep frames alive; render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener whose stop() waits for room in the bounded queue instead of
+    failing with queue.Full, so everything queued at exit is still written.
+    """
+    SENTINEL_TIMEOUT_S = 5.0
+
+    def enqueue_sentinel(self):
+        try:
+            self.queue.put(self._sentinel, timeout=self.SENTINEL_TIMEOUT_S)
+        except queue.Full:
+            # The listener isn't draining (stuck output): give up the oldest record to stop it
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(self._sentinel)
+
 
 class Logger:
+    listener = None
+    queue_handler = None
+    rate_limiter = None
+
     @staticmethod
     def setup_logger(name: str = "AGOS"):
         """
-        Sets up a logger with console and file handlers.
+        Sets up a logger whose records go through a bounded queue to a listener
+        thread that writes them to the console (and LOG_FILE if set), so logging
+        from the frame loop never blocks on I/O.
         """
         logger = logging.getLogger(name)
         logger.setLevel(logging.DEBUG)
+        logger.propagate = False
 
         # formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        if Settings.LOG_FORMAT == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = TextFormatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
 
         # stdout
         stream_handler = logging.StreamHandler(sys.stdout)
         stream_handler.setLevel(logging.INFO)
         stream_handler.setFormatter(formatter)
-        logger.addHandler(stream_handler)
+        handlers = [stream_handler]
 
         # file
-        # ensure logs dir exists or just write to root for now?
-        # User structure didn't specify logs dir, so I'll keep it simple or put in root.
-        # Let's avoid file logging to keep it clean unless requested, 
-        # but "production quality" usually implies file logs.
-        # I'll stick to console for now to avoid file permission clutter, 
-        # or maybe a single run.log.
-        
+        if Settings.LOG_FILE:
+            file_handler = logging.FileHandler(Settings.LOG_FILE)
+            file_handler.setLevel(logging.DEBUG)
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+
+        log_queue = queue.Queue(maxsize=Settings.LOG_QUEUE_SIZE)
+        Logger.queue_handler = NonBlockingQueueHandler(log_queue)
+        # Don't queue records no output would write
+        Logger.queue_handler.setLevel(min(h.level for h in handlers))
+        Logger.rate_limiter = RateLimitFilter()
+        Logger.queue_handler.addFilter(Logger.rate_limiter)
+        logger.addHandler(Logger.queue_handler)
+
+        Logger.listener = FlushingQueueListener(log_queue, *handlers, respect_handler_level=True)
+        Logger.listener.start()
+        atexit.register(Logger.shutdown)
+
         return logger
 
+    @staticmethod
+    def stats():
+        return {
+            "queued": Logger.queue_handler.queue.qsize() if Logger.queue_handler else 0,
+            "dropped": Logger.queue_handler.dropped if Logger.queue_handler else 0,
+            "suppressed": Logger.rate_limiter.suppressed_total if Logger.rate_limiter else 0,
+        }
+
+    @staticmethod
+    def shutdown():
+        """
+        Flushes everything still queued. Safe to call more than once.
+        """
+        if Logger.listener is not None:
+            Logger.listener.stop()
+            Logger.listener = None
+
 # Singleton instance
 log = Logger.setup_logger()
@@ -0,0 +1,221 @@
+"""
+Lightweight span tracing for the hot path.
+
+    with tracing.span("tracker.inference"):
+        ...
+
+    @tracing.traced("overlay.draw")
+    def draw(...):
+        ...
+
+When tracing is disabled (the default) a span is a shared no-op object and a
+traced function costs one flag check. When enabled, each finished span appends
+(name, start_ns, end_ns) to a bounded buffer owned by the calling thread, so
+recording never takes a lock. Buffers can be exported as Chrome trace-event JSON
+(chrome://tracing, Perfetto) and summarized periodically through the logger.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+from AGOS.config.settings import Settings
+from AGOS.utils.logger import log
+
+_enabled = False
+_buffer_size = Settings.TRACE_BUFFER_SIZE
+_origin_ns = time.perf_counter_ns()
+
+_local = threading.local()
+_buffers = []                       # Every thread's buffer, for export
+_registry_lock = threading.Lock()   # Only taken when a thread records its first span
+
+
+class _ThreadBuffer:
+    def __init__(self, size):
+        thread = threading.current_thread()
+        self.tid = thread.ident
+        self.thread_name = thread.name
+        # Oldest spans fall off once full; appends are atomic and only this thread writes
+        self.events = deque(maxlen=size)
+
+
+def _buffer():
+    buf = getattr(_local, "buffer", None)
+    if buf is None:
+        buf = _local.buffer = _ThreadBuffer(_buffer_size)
+        with _registry_lock:
+            _buffers.append(buf)
+    return buf
+
+
+class _Span:
+    __slots__ = ("name", "start_ns")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _buffer().events.append((self.name, self.start_ns, time.perf_counter_ns()))
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """
+    Context manager timing the enclosed block as `name`.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+def traced(name=None):
+    """
+    Decorator recording every call of the function as a span (default name: its qualname).
+    """
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _buffer().events.append((label, start_ns, time.perf_counter_ns()))
+        return wrapper
+    return decorate
+
+def enable(buffer_size=None):
+    """
+    buffer_size: spans kept per thread (applies to threads that haven't traced yet),
+        defaults to Settings.TRACE_BUFFER_SIZE
+    """
+    global _enabled, _buffer_size
+    _buffer_size = Settings.TRACE_BUFFER_SIZE if buffer_size is None else buffer_size
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def clear():
+    with _registry_lock:
+        for buf in _buffers:
+            buf.events.clear()
+
+def _snapshot():
+    """
+    (buffer, events) for every thread. list() over a deque runs without
+    releasing the GIL, so it is consistent even while the owner appends.
+    """
+    with _registry_lock:
+        buffers = list(_buffers)
+    return [(buf, list(buf.events)) for buf in buffers]
+
+def export_chrome_trace(path):
+    """
+    Writes all buffered spans as Chrome trace-event JSON.
+    Returns:
+        number of spans written
+    """
+    pid = os.getpid()
+    events = []
+    count = 0
+    for buf, spans in _snapshot():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": buf.tid,
+                       "args": {"name": buf.thread_name}})
+        for name, start_ns, end_ns in spans:
+            events.append({
+                "name": name, "cat": "agos", "ph": "X", "pid": pid, "tid": buf.tid,
+                "ts": (start_ns - _origin_ns) / 1000.0, "dur": (end_ns - start_ns) / 1000.0,
+            })
+            count += 1
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return count
+
+def summary(since_ns=0):
+    """
+    Per-span statistics over spans that started after `since_ns` (perf_counter_ns).
+    Returns:
+        {name: {"count", "total_ms", "mean_ms", "p95_ms", "max_ms"}}, busiest first
+    """
+    durations = {}
+    for _, spans in _snapshot():
+        for name, start_ns, end_ns in spans:
+            if start_ns >= since_ns:
+                durations.setdefault(name, []).append(end_ns - start_ns)
+
+    stats = {}
+    for name, values in durations.items():
+        ms = np.asarray(values, dtype=np.float64) / 1e6
+        stats[name] = {
+            "count": len(ms),
+            "total_ms": float(ms.sum()),
+            "mean_ms": float(ms.mean()),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "max_ms": float(ms.max()),
+        }
+    return dict(sorted(stats.items(), key=lambda item: -item[1]["total_ms"]))
+
+def log_summary(since_ns=0, top=8):
+    stats = summary(since_ns)
+    if not stats:
+        return
+    parts = ", ".join(
+        f"{name} {s['mean_ms']:.2f}ms x{s['count']} (p95 {s['p95_ms']:.2f})"
+        for name, s in list(stats.items())[:top]
+    )
+    log.info(f"Trace: {parts}")
+
+
+class TraceReporter:
+    """
+    Logs a span summary every `interval_s` seconds from a daemon thread.
+    """
+    def __init__(self, interval_s=None):
+        self.interval_s = Settings.TRACE_SUMMARY_INTERVAL_S if interval_s is None else interval_s
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="AGOS-Trace", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        since_ns = time.perf_counter_ns()
+        while not self._stop.wait(self.interval_s):
+            now_ns = time.perf_counter_ns()
+            log_summary(since_ns)
+            since_ns = now_ns
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=1.0)
@@ -0,0 +1,185 @@
+import math
+import time
+import numpy as np
+from AGOS.vision.hand_tracker import TrackingResult
+from AGOS.config.settings import Settings
+
+class AdaptiveTracker:
+    """
+    Wraps a HandTracker and runs the landmarker only every k-th frame.
+    In between, landmarks are extrapolated with a constant-velocity model so
+    the cursor keeps moving at display rate. k is re-tuned every frame from
+    measured costs so the loop stays within the FPS_TARGET frame budget.
+
+    Exposes the same surface the main loop uses (process, landmarks,
+    get_landmarks, draw_landmarks) so it can stand in for the tracker.
+    """
+    # Smoothing for the cost estimates
+    EMA_ALPHA = 0.1
+    # Keep this fraction of the budget spare so k doesn't flap at the boundary
+    HEADROOM = 0.9
+
+    def __init__(self, tracker, fps_target=None, max_skip=None, idle_ms=None):
+        """
+        tracker: HandTracker to wrap
+        fps_target: frame rate whose budget k is tuned for (default Settings.FPS_TARGET)
+        max_skip: upper bound for k (default Settings.ADAPTIVE_MAX_SKIP)
+        idle_ms: callable returning how long the loop waited for the current frame
+            (e.g. lambda: cam.last_wait_ms). Time between process() calls minus this
+            counts as other per-frame work. None = the tracker is the only work on
+            this thread (pipeline vision stage).
+        """
+        self.tracker = tracker
+        self.idle_ms = idle_ms
+        self.landmarks = tracker.landmarks   # Shared: predictions are written in place
+        self.budget_ms = 1000.0 / (Settings.FPS_TARGET if fps_target is None else fps_target)
+        self.max_skip = max(1, Settings.ADAPTIVE_MAX_SKIP if max_skip is None else max_skip)
+
+        self.k = 1                    # Current inference interval in frames
+        self.inferred_frames = 0
+        self.predicted_frames = 0
+        self.infer_ms = 0.0           # EMA of landmarker cost per inference
+        self.other_ms = 0.0           # EMA of the rest of the loop's work per frame
+
+        shape = tracker.landmarks.data.shape
+        self._base = np.zeros(shape, dtype=np.float32)      # Last inferred landmarks
+        self._velocity = np.zeros(shape, dtype=np.float32)  # Per-landmark units per ms
+        self._base_count = 0
+        self._base_ts = None
+        self._base_result = None
+        self._since_infer = 0
+        self._last_return_ns = None
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py); also forwards to the wrapped tracker.
+        """
+        self.budget_ms = 1000.0 / Settings.FPS_TARGET
+        self.max_skip = max(1, Settings.ADAPTIVE_MAX_SKIP)
+        self.tracker.configure(changes)
+
+    def process(self, frame, timestamp_ms=None):
+        """
+        Same contract as HandTracker.process. On skipped frames, and in LIVE_STREAM
+        when no new result arrived, the returned TrackingResult has predicted=True
+        and the landmarks are extrapolated.
+        """
+        now_ns = time.perf_counter_ns()
+        if self.idle_ms is not None and self._last_return_ns is not None:
+            # Waiting for the camera isn't work; only count what the loop actually did
+            busy_ms = (now_ns - self._last_return_ns) / 1e6 - self.idle_ms()
+            self.other_ms = self._ema(self.other_ms, max(busy_ms, 0.0))
+
+        if timestamp_ms is None:
+            timestamp_ms = self.tracker.now_ms()
+
+        if self._base_result is None or self._since_infer + 1 >= self.k:
+            result = self._infer(frame, timestamp_ms)
+        else:
+            result = self._predict(timestamp_ms)
+
+        self._retune()
+        self._last_return_ns = time.perf_counter_ns()
+        return result
+
+    def _infer(self, frame, timestamp_ms):
+        start_ns = time.perf_counter_ns()
+        result = self.tracker.process(frame, timestamp_ms)
+        self.infer_ms = self._ema(self.infer_ms, (time.perf_counter_ns() - start_ns) / 1e6)
+        self.inferred_frames += 1
+        self._since_infer = 0
+
+        if result is None:
+            return result
+        if result is self._base_result:
+            # LIVE_STREAM hasn't delivered anything new: the landmarks still hold the last
+            # prediction, so keep extrapolating with the current motion model
+            return self._extrapolate(timestamp_ms, self.tracker.frame_id - result.frame_id)
+
+        n = len(self.landmarks)
+        hands = self.landmarks.data[:n]
+        if n and n == self._base_count and result.timestamp_ms > self._base_ts:
+            dt = result.timestamp_ms - self._base_ts
+            np.subtract(hands, self._base[:n], out=self._velocity[:n])
+            self._velocity[:n] /= dt
+        else:
+            # New or lost hands: no motion history to extrapolate from
+            self._velocity[:n] = 0.0
+
+        self._base[:n] = hands
+        self._base_count = n
+        self._base_ts = result.timestamp_ms
+        self._base_result = result
+        return result
+
+    def _predict(self, timestamp_ms):
+        self.predicted_frames += 1
+        self._since_infer += 1
+        return self._extrapolate(timestamp_ms, self._since_infer)
+
+    def _extrapolate(self, timestamp_ms, age_frames):
+        """
+        Fills the landmarks from the last inferred ones moved along their velocity.
+        Returns:
+            predicted TrackingResult for this frame
+        """
+        n = self._base_count
+        hands = self.landmarks.data[:n]
+        dt = timestamp_ms - self._base_ts
+        np.multiply(self._velocity[:n], dt, out=hands)
+        hands += self._base[:n]
+        np.clip(hands[..., :2], 0.0, 1.0, out=hands[..., :2])
+        self.landmarks.count = n
+
+        if self.tracker.roi_planner:
+            # Let the crop follow the predicted hand
+            self.tracker.roi_planner.update(hands)
+
+        base = self._base_result
+        result = TrackingResult(base.raw, self.tracker.frame_id, timestamp_ms, 0.0, base.roi)
+        result.predicted = True
+        result.age_frames = age_frames
+        return result
+
+    def _retune(self):
+        """
+        Pick the smallest k with other + infer / k inside the frame budget.
+        """
+        spare_ms = self.budget_ms * self.HEADROOM - self.other_ms
+        if spare_ms <= 0:
+            k = self.max_skip
+        else:
+            k = math.ceil(self.infer_ms / spare_ms)
+        self.k = min(max(k, 1), self.max_skip)
+
+    def _ema(self, value, sample):
+        if value == 0.0:
+            return sample
+        return value + self.EMA_ALPHA * (sample - value)
+
+    @property
+    def inference_ratio(self):
+        """
+        Fraction of frames that ran the landmarker.
+        """
+        total = self.inferred_frames + self.predicted_frames
+        return self.inferred_frames / total if total else 1.0
+
+    def stats(self):
+        return {
+            "k": self.k,
+            "inferred_frames": self.inferred_frames,
+            "predicted_frames": self.predicted_frames,
+            "inference_ratio": self.inference_ratio,
+            "infer_ms": self.infer_ms,
+            "other_ms": self.other_ms,
+        }
+
+    def now_ms(self):
+        return self.tracker.now_ms()
+
+    def get_landmarks(self):
+        return self.tracker.get_landmarks()
+
+    def draw_landmarks(self, frame, hands=None):
+        return self.tracker.draw_landmarks(frame, hands)
@@ -0,0 +1,199 @@
+import math
+import numpy as np
+from AGOS.config.settings import Settings
+
+class Filter:
+    """
+    Time-aware smoothing filter over a fixed-shape float array.
+    All state is preallocated; filter() updates it in place and returns an internal
+    buffer (copy it if you need to keep a value across calls).
+    """
+    def __init__(self, shape):
+        self.shape = shape
+        self.value = np.zeros(shape, dtype=np.float64)  # Filtered output
+        self.t_prev = None
+
+    def filter(self, x, t):
+        """
+        x: new measurement (array of `shape`)
+        t: its timestamp in seconds (frame capture time, not processing time)
+        Returns:
+            filtered value
+        """
+        if self.t_prev is None:
+            self.value[...] = x
+            self._init(x)
+            self.t_prev = t
+            return self.value
+
+        dt = t - self.t_prev
+        if dt <= 0:
+            # Same or out-of-order frame: nothing new to integrate
+            return self.value
+
+        self.t_prev = t
+        self._step(x, dt)
+        return self.value
+
+    def reset(self):
+        self.t_prev = None
+
+    def _init(self, x):
+        pass
+
+    def _step(self, x, dt):
+        raise NotImplementedError
+
+
+class EMAFilter(Filter):
+    """
+    Exponential moving average whose weight adapts to the frame interval,
+    so the smoothing time constant stays the same when the frame rate varies.
+    alpha: weight of a new sample at ref_fps
+    """
+    def __init__(self, shape, alpha=None, ref_fps=None):
+        super().__init__(shape)
+        self.alpha = Settings.SMOOTHING_FACTOR if alpha is None else alpha
+        self.ref_fps = Settings.FPS_TARGET if ref_fps is None else ref_fps
+        self._tmp = np.zeros(shape, dtype=np.float64)
+
+    def _step(self, x, dt):
+        a = 1.0 - (1.0 - self.alpha) ** (dt * self.ref_fps)
+        np.subtract(x, self.value, out=self._tmp)
+        self._tmp *= a
+        self.value += self._tmp
+
+
+class OneEuroFilter(Filter):
+    """
+    One Euro filter (Casiez et al.): a low-pass whose cutoff rises with speed,
+    so slow movements are smoothed heavily and fast ones lag little.
+    min_cutoff: cutoff in Hz when still (lower = less jitter)
+    beta: cutoff increase per unit/s of speed (higher = less lag)
+    d_cutoff: cutoff for the speed estimate
+    """
+    def __init__(self, shape, min_cutoff=None, beta=None, d_cutoff=None):
+        super().__init__(shape)
+        self.min_cutoff = Settings.ONE_EURO_MIN_CUTOFF if min_cutoff is None else min_cutoff
+        self.beta = Settings.ONE_EURO_BETA if beta is None else beta
+        self.d_cutoff = Settings.ONE_EURO_D_CUTOFF if d_cutoff is None else d_cutoff
+        self.dx = np.zeros(shape, dtype=np.float64)   # Filtered speed
+        self._tmp = np.zeros(shape, dtype=np.float64)
+        self._alpha = np.zeros(shape, dtype=np.float64)
+
+    def _init(self, x):
+        self.dx[...] = 0.0
+
+    def _step(self, x, dt):
+        # Speed estimate, itself low-passed at d_cutoff
+        np.subtract(x, self.value, out=self._tmp)
+        self._tmp /= dt
+        a_d = self._smoothing(dt, self.d_cutoff)
+        self._tmp -= self.dx
+        self._tmp *= a_d
+        self.dx += self._tmp
+
+        # alpha = 1 / (1 + 1 / (2 * pi * cutoff * dt)), cutoff = min_cutoff + beta * |dx|
+        np.abs(self.dx, out=self._alpha)
+        self._alpha *= self.beta
+        self._alpha += self.min_cutoff
+        self._alpha *= 2 * math.pi * dt
+        np.reciprocal(self._alpha, out=self._alpha)
+        self._alpha += 1.0
+        np.reciprocal(self._alpha, out=self._alpha)
+
+        np.subtract(x, self.value, out=self._tmp)
+        self._tmp *= self._alpha
+        self.value += self._tmp
+
+    @staticmethod
+    def _smoothing(dt, cutoff):
+        return 1.0 / (1.0 + 1.0 / (2 * math.pi * cutoff * dt))
+
+
+class KalmanFilter(Filter):
+    """
+    Constant-velocity Kalman filter, run independently for every element.
+    process_noise: acceleration variance (higher = follows changes faster)
+    measurement_noise: variance of the raw measurements (higher = smoother)
+    """
+    def __init__(self, shape, process_noise=None, measurement_noise=None):
+        super().__init__(shape)
+        self.q = Settings.KALMAN_PROCESS_NOISE if process_noise is None else process_noise
+        self.r = Settings.KALMAN_MEASUREMENT_NOISE if measurement_noise is None else measurement_noise
+        self.velocity = np.zeros(shape, dtype=np.float64)
+        # Per-element 2x2 covariance [[p00, p01], [p01, p11]]
+        self.p00 = np.zeros(shape, dtype=np.float64)
+        self.p01 = np.zeros(shape, dtype=np.float64)
+        self.p11 = np.zeros(shape, dtype=np.float64)
+        self._k0 = np.zeros(shape, dtype=np.float64)
+        self._k1 = np.zeros(shape, dtype=np.float64)
+        self._y = np.zeros(shape, dtype=np.float64)
+        self._tmp = np.zeros(shape, dtype=np.float64)
+
+    def _init(self, x):
+        self.velocity[...] = 0.0
+        self.p00[...] = self.r
+        self.p01[...] = 0.0
+        self.p11[...] = 1.0
+
+    def _step(self, x, dt):
+        q = self.q
+        tmp = self._tmp
+        # Predict: x += v*dt, P = F P F^T + Q (white-noise acceleration)
+        np.multiply(self.velocity, dt, out=tmp)
+        self.value += tmp
+
+        # p00 += dt * (2*p01 + dt*p11) + q*dt^4/4
+        np.multiply(self.p11, dt, out=tmp)
+        tmp += self.p01
+        tmp += self.p01
+        tmp *= dt
+        self.p00 += tmp
+        self.p00 += q * dt ** 4 / 4
+
+        # p01 += dt*p11 + q*dt^3/2 ; p11 += q*dt^2
+        np.multiply(self.p11, dt, out=tmp)
+        self.p01 += tmp
+        self.p01 += q * dt ** 3 / 2
+        self.p11 += q * dt ** 2
+
+        # Update with the measured position
+        np.add(self.p00, self.r, out=self._k0)        # S
+        np.divide(self.p01, self._k0, out=self._k1)   # K1 = P01 / S
+        np.divide(self.p00, self._k0, out=self._k0)   # K0 = P00 / S
+        np.subtract(x, self.value, out=self._y)
+
+        np.multiply(self._k0, self._y, out=tmp)
+        self.value += tmp
+        np.multiply(self._k1, self._y, out=tmp)
+        self.velocity += tmp
+
+        # P = (I - K H) P
+        np.multiply(self._k1, self.p01, out=tmp)
+        self.p11 -= tmp
+        np.multiply(self._k0, self.p01, out=tmp)
+        self.p01 -= tmp
+        np.multiply(self._k0, self.p00, out=tmp)
+        self.p00 -= tmp
+
+
+# Settings baked into a filter when it is built
+FILTER_SETTINGS = ("SMOOTHING_FACTOR", "FPS_TARGET", "ONE_EURO_MIN_CUTOFF", "ONE_EURO_BETA", "ONE_EURO_D_CUTOFF",
+                   "KALMAN_PROCESS_NOISE", "KALMAN_MEASUREMENT_NOISE")
+
+FILTERS = {
+    "ema": EMAFilter,
+    "one_euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+def make_filter(name, shape):
+    """
+    Builds a filter by name ("ema", "one_euro", "kalman"), or None for "none".
+    """
+    if name in (None, "none"):
+        return None
+    if name not in FILTERS:
+        raise ValueError(f"Unknown filter {name!r}, expected one of {sorted(FILTERS)} or 'none'")
+    return FILTERS[name](shape)
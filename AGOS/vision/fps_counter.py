@@ -1,15 +1,142 @@
 import time
+import numpy as np
+from AGOS.config.settings import Settings
+
+class RollingWindow:
+    """
+    Fixed-size ring of the last `size` samples with a running sum.
+    push() is O(1); percentiles are computed on demand from the ring.
+    """
+    def __init__(self, size):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.size = size
+        self.count = 0      # Valid samples (<= size)
+        self.total = 0.0    # Sum of the valid samples
+        self.last = 0.0
+        self._next = 0
+
+    def push(self, value):
+        # Subtract whatever this slot held; zero while the ring is still filling
+        self.total += value - float(self.values[self._next])
+        self.values[self._next] = value
+        self._next = (self._next + 1) % self.size
+        if self._next == 0:
+            # Once per lap, resync the running sum so float error can't accumulate
+            self.total = float(self.values.sum())
+        self.count = min(self.count + 1, self.size)
+        self.last = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, ps=(50, 95, 99)):
+        if not self.count:
+            return [0.0] * len(ps)
+        return [float(v) for v in np.percentile(self.values[:self.count], ps)]
+
+    def reset(self):
+        self.values[:] = 0.0
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self._next = 0
+
 
 class FPSCounter:
-    def __init__(self):
-        self.prev_time = 0
-        self.curr_time = 0
-        self.fps = 0
+    """
+    Frame-rate and frame-time statistics over a rolling window of frames.
+    Call update() once per displayed frame; feed per-stage durations with
+    add_stage(). Both are O(1); percentiles and summaries are computed only
+    when asked for.
+    """
+    def __init__(self, window=None, target_fps=None, late_factor=None):
+        """
+        window: number of recent frames the statistics cover
+        target_fps: frame rate the loop is supposed to keep
+        late_factor: a frame is late when its frame time exceeds late_factor / target_fps
+        """
+        self.window = Settings.FPS_WINDOW if window is None else window
+        self.late_factor = Settings.LATE_FRAME_FACTOR if late_factor is None else late_factor
+        self.budget_ms = 1000.0 / (Settings.FPS_TARGET if target_fps is None else target_fps)
+        self.late_ms = self.budget_ms * self.late_factor
+
+        self.frame_ms = RollingWindow(self.window)
+        self.stages = {}      # Stage name -> RollingWindow of durations in ms
+        self.frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0  # Frame slots at target_fps skipped by late frames
+        self.fps = 0.0           # Smoothed over the window
+        self.instant_fps = 0.0   # From the last frame time alone
+        self._prev_ns = None
 
     def update(self):
-        self.curr_time = time.time()
-        delta = self.curr_time - self.prev_time
-        if delta > 0:
-            self.fps = 1 / delta
-        self.prev_time = self.curr_time
+        """
+        Marks the end of a frame.
+        Returns:
+            smoothed FPS
+        """
+        now_ns = time.perf_counter_ns()
+        self.frames += 1
+        if self._prev_ns is not None:
+            dt_ms = (now_ns - self._prev_ns) / 1e6
+            self.frame_ms.push(dt_ms)
+            if dt_ms > self.late_ms:
+                self.late_frames += 1
+                self.dropped_frames += max(int(round(dt_ms / self.budget_ms)) - 1, 0)
+            self.instant_fps = 1000.0 / dt_ms if dt_ms > 0 else 0.0
+            self.fps = 1000.0 / self.frame_ms.mean if self.frame_ms.total > 0 else 0.0
+        self._prev_ns = now_ns
         return self.fps
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py): picks up a new FPS_TARGET / LATE_FRAME_FACTOR.
+        """
+        self.late_factor = Settings.LATE_FRAME_FACTOR
+        self.budget_ms = 1000.0 / Settings.FPS_TARGET
+        self.late_ms = self.budget_ms * self.late_factor
+
+    def add_stage(self, name, ms):
+        """
+        Records how long stage `name` took for the current frame.
+        """
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = RollingWindow(self.window)
+        stage.push(ms)
+
+    def stats(self):
+        p50, p95, p99 = self.frame_ms.percentiles()
+        stages = {}
+        for name, w in list(self.stages.items()):
+            s50, s95, s99 = w.percentiles()
+            stages[name] = {"mean_ms": w.mean, "p50_ms": s50, "p95_ms": s95, "p99_ms": s99}
+        return {
+            "fps": self.fps,
+            "frames": self.frames,
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+            "frame_ms": {"mean_ms": self.frame_ms.mean, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99},
+            "stages": stages,
+        }
+
+    def summary(self):
+        """
+        One-line text summary for the log.
+        """
+        p50, p95, p99 = self.frame_ms.percentiles()
+        stages = ", ".join(f"{name} {w.mean:.1f}ms" for name, w in list(self.stages.items()))
+        return (f"{self.fps:.1f} FPS, frame {p50:.1f}/{p95:.1f}/{p99:.1f}ms p50/p95/p99,"
+                f" {self.late_frames} late, {self.dropped_frames} dropped"
+                + (f" | {stages}" if stages else ""))
+
+    def reset(self):
+        self.frame_ms.reset()
+        self.stages.clear()
+        self.frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.fps = 0.0
+        self.instant_fps = 0.0
+        self._prev_ns = None
@@ -2,107 +2,280 @@ import cv2
 import mediapipe as mp
 import time
 import os
+import threading
+import numpy as np
 from AGOS.config.settings import Settings
+from AGOS.vision.landmark_array import LandmarkArray
+from AGOS.vision.roi import RoiPlanner, crop_and_scale, map_to_frame
 from AGOS.utils.logger import log
+from AGOS.utils import tracing
+
+FULL_FRAME = (0.0, 0.0, 1.0, 1.0)
+
+class TrackingResult:
+    """
+    Landmarker output tied to the frame it was computed from.
+    """
+    def __init__(self, raw, frame_id, timestamp_ms, latency_ms, roi=FULL_FRAME):
+        self.raw = raw                         # MediaPipe HandLandmarkerResult
+        self.hand_landmarks = raw.hand_landmarks  # Normalized to `roi`, not the full frame
+        self.roi = roi                         # Normalized (x0, y0, x1, y1) inference region
+        self.handedness = raw.handedness
+        self.frame_id = frame_id               # Tracker frame counter of the source frame
+        self.timestamp_ms = timestamp_ms       # Monotonic timestamp of the source frame
+        self.latency_ms = latency_ms           # Submit -> result, i.e. inference latency
+        self.age_frames = 0                    # Frames submitted since the source frame
+        self.predicted = False                 # True if landmarks were extrapolated, not inferred
 
 class HandTracker:
-    def __init__(self):
+    RUNNING_MODES = ("IMAGE", "VIDEO", "LIVE_STREAM")
+
+    # Standard MediaPipe connections
+    CONNECTIONS = [
+        (0,1), (1,2), (2,3), (3,4), # Thumb
+        (0,5), (5,6), (6,7), (7,8), # Index
+        (5,9), (9,10), (10,11), (11,12), # Middle
+        (9,13), (13,14), (14,15), (15,16), # Ring
+        (13,17), (17,18), (18,19), (19,20), # Pinky
+        (0,17) # Wrist to Pinky Base
+    ]
+
+    # Settings that need a new landmarker; it is built in the background while the old one keeps running
+    LANDMARKER_SETTINGS = ("MIN_DETECTION_CONFIDENCE", "MIN_TRACKING_CONFIDENCE")
+    ROI_SETTINGS = ("ROI_TRACKING", "ROI_PADDING", "ROI_MIN_SIZE", "ROI_REFRESH_FRAMES")
+
+    def __init__(self, running_mode=None, roi_tracking=None, inference_max_side=None):
+        """
+        Arguments default to Settings.TRACKER_RUNNING_MODE / ROI_TRACKING / INFERENCE_MAX_SIDE.
+        running_mode: IMAGE (independent frames), VIDEO (synchronous, tracked across
+        frames) or LIVE_STREAM (asynchronous, results arrive via callback)
+        roi_tracking: crop inference to the padded box around the previous hands (IMAGE
+            mode only; VIDEO / LIVE_STREAM track hands between full frames themselves)
+        inference_max_side: downscale the inference image to this longer side (0 = off)
+        """
+        running_mode = Settings.TRACKER_RUNNING_MODE if running_mode is None else running_mode
+        roi_tracking = Settings.ROI_TRACKING if roi_tracking is None else roi_tracking
+        inference_max_side = Settings.INFERENCE_MAX_SIDE if inference_max_side is None else inference_max_side
+        if running_mode not in self.RUNNING_MODES:
+            raise ValueError(f"Unknown running mode {running_mode!r}, expected one of {self.RUNNING_MODES}")
+        self.running_mode = running_mode
+        self.roi_planner = self._make_roi_planner(roi_tracking)
+        self.inference_max_side = inference_max_side
+
+        self.latest_result = None
+        self.frame_id = 0
+        self.preprocess_ms = 0.0  # Crop/scale + color conversion time of the last process()
+
+        # Landmarks of the latest result, refilled in place once per new result
+        self.landmarks = LandmarkArray(Settings.MAX_NUM_HANDS)
+        self._filled_result = None
+        self._last_timestamp_ms = -1
+        self._clock_origin_ns = time.monotonic_ns()
+
+        # LIVE_STREAM: frames awaiting a callback, keyed by timestamp -> (frame_id, submit_ns)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+        # Runtime config changes, applied at the start of the next process()
+        self._pending_changes = {}
+        self._next_landmarker = None
+
+        self.landmarker = self._create_landmarker()
+        self.mp_draw = mp.solutions.drawing_utils if hasattr(mp, 'solutions') else None 
+        # Note: mp.solutions might be missing, so we might need a custom drawer or try to import it if it exists elsewhere. 
+        # But we know mp.solutions is missing on this system.
+        # We will implement a simple drawer manually if needed or skip drawing for now to avoid crash.
+        log.info(f"HandTracker running in {running_mode} mode")
+
+    def _make_roi_planner(self, enabled):
+        """
+        ROI cropping is IMAGE only. VIDEO and LIVE_STREAM use the previous frame's hands as
+        the prior for the next one (skipping palm detection while tracking), in image
+        coordinates; crops that move every frame would break that prior.
+        """
+        if not enabled:
+            return None
+        if self.running_mode != "IMAGE":
+            log.warning(f"ROI tracking only works in IMAGE mode, disabled in {self.running_mode} mode")
+            return None
+        return RoiPlanner()
+
+    def _create_landmarker(self):
         # New Tasks API setup
         BaseOptions = mp.tasks.BaseOptions
         HandLandmarker = mp.tasks.vision.HandLandmarker
-        self.HandLandmarkerOptions = mp.tasks.vision.HandLandmarkerOptions
         VisionRunningMode = mp.tasks.vision.RunningMode
 
         # Model path
         model_path = os.path.join(os.path.dirname(__file__), 'hand_landmarker.task')
 
-        # State storage for callback
-        self.latest_result = None
-
-        def result_callback(result, output_image, timestamp_ms):
-            self.latest_result = result
+        extra = {}
+        if self.running_mode == "LIVE_STREAM":
+            extra["result_callback"] = self._on_result
 
-        options = self.HandLandmarkerOptions(
+        options = mp.tasks.vision.HandLandmarkerOptions(
             base_options=BaseOptions(model_asset_path=model_path),
-            running_mode=VisionRunningMode.LIVE_STREAM,
+            running_mode=getattr(VisionRunningMode, self.running_mode),
             num_hands=Settings.MAX_NUM_HANDS,
             min_hand_detection_confidence=Settings.MIN_DETECTION_CONFIDENCE,
             min_hand_presence_confidence=Settings.MIN_DETECTION_CONFIDENCE, # Approximation for tracking
             min_tracking_confidence=Settings.MIN_TRACKING_CONFIDENCE,
-            result_callback=result_callback
+            **extra
         )
-        
-        self.landmarker = HandLandmarker.create_from_options(options)
-        self.mp_draw = mp.solutions.drawing_utils if hasattr(mp, 'solutions') else None 
-        # Note: mp.solutions might be missing, so we might need a custom drawer or try to import it if it exists elsewhere. 
-        # But we know mp.solutions is missing on this system.
-        # We will implement a simple drawer manually if needed or skip drawing for now to avoid crash.
-        
-    def process(self, frame):
+        return HandLandmarker.create_from_options(options)
+
+    def configure(self, changes):
+        """
+        Config subscriber (see config/runtime.py). Safe to call from any thread: changes
+        are applied at the start of the next process(). A new landmarker (confidence
+        thresholds) is built on a background thread and swapped in once ready, so no
+        frame waits for the model to load.
+        """
+        with self._lock:
+            self._pending_changes.update(changes)
+        if any(key in changes for key in self.LANDMARKER_SETTINGS):
+            threading.Thread(target=self._rebuild_landmarker, name="AGOS-TrackerReload", daemon=True).start()
+
+    def _rebuild_landmarker(self):
+        try:
+            landmarker = self._create_landmarker()
+        except Exception as e:
+            log.error(f"Keeping the current hand landmarker, rebuild failed: {e}")
+            return
+        with self._lock:
+            stale, self._next_landmarker = self._next_landmarker, landmarker
+        if stale is not None:
+            stale.close()   # Superseded by a newer change before it was used
+
+    def _apply_changes(self):
+        with self._lock:
+            changes, self._pending_changes = self._pending_changes, {}
+            landmarker, self._next_landmarker = self._next_landmarker, None
+        if landmarker is not None:
+            old, self.landmarker = self.landmarker, landmarker
+            old.close()
+            log.info("Hand landmarker rebuilt with the new confidence thresholds")
+        if any(key in changes for key in self.ROI_SETTINGS):
+            # Keep --roi on unless the config itself switches ROI_TRACKING
+            enabled = Settings.ROI_TRACKING if "ROI_TRACKING" in changes else self.roi_planner is not None
+            self.roi_planner = self._make_roi_planner(enabled)
+        if "INFERENCE_MAX_SIDE" in changes:
+            self.inference_max_side = Settings.INFERENCE_MAX_SIDE
+
+    def process(self, frame, timestamp_ms=None):
         """
         Process the frame and find hands.
+        frame: BGR frame
+        timestamp_ms: capture time of the frame (e.g. from a recording); defaults to a
+            monotonic clock. Timestamps are forced to be strictly increasing.
         Returns:
-            results: Object with .hand_landmarks (list of lists)
-        """
-        # Convert BGR to RGB
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        
-        # Current timestamp in ms
-        timestamp_ms = int(time.time() * 1000)
-        
-        # Async detect
-        self.landmarker.detect_async(mp_image, timestamp_ms)
-        
-        # Return latest available result
-        return self.latest_result
-
-    def draw_landmarks(self, frame):
+            TrackingResult for this frame (IMAGE/VIDEO), or the newest one delivered
+            so far (LIVE_STREAM, may be None or several frames old - see age_frames)
+        """
+        if self._pending_changes or self._next_landmarker is not None:
+            self._apply_changes()
+        self.frame_id += 1
+        timestamp_ms = self._next_timestamp(timestamp_ms)
+
+        # Crop / downscale first so the color conversion only touches the pixels we use
+        prep_start_ns = time.perf_counter_ns()
+        with tracing.span("tracker.preprocess"):
+            roi = self.roi_planner.next_roi() if self.roi_planner else None
+            image, roi = crop_and_scale(frame, roi, self.inference_max_side)
+
+            # Convert BGR to RGB
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        self.preprocess_ms = (time.perf_counter_ns() - prep_start_ns) / 1e6
+
+        if self.running_mode == "LIVE_STREAM":
+            with self._lock:
+                self._in_flight[timestamp_ms] = (self.frame_id, time.perf_counter_ns(), roi)
+            with tracing.span("tracker.submit"):
+                self.landmarker.detect_async(mp_image, timestamp_ms)
+        else:
+            start_ns = time.perf_counter_ns()
+            with tracing.span("tracker.inference"):
+                if self.running_mode == "VIDEO":
+                    raw = self.landmarker.detect_for_video(mp_image, timestamp_ms)
+                else:
+                    raw = self.landmarker.detect(mp_image)
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
+            self.latest_result = TrackingResult(raw, self.frame_id, timestamp_ms, latency_ms, roi)
+
+        result = self.latest_result
+        if result is not None:
+            result.age_frames = self.frame_id - result.frame_id
+            if result is not self._filled_result:
+                self._fill_landmarks(result)
+        return result
+
+    @tracing.traced("tracker.fill_landmarks")
+    def _fill_landmarks(self, result):
+        self.landmarks.fill(result.hand_landmarks, result.handedness)
+        if result.roi != FULL_FRAME:
+            map_to_frame(self.landmarks.hands, result.roi)
+        self._filled_result = result
+
+        if self.roi_planner:
+            # Hand lost -> next frame searches the full frame again
+            self.roi_planner.update(self.landmarks.hands)
+
+    def now_ms(self):
+        """
+        Current time on the tracker's monotonic clock (the default frame timestamp).
+        """
+        return (time.monotonic_ns() - self._clock_origin_ns) // 1_000_000
+
+    def _next_timestamp(self, timestamp_ms):
+        """
+        MediaPipe rejects timestamps that repeat or go backwards, so bump them if needed.
+        """
+        if timestamp_ms is None:
+            timestamp_ms = self.now_ms()
+        timestamp_ms = max(int(timestamp_ms), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def _on_result(self, raw, output_image, timestamp_ms):
+        with self._lock:
+            frame_id, submit_ns, roi = self._in_flight.pop(
+                timestamp_ms, (self.frame_id, time.perf_counter_ns(), FULL_FRAME)
+            )
+            # Anything older than this result was skipped by the landmarker
+            for ts in [ts for ts in self._in_flight if ts < timestamp_ms]:
+                del self._in_flight[ts]
+        latency_ms = (time.perf_counter_ns() - submit_ns) / 1e6
+        self.latest_result = TrackingResult(raw, frame_id, timestamp_ms, latency_ms, roi)
+
+    @tracing.traced("tracker.draw_landmarks")
+    def draw_landmarks(self, frame, hands=None):
         """
         Draws landmarks on the frame.
         Manual implementation since mp.solutions.drawing_utils depends on solutions.
+        hands: (N, 21, 3) landmark array to draw (defaults to the latest detection)
         """
-        if self.latest_result and self.latest_result.hand_landmarks:
-            for hand_landmarks in self.latest_result.hand_landmarks:
-                # hand_landmarks is a list of NormalizedLandmark
-                h, w, _ = frame.shape
-                
-                # Draw connections (simple)
-                # We need definitions of connections. 
-                # Standard MediaPipe connections:
-                CONNECTIONS = [
-                    (0,1), (1,2), (2,3), (3,4), # Thumb
-                    (0,5), (5,6), (6,7), (7,8), # Index
-                    (5,9), (9,10), (10,11), (11,12), # Middle
-                    (9,13), (13,14), (14,15), (15,16), # Ring
-                    (13,17), (17,18), (18,19), (19,20), # Pinky
-                    (0,17) # Wrist to Pinky Base
-                ]
-                
-                # Draw lines
-                for start_idx, end_idx in CONNECTIONS:
-                    start = hand_landmarks[start_idx]
-                    end = hand_landmarks[end_idx]
-                    pt1 = (int(start.x * w), int(start.y * h))
-                    pt2 = (int(end.x * w), int(end.y * h))
-                    cv2.line(frame, pt1, pt2, (0, 255, 0), 2)
-                
-                # Draw points
-                for lm in hand_landmarks:
-                    cx, cy = int(lm.x * w), int(lm.y * h)
-                    cv2.circle(frame, (cx, cy), 4, (0, 0, 255), -1)
+        if hands is None:
+            hands = self.landmarks.hands
+
+        h, w, _ = frame.shape
+        scale = np.array([w, h], dtype=np.float32)
+        for hand in hands:
+            # Pixel coordinates for all 21 points at once
+            pts = (hand[:, :2] * scale).astype(np.int32)
+
+            # Draw lines
+            for start_idx, end_idx in self.CONNECTIONS:
+                cv2.line(frame, tuple(pts[start_idx]), tuple(pts[end_idx]), (0, 255, 0), 2)
+
+            # Draw points
+            for cx, cy in pts:
+                cv2.circle(frame, (int(cx), int(cy)), 4, (0, 0, 255), -1)
 
         return frame
 
     def get_landmarks(self):
         """
-        Returns the first hand's landmarks wrapper to match old API if possible.
-        The old API returned an object where .landmark was the list.
-        The new API result.hand_landmarks[0] IS the list.
-        """
-        if self.latest_result and self.latest_result.hand_landmarks:
-            # Wrap it in an object with .landmark attribute to avoid rewriting all other code
-            class LandmarkWrapper:
-                def __init__(self, landmarks):
-                    self.landmark = landmarks
-            return LandmarkWrapper(self.latest_result.hand_landmarks[0])
-        return None
+        Returns the first hand's (21, 3) landmark array, or None if no hand is detected.
+        This is a view into self.landmarks, overwritten by the next detection.
+        """
+        return self.landmarks.hand(0)
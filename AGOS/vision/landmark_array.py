@@ -0,0 +1,50 @@
+import numpy as np
+from AGOS.config.settings import Settings
+
+class LandmarkArray:
+    """
+    Landmarks for every detected hand in one preallocated (max_hands, 21, 3) float32 array.
+    Columns are normalized x, y and relative depth z. Filled once per detection result;
+    gesture code works on array views instead of MediaPipe landmark objects.
+    """
+    NUM_LANDMARKS = 21
+
+    def __init__(self, max_hands=None):
+        if max_hands is None:
+            max_hands = Settings.MAX_NUM_HANDS
+        self.data = np.zeros((max_hands, self.NUM_LANDMARKS, 3), dtype=np.float32)
+        self.handedness = [None] * max_hands  # "Left" / "Right" per hand, when known
+        self.count = 0
+
+    def fill(self, hand_landmarks, handedness=None):
+        """
+        Copies MediaPipe output into the array.
+        hand_landmarks: list (per hand) of 21 NormalizedLandmark
+        handedness: matching list of category lists from the landmarker
+        """
+        self.count = min(len(hand_landmarks), len(self.data))
+        for h in range(self.count):
+            self.data[h] = [(lm.x, lm.y, lm.z) for lm in hand_landmarks[h]]
+            self.handedness[h] = handedness[h][0].category_name if handedness else None
+        return self
+
+    def clear(self):
+        self.count = 0
+
+    @property
+    def hands(self):
+        """
+        (count, 21, 3) view of the detected hands.
+        """
+        return self.data[:self.count]
+
+    def hand(self, index=0):
+        """
+        (21, 3) view of one hand, or None if it wasn't detected.
+        """
+        if index >= self.count:
+            return None
+        return self.data[index]
+
+    def __len__(self):
+        return self.count
@@ -1,22 +1,84 @@
 import math
 import numpy as np
 
+# MediaPipe hand landmark indices used across the gesture code
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_MCP = 9
+PINKY_MCP = 17
+
+# Index, Middle, Ring, Pinky
+FINGER_TIPS = [8, 12, 16, 20]
+FINGER_PIPS = [6, 10, 14, 18]
+
 class LandmarkUtils:
     @staticmethod
     def calculate_distance(p1, p2):
         """
         Calculate Euclidean distance between two normalized 2D points (x, y).
-        p1, p2: (x, y) tuples or objects with x, y attributes.
+        p1, p2: (x, y) tuples or landmark rows (x, y, z).
         """
-        # Handle MediaPipe NormalizedLandmark objects which have x, y attributes
-        x1, y1 = (p1.x, p1.y) if hasattr(p1, 'x') else p1
-        x2, y2 = (p2.x, p2.y) if hasattr(p2, 'x') else p2
-        
-        return math.hypot(x2 - x1, y2 - y1)
+        return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
 
     @staticmethod
     def get_coords(landmark, width, height):
         """
         Convert normalized landmark to pixel coordinates.
         """
-        return int(landmark.x * width), int(landmark.y * height)
+        return int(landmark[0] * width), int(landmark[1] * height)
+
+    @staticmethod
+    def pairwise_distances(hands, a, b):
+        """
+        2D distances between landmarks a and b for every hand.
+        hands: (..., 21, 3) array
+        a, b: landmark index or list of indices (same length)
+        Returns:
+            (...,) or (..., len(a)) array of distances
+        """
+        delta = hands[..., a, :2] - hands[..., b, :2]
+        return np.sqrt(np.sum(delta * delta, axis=-1))
+
+    @staticmethod
+    def is_upright(hands):
+        """
+        True where the wrist is below the middle finger MCP (Y increases downwards).
+        """
+        return hands[..., WRIST, 1] > hands[..., MIDDLE_FINGER_MCP, 1]
+
+    @staticmethod
+    def finger_extension(hands, upright=None):
+        """
+        Extended/folded state for [Thumb, Index, Middle, Ring, Pinky] of every hand.
+        hands: (N, 21, 3) array
+        upright: (N,) bool orientation, computed if not given
+        Returns:
+            (N, 5) bool array, True if extended
+        """
+        if upright is None:
+            upright = LandmarkUtils.is_upright(hands)
+
+        # Fingers: tip above PIP when upright, below it when the hand is inverted
+        tips_y = hands[:, FINGER_TIPS, 1]
+        pips_y = hands[:, FINGER_PIPS, 1]
+        fingers = np.where(upright[:, None], tips_y < pips_y, tips_y > pips_y)
+
+        # Thumb: extended if the tip is further from the pinky MCP than the IP joint is.
+        # Robust to rotation, unlike a plain Y comparison.
+        thumb = (LandmarkUtils.pairwise_distances(hands, THUMB_TIP, PINKY_MCP) >
+                 LandmarkUtils.pairwise_distances(hands, THUMB_IP, PINKY_MCP))
+
+        return np.concatenate([thumb[:, None], fingers], axis=1)
+
+    @staticmethod
+    def bounding_boxes(hands):
+        """
+        Normalized (x_min, y_min, x_max, y_max) box of every hand.
+        hands: (N, 21, 3) array
+        Returns:
+            (N, 4) array
+        """
+        xy = hands[..., :2]
+        return np.concatenate([xy.min(axis=-2), xy.max(axis=-2)], axis=-1)
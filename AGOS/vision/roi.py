@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+from AGOS.vision.landmark_utils import LandmarkUtils
+from AGOS.config.settings import Settings
+
+class RoiPlanner:
+    """
+    Picks the region of the next frame to send to the landmarker.
+    Uses the previous frame's hand boxes (padded) and falls back to the full frame
+    when no hand is visible, or every `refresh_frames` frames so new hands are found.
+    """
+    def __init__(self, padding=None, min_size=None, refresh_frames=None):
+        """
+        padding: margin added on each side, as a fraction of the hand box size
+        min_size: smallest ROI side, as a fraction of the frame
+        refresh_frames: force a full-frame search this often (0 = only when lost)
+        """
+        self.padding = Settings.ROI_PADDING if padding is None else padding
+        self.min_size = Settings.ROI_MIN_SIZE if min_size is None else min_size
+        self.refresh_frames = Settings.ROI_REFRESH_FRAMES if refresh_frames is None else refresh_frames
+        self.roi = None          # Normalized (x0, y0, x1, y1), None = full frame
+        self._since_full = 0
+
+    def next_roi(self):
+        """
+        ROI to use for the next frame, or None for a full-frame search.
+        """
+        if self.roi is None or (self.refresh_frames and self._since_full >= self.refresh_frames):
+            self._since_full = 0
+            return None
+        self._since_full += 1
+        return self.roi
+
+    def update(self, hands):
+        """
+        hands: (N, 21, 3) full-frame normalized landmarks of the latest result
+        """
+        if not len(hands):
+            self.roi = None
+            return
+
+        boxes = LandmarkUtils.bounding_boxes(hands)
+        x0, y0 = boxes[:, 0].min(), boxes[:, 1].min()
+        x1, y1 = boxes[:, 2].max(), boxes[:, 3].max()
+
+        # Pad, and grow small boxes to min_size around their center
+        w = max((x1 - x0) * (1 + 2 * self.padding), self.min_size)
+        h = max((y1 - y0) * (1 + 2 * self.padding), self.min_size)
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+
+        self.roi = (
+            float(np.clip(cx - w / 2, 0.0, 1.0)), float(np.clip(cy - h / 2, 0.0, 1.0)),
+            float(np.clip(cx + w / 2, 0.0, 1.0)), float(np.clip(cy + h / 2, 0.0, 1.0)),
+        )
+
+    def reset(self):
+        self.roi = None
+        self._since_full = 0
+
+def crop_and_scale(frame, roi, max_side=0):
+    """
+    Cuts the ROI out of the frame and optionally downscales it.
+    frame: full BGR frame
+    roi: normalized (x0, y0, x1, y1) or None for the whole frame
+    max_side: downscale so the longer side is at most this many pixels (0 = keep)
+    Returns:
+        image: BGR crop (a view when no scaling is needed)
+        roi: normalized rect actually used, snapped to whole pixels
+    """
+    h, w = frame.shape[:2]
+    if roi is None:
+        px0, py0, px1, py1 = 0, 0, w, h
+    else:
+        px0, py0 = int(roi[0] * w), int(roi[1] * h)
+        px1, py1 = max(int(np.ceil(roi[2] * w)), px0 + 1), max(int(np.ceil(roi[3] * h)), py0 + 1)
+
+    image = frame[py0:py1, px0:px1]
+
+    longest = max(px1 - px0, py1 - py0)
+    if max_side and longest > max_side:
+        scale = max_side / longest
+        size = (max(1, int((px1 - px0) * scale)), max(1, int((py1 - py0) * scale)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    return image, (px0 / w, py0 / h, px1 / w, py1 / h)
+
+def map_to_frame(hands, roi):
+    """
+    Converts landmarks normalized to the ROI into full-frame normalized coordinates, in place.
+    hands: (N, 21, 3) array
+    roi: normalized (x0, y0, x1, y1) the landmarks were computed on
+    """
+    x0, y0, x1, y1 = roi
+    hands[..., 0] *= (x1 - x0)
+    hands[..., 0] += x0
+    hands[..., 1] *= (y1 - y0)
+    hands[..., 1] += y0
+    # z is on roughly the same scale as x
+    hands[..., 2] *= (x1 - x0)
+    return hands
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+"""
+Benchmark YOLOv8 video detection: the per-frame loop against batched and pipelined inference,
+and optionally multi-process sharding.
+
+Every run decodes, detects, plots and encodes the same frames, like detect_video.py does,
+so the numbers are end-to-end throughput.
+
+Usage:
+    python scripts/bench_video.py <path_to_video> --frames 240 --batch-sizes 1 4 8 16 [--pipelined]
+    python scripts/bench_video.py <path_to_video> --frames 960 --batch-sizes 8 --workers 4
+
+With --workers the sharded run's detections are checked against the single-process run;
+the script exits with status 1 if they differ.
+
+Example (CPU-only box):
+    python scripts/bench_video.py data/sample.mp4
+"""
+
+import argparse
+import cv2
+import json
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+import torch
+from ultralytics import YOLO
+
+from detect_video import open_video, detect_per_frame, detect_batched, detect_pipelined, detect_sharded
+from detection_sinks import open_sink
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-frame vs batched YOLOv8 video benchmark")
+    parser.add_argument("source", help="Path to video file")
+    parser.add_argument(
+        "--frames", type=int, default=240, help="Frames per run"
+    )
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16],
+        help="Batch sizes to compare (1 = the per-frame loop)"
+    )
+    parser.add_argument(
+        "--conf", type=float, default=0.25, help="Confidence threshold (0-1)"
+    )
+    parser.add_argument(
+        "--pipelined", action="store_true",
+        help="Also time the threaded decode / infer / encode pipeline at each batch size"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0,
+        help="Also run detect_video.py --workers N (at the largest batch size) and check it matches"
+    )
+    return parser.parse_args()
+
+def run(model, source, batch_size, frames, conf, out_path, pipelined=False, detections_path=None):
+    """
+    Processes `frames` frames with the given batch size.
+    Returns:
+        (frames processed, seconds)
+    """
+    cap, width, height, fps = open_video(source)
+    out_writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    detections = open_sink(detections_path, fps=fps) if detections_path else None
+    start = time.perf_counter()
+    if pipelined:
+        count = detect_pipelined(model, cap, out_writer, conf, batch_size, width, height,
+                                 preview=False, max_frames=frames, detections=detections)
+    elif batch_size > 1:
+        count = detect_batched(model, cap, out_writer, conf, batch_size, width, height,
+                               preview=False, max_frames=frames, detections=detections)
+    else:
+        count = detect_per_frame(model, cap, out_writer, conf, preview=False, max_frames=frames, verbose=False,
+                                 detections=detections)
+    elapsed = time.perf_counter() - start
+    cap.release()
+    out_writer.release()
+    if detections is not None:
+        detections.close()
+    return count, elapsed
+
+def count_frames(path):
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.grab():
+        count += 1
+    cap.release()
+    return count
+
+def compare_detections(expected_path, actual_path, box_tol=1.0, score_tol=1e-3):
+    """
+    Compares two .jsonl detection files frame by frame. Batches split differently across
+    workers, so boxes and scores may differ by float noise; classes must match exactly.
+    Returns:
+        list of differences (empty if they match)
+    """
+    with open(expected_path) as f:
+        expected = [json.loads(line) for line in f]
+    with open(actual_path) as f:
+        actual = [json.loads(line) for line in f]
+    problems = []
+    if len(expected) != len(actual):
+        problems.append(f"{len(actual)} frames, expected {len(expected)}")
+    for want, got in zip(expected, actual):
+        frame = want["frame"]
+        if got["frame"] != frame:
+            problems.append(f"frame {frame}: got frame {got['frame']} in its place")
+        elif got["classes"] != want["classes"]:
+            problems.append(f"frame {frame}: classes {got['classes']}, expected {want['classes']}")
+        elif (not np.allclose(got["boxes"], want["boxes"], atol=box_tol)
+              or not np.allclose(got["scores"], want["scores"], atol=score_tol)):
+            problems.append(f"frame {frame}: boxes or scores differ")
+    return problems
+
+def bench_workers(model, args, tmp):
+    """
+    Single-process vs detect_sharded on the same frames.
+    Returns:
+        True if the outputs match
+    """
+    batch_size = max(args.batch_sizes)
+    single_video, single_detections = os.path.join(tmp, "single.mp4"), os.path.join(tmp, "single.jsonl")
+    sharded_video, sharded_detections = os.path.join(tmp, "sharded.mp4"), os.path.join(tmp, "sharded.jsonl")
+
+    count, single_s = run(model, args.source, batch_size, args.frames, args.conf, single_video,
+                          detections_path=single_detections)
+    start = time.perf_counter()
+    sharded = detect_sharded(args.source, sharded_video, args.conf, batch_size, args.workers,
+                             max_frames=args.frames, detections_path=sharded_detections)
+    sharded_s = time.perf_counter() - start
+
+    single_fps, sharded_fps = count / single_s, sharded / sharded_s
+    print(f"\n{'run':<20}  frames/sec  speedup")
+    print(f"{'1 process':<20}  {single_fps:>10.1f}  {1.0:>6.2f}x")
+    # Includes each worker loading the model and the stitching
+    print(f"{f'{args.workers} workers':<20}  {sharded_fps:>10.1f}  {sharded_fps / single_fps:>6.2f}x")
+
+    problems = compare_detections(single_detections, sharded_detections)
+    single_frames, sharded_frames = count_frames(single_video), count_frames(sharded_video)
+    if single_frames != sharded_frames:
+        problems.append(f"annotated video has {sharded_frames} frames, expected {single_frames}")
+    if problems:
+        print(f"Sharded output differs from the single-process run ({len(problems)} problems):")
+        for problem in problems[:10]:
+            print(f"  {problem}")
+        return False
+    print(f"Sharded output matches the single-process run ({count} frames).")
+    return True
+
+def main():
+    args = parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"Error: File {args.source} not found.")
+        return
+
+    print("Loading model...")
+    model = YOLO("yolov8n.pt")
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Device: {device}, torch threads: {torch.get_num_threads()}")
+
+    # Warm up: the first call fuses layers and sets up the predictor
+    cap, width, height, _ = open_video(args.source)
+    cap.release()
+    model(np.zeros((height, width, 3), dtype=np.uint8), verbose=False)
+
+    runs = [(batch_size, False) for batch_size in args.batch_sizes]
+    if args.pipelined:
+        runs += [(batch_size, True) for batch_size in args.batch_sizes]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for batch_size, pipelined in runs:
+            name = f"batch {batch_size}" + (" pipelined" if pipelined else "")
+            count, elapsed = run(model, args.source, batch_size, args.frames, args.conf,
+                                 os.path.join(tmp, name.replace(" ", "_") + ".mp4"), pipelined)
+            rows.append((name, batch_size, pipelined, count, elapsed))
+            print(f"{name}: {count} frames in {elapsed:.2f}s ({count / elapsed:.1f} frames/sec)")
+
+    base = next((count / elapsed for _, size, pipelined, count, elapsed in rows if size == 1 and not pipelined), None)
+    print(f"\n{'mode':<20}  frames/sec  ms/frame  speedup")
+    for name, _, _, count, elapsed in rows:
+        fps = count / elapsed
+        speedup = f"{fps / base:.2f}x" if base else "-"
+        print(f"{name:<20}  {fps:>10.1f}  {1000 / fps:>8.1f}  {speedup:>7}")
+
+    if args.workers > 1:
+        with tempfile.TemporaryDirectory() as tmp:
+            if not bench_workers(model, args, tmp):
+                sys.exit(1)
+
+if __name__ == "__main__":
+    main()
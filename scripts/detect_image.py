@@ -1,58 +1,325 @@
 #!/usr/bin/env python
 """
-Detect objects in a single image using YOLOv8.
+Detect objects in images using YOLOv8.
 
 Usage:
     python scripts/detect_image.py <path_to_image> --out <output_path> --conf <confidence>
 
 Example:
     python scripts/detect_image.py data/sample.jpg --out output.jpg
+
+Bulk mode (directories, globs or a file list; the model is loaded once):
+    python scripts/detect_image.py data/images/ "data/more/**/*.png" --list todo.txt --out-dir results/
+    python scripts/detect_image.py data/images/ --out-dir results/ --resume    # after a crash
+
+Detections only, as CSV / Parquet (no annotated images):
+    python scripts/detect_image.py data/images/ --detections results/boxes.parquet --no-render
 """
 
 import argparse
 import cv2
+import glob
+import json
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from ultralytics import YOLO
 
+from detection_sinks import open_sink, SINKS
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff")
+
 def parse_args():
     parser = argparse.ArgumentParser(description="YOLOv8 image detection")
-    parser.add_argument("image_path", help="Path to input image")
     parser.add_argument(
-        "--out", default="output.jpg", help="Path to save the annotated image"
+        "inputs", nargs="*", help="Image files, directories (searched recursively) or glob patterns"
+    )
+    parser.add_argument(
+        "--out", default="output.jpg", help="Path to save the annotated image (single image)"
     )
     parser.add_argument(
         "--conf", type=float, default=0.25, help="Confidence threshold (0-1)"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--list", default=None, metavar="FILE", help="Text file with one image path per line (bulk mode)"
+    )
+    parser.add_argument(
+        "--out-dir", default=None,
+        help="Bulk mode: folder for annotated images, mirroring the input layout (default: output/)"
+    )
+    parser.add_argument(
+        "--detections", default=None, metavar="PATH",
+        help=f"Write boxes, classes and scores per image; format by extension: {', '.join(SINKS)} "
+             f"(bulk mode default: <out-dir>/detections.jsonl)"
+    )
+    parser.add_argument(
+        "--no-render", action="store_true",
+        help="Skip drawing and the annotated images, only write detections (much faster)"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Bulk mode: skip images already done by a previous run (.jsonl / .csv detections)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=16, help="Bulk mode: images per inference call"
+    )
+    parser.add_argument(
+        "--io-threads", type=int, default=min(8, os.cpu_count() or 1),
+        help="Bulk mode: threads decoding and writing images"
+    )
+    args = parser.parse_args()
+    if not args.inputs and not args.list:
+        parser.error("give at least one image, directory or glob, or --list")
+    return args
 
-def main():
-    args = parse_args()
+def collect_images(inputs, list_file=None):
+    """
+    Expands files, directories (recursively, by IMAGE_EXTENSIONS) and glob patterns.
+    Returns:
+        sorted list of unique image paths
+    """
+    if list_file:
+        with open(list_file) as f:
+            inputs = list(inputs) + [line.strip() for line in f if line.strip()]
 
-    # check input file
-    if not os.path.exists(args.image_path):
-        print(f"Error: File {args.image_path} not found.")
-        return
+    paths = set()
+    for spec in inputs:
+        if os.path.isdir(spec):
+            for root, _, files in os.walk(spec):
+                paths.update(os.path.join(root, name) for name in files
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+        elif os.path.isfile(spec):
+            paths.add(spec)
+        else:
+            matches = glob.glob(spec, recursive=True)
+            if not matches:
+                print(f"Warning: {spec} matched no files")
+            paths.update(path for path in matches if os.path.isfile(path))
+    return sorted(paths)
+
+def checkpoint_path(detections_path):
+    return detections_path + ".checkpoint"
+
+def load_checkpoint(detections_path):
+    """
+    Reads the checkpoint kept next to a detections file: after every flush of the sink,
+    the images it covered are appended with the file size at that point. The detections
+    file is cut back to the last checkpointed size, so rows of images that a crash left
+    out of the checkpoint aren't duplicated when those images are redone.
+    Returns:
+        set of image paths already done
+    """
+    path = checkpoint_path(detections_path)
+    if not os.path.exists(path):
+        return set()
+    done, offset, valid_bytes = set(), 0, 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = json.loads(line)
+                done.update(entry["done"])
+                offset = entry["offset"]
+            except (ValueError, KeyError):
+                break
+            valid_bytes += len(line)
+    if valid_bytes < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+    if os.path.exists(detections_path) and os.path.getsize(detections_path) > offset:
+        with open(detections_path, "r+b") as f:
+            f.truncate(offset)
+    return done
 
-    print("Loading model...")
-    # Load the pre-trained YOLOv8 model (downloads if not present)
-    model = YOLO("yolov8n.pt")          # tiny model - fast for demo
+def decode_ahead(paths, pool, lookahead):
+    """
+    Decodes images on the thread pool, at most `lookahead` ahead of the consumer.
+    Yields:
+        (path, image or None if unreadable), in input order
+    """
+    pending = deque()
+    for path in paths:
+        pending.append((path, pool.submit(cv2.imread, path)))
+        if len(pending) >= lookahead:
+            path, future = pending.popleft()
+            yield path, future.result()
+    while pending:
+        path, future = pending.popleft()
+        yield path, future.result()
 
-    print(f"Processing {args.image_path}...")
+def detect_bulk(model, paths, root, out_dir, detections_path, conf, batch_size, io_threads, resume=False):
+    """
+    Runs detection over many images with one model: a thread pool decodes ahead, images
+    are grouped into inference batches, and annotated images plus their detections are
+    drawn and written by a second pool while the next batch is inferred.
+
+    An image's detections reach the sink only after its annotated image is on disk, and
+    the checkpoint (appendable formats) advances only when the sink has flushed them,
+    so resume=True redoes exactly the images whose output may be missing.
+    out_dir: None = detections only, nothing is drawn
+    Returns:
+        number of images processed in this run
+    """
+    done = load_checkpoint(detections_path) if resume else set()
+    todo = [path for path in paths if path not in done]
+    if done:
+        print(f"Resuming: {len(paths) - len(todo)} of {len(paths)} images already done")
+    if not todo:
+        return 0
+
+    lock = threading.Lock()
+    writes = deque()
+    completed = []   # Images written to the sink since its last flush
+
+    def on_flush(sink):
+        offset = sink.tell()
+        if offset is not None:
+            checkpoint.write(json.dumps({"offset": offset, "done": completed}) + "\n")
+            checkpoint.flush()
+        completed.clear()
+
+    checkpoint = open(checkpoint_path(detections_path), "a" if resume else "w")
+    # Sized in frames for .jsonl and boxes otherwise; a few batches keeps checkpoints frequent
+    detections = open_sink(detections_path, append=resume and os.path.exists(detections_path),
+                           buffer_rows=max(256, 4 * batch_size), on_flush=on_flush)
+
+    def write(path, result):
+        if result is not None and out_dir is not None:
+            # Drawing runs here too; every image owns its buffer, so nothing is overwritten meanwhile
+            target = os.path.join(out_dir, os.path.relpath(path, root))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if not cv2.imwrite(target, result.plot()):
+                raise IOError(f"Failed to write {target}")
+        with lock:
+            completed.append(path)
+            if result is not None:
+                detections.write(result, image=path)
+
+    processed = 0
+    start = last_report = time.perf_counter()
+    decoder = ThreadPoolExecutor(io_threads, thread_name_prefix="decode")
+    writer = ThreadPoolExecutor(io_threads, thread_name_prefix="write")
+    try:
+        batch = []
+        stream = decode_ahead(todo, decoder, lookahead=2 * batch_size)
+        while True:
+            item = next(stream, None)
+            if item is not None:
+                path, image = item
+                if image is None:
+                    print(f"Warning: cannot read {path}, skipping")
+                    writes.append(writer.submit(write, path, None))
+                else:
+                    batch.append(item)
+            if batch and (len(batch) == batch_size or item is None):
+                results = model([image for _, image in batch], conf=conf, verbose=False)
+                for (path, _), result in zip(batch, results):
+                    writes.append(writer.submit(write, path, result))
+                processed += len(batch)
+                batch = []
+
+                # Bound the annotated images waiting for the writers; surfaces write errors
+                while len(writes) > 2 * batch_size:
+                    writes.popleft().result()
+
+                now = time.perf_counter()
+                if now - last_report >= 5.0:
+                    print(f"{processed}/{len(todo)} images, {processed / (now - start):.1f} images/sec")
+                    last_report = now
+            if item is None:
+                break
+
+        while writes:
+            writes.popleft().result()
+    finally:
+        decoder.shutdown(cancel_futures=True)
+        writer.shutdown()
+        with lock:
+            detections.close()
+        checkpoint.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Processed {processed} images in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.1f} images/sec)")
+    return processed
+
+def detect_single(model, image_path, out, conf, detections_path=None):
+    """
+    out: annotated image path, None to skip drawing
+    detections_path: optional detections file (see detection_sinks.py)
+    """
+    print(f"Processing {image_path}...")
     # Read image (OpenCV loads BGR)
-    img = cv2.imread(args.image_path)
+    img = cv2.imread(image_path)
     if img is None:
-        raise FileNotFoundError(f"Cannot read {args.image_path}")
+        raise FileNotFoundError(f"Cannot read {image_path}")
 
     # Run inference - results is a list with one element per image
-    results = model(img, conf=args.conf)
+    results = model(img, conf=conf)
+
+    if detections_path:
+        with open_sink(detections_path) as sink:
+            sink.write(results[0], image=image_path)
+        print(f"Detections saved to {detections_path}")
+    if out is None:
+        return
 
     # Render bounding boxes onto the original image (in-place)
     # .plot() returns a BGR numpy array
     annotated = results[0].plot()
 
     # Save output
-    cv2.imwrite(args.out, annotated)
-    print(f"Success! Annotated image saved to {args.out}")
+    cv2.imwrite(out, annotated)
+    print(f"Success! Annotated image saved to {out}")
+
+def main():
+    args = parse_args()
+
+    spec = args.inputs[0] if args.inputs else ""
+    bulk = args.list or args.out_dir or len(args.inputs) > 1 or os.path.isdir(spec) or any(c in spec for c in "*?[")
+    if not bulk:
+        # check input file
+        if not os.path.exists(spec):
+            print(f"Error: File {spec} not found.")
+            return
+        if args.no_render and not args.detections:
+            print("Error: --no-render needs --detections for a single image.")
+            return
+
+        print("Loading model...")
+        # Load the pre-trained YOLOv8 model (downloads if not present)
+        model = YOLO("yolov8n.pt")          # tiny model - fast for demo
+        detect_single(model, args.inputs[0], None if args.no_render else args.out, args.conf, args.detections)
+        return
+
+    paths = collect_images(args.inputs, args.list)
+    if not paths:
+        print("Error: no images found.")
+        return
+    out_dir = args.out_dir or "output"
+    detections_path = args.detections or os.path.join(out_dir, "detections.jsonl")
+    sink_class = SINKS.get(os.path.splitext(detections_path)[1].lower())
+    if sink_class is None:
+        print(f"Error: unknown detections format {detections_path}, expected one of {', '.join(SINKS)}.")
+        return
+    if args.resume and not sink_class.appendable:
+        print(f"Error: --resume needs .jsonl or .csv detections, {detections_path} can't be appended to.")
+        return
+    if not args.no_render:
+        os.makedirs(out_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.abspath(detections_path)), exist_ok=True)
+    # Annotated images keep their paths relative to the inputs' common folder
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    paths = [os.path.abspath(path) for path in paths]
+
+    print(f"Found {len(paths)} images. Loading model...")
+    model = YOLO("yolov8n.pt")
+    detect_bulk(model, paths, root, None if args.no_render else out_dir, detections_path, args.conf,
+                args.batch_size, args.io_threads, resume=args.resume)
+    print("Done! " + ("" if args.no_render else f"Annotated images in {out_dir}, ")
+          + f"detections in {detections_path}")
 
 if __name__ == "__main__":
     main()
@@ -7,12 +7,37 @@ Usage:
 
 Example:
     python scripts/detect_video.py data/sample.mp4 --out output.mp4
+
+Batched inference (decodes N frames, runs YOLOv8 once per batch):
+    python scripts/detect_video.py data/sample.mp4 --batch-size 8
+
+Headless server run, decoding and encoding on their own threads:
+    python scripts/detect_video.py data/sample.mp4 --pipelined --batch-size 8 --no-preview
+
+Long recordings, split across 4 worker processes (with per-frame detections as JSON Lines):
+    python scripts/detect_video.py data/long.mp4 --workers 4 --detections detections.jsonl
+
+Detections only, no annotated video (bulk analytics):
+    python scripts/detect_video.py data/long.mp4 --batch-size 8 --detections detections.parquet --no-render
 """
 
 import argparse
 import cv2
+import multiprocessing
+import numpy as np
 import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
 from ultralytics import YOLO
+from ultralytics.utils.downloads import attempt_download_asset
+
+from detection_sinks import open_sink, concat_files, SINKS
+
+MODEL_WEIGHTS = "yolov8n.pt"
 
 def parse_args():
     parser = argparse.ArgumentParser(description="YOLOv8 video detection")
@@ -23,57 +48,495 @@ def parse_args():
     parser.add_argument(
         "--conf", type=float, default=0.25, help="Confidence threshold (0-1)"
     )
+    parser.add_argument(
+        "--batch-size", type=int, default=1,
+        help="Frames per inference call (1 = one call per frame)"
+    )
+    parser.add_argument(
+        "--max-frames", type=int, default=0, help="Stop after this many frames (0 = whole video)"
+    )
+    parser.add_argument(
+        "--pipelined", action="store_true",
+        help="Decode, infer and render/encode on separate threads connected by bounded queues"
+    )
+    parser.add_argument(
+        "--no-preview", action="store_true", help="Don't open a preview window (headless servers)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Split the video into this many segments, each processed by its own process"
+    )
+    parser.add_argument(
+        "--detections", default=None, metavar="PATH",
+        help=f"Also write per-frame detections (boxes, classes, scores, timestamps); "
+             f"format by extension: {', '.join(SINKS)}"
+    )
+    parser.add_argument(
+        "--no-render", action="store_true",
+        help="Skip drawing and the annotated video, only write --detections (much faster)"
+    )
     return parser.parse_args()
 
-def main():
-    args = parse_args()
-    
-    if not os.path.exists(args.source):
-        print(f"Error: File {args.source} not found.")
-        return
-
-    print("Loading model...")
-    model = YOLO("yolov8n.pt")
-
-    print(f"Opening video {args.source}...")
-    # Open video source
-    cap = cv2.VideoCapture(args.source)
+def open_video(path):
+    """
+    Opens a video file.
+    Returns:
+        cap: cv2.VideoCapture
+        width, height: frame size in pixels
+        fps: frame rate (30 if the file doesn't say)
+    """
+    cap = cv2.VideoCapture(path)
     if not cap.isOpened():
         raise RuntimeError("Failed to open video source")
 
-    # Get video properties for writer
     width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     fps    = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    return cap, width, height, fps
 
-    # Define codec and create VideoWriter
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    out_writer = cv2.VideoWriter(args.out, fourcc, fps, (width, height))
+def seek(cap, frame):
+    """
+    Positions cap so the next read() returns frame number `frame`. Falls back to
+    decoding forward from the start when the backend can't seek exactly.
+    """
+    if frame == 0:
+        return
+    if cap.set(cv2.CAP_PROP_POS_FRAMES, frame) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame:
+        return
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    for _ in range(frame):
+        if not cap.grab():
+            break
+
+def read_batch(cap, batch):
+    """
+    Decodes up to len(batch) frames straight into the preallocated batch buffer.
+    batch: (N, H, W, 3) uint8 array (or a leading slice of one)
+    Returns:
+        number of frames read (less than N at the end of the video)
+    """
+    count = 0
+    while count < len(batch):
+        slot = batch[count]
+        ret, frame = cap.read(slot)
+        if not ret:
+            break
+        if frame is not slot:
+            # The decoder allocated its own buffer (e.g. odd-sized frames)
+            slot[...] = frame
+        count += 1
+    return count
+
+def show_preview(annotated):
+    """
+    Shows a frame in the preview window.
+    Returns False when the user pressed 'q'.
+    """
+    cv2.imshow("YOLOv8 Video Detection", annotated)
+    if cv2.waitKey(1) & 0xFF == ord("q"):
+        print("Stopping early...")
+        return False
+    return True
 
-    print("Processing video frames... Press 'q' to stop early.")
-    
-    while True:
+def detect_per_frame(model, cap, out_writer, conf, preview=True, max_frames=0, verbose=True, detections=None):
+    """
+    One inference call per frame.
+    out_writer: cv2.VideoWriter for annotated frames, None to skip drawing (and the preview)
+    detections: optional DetectionSink (see detection_sinks.py)
+    Returns:
+        number of frames processed
+    """
+    frames = 0
+    while not max_frames or frames < max_frames:
         ret, frame = cap.read()
         if not ret:
             break # End of video
 
         # YOLO inference
         # persist=True helps if tracking is needed, but for simple detection simple call is fine
-        results = model(frame, conf=args.conf)
-        annotated = results[0].plot()
+        results = model(frame, conf=conf, verbose=verbose)
+        if detections is not None:
+            detections.write(results[0], frame=frames)
+        frames += 1
+        if out_writer is None:
+            continue
 
+        annotated = results[0].plot()
         out_writer.write(annotated)
 
         # Optional: show live preview
-        cv2.imshow("YOLOv8 Video Detection", annotated)
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            print("Stopping early...")
+        if preview and not show_preview(annotated):
             break
+    return frames
 
-    cap.release()
+def detect_batched(model, cap, out_writer, conf, batch_size, width, height, preview=True, max_frames=0,
+                   detections=None):
+    """
+    Decodes batch_size frames into one reused buffer and runs YOLOv8 on all of them
+    in a single call, so preprocessing, the forward pass and NMS are paid once per batch.
+    Annotated frames are written in decode order (out_writer None = detections only).
+    Returns:
+        number of frames processed
+    """
+    batch = np.empty((batch_size, height, width, 3), dtype=np.uint8)
+    frames = 0
+    while not max_frames or frames < max_frames:
+        limit = batch_size if not max_frames else min(batch_size, max_frames - frames)
+        count = read_batch(cap, batch[:limit])
+        if count == 0:
+            break
+
+        # A list of frames is one batched forward pass; results come back in the same order
+        results = model(list(batch[:count]), conf=conf, verbose=False)
+        for result in results:
+            if detections is not None:
+                detections.write(result, frame=frames)
+            frames += 1
+            if out_writer is None:
+                continue
+            # plot() draws on a copy, so the batch buffer can be refilled afterwards
+            annotated = result.plot()
+            out_writer.write(annotated)
+            if preview and not show_preview(annotated):
+                return frames
+
+        if count < limit:
+            break # End of video
+    return frames
+
+# Batches waiting between two pipeline stages
+QUEUE_SIZE = 2
+
+def _put(q, item, stop):
+    """
+    Blocking put that gives up once the pipeline is stopping.
+    """
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _get(q, stop):
+    """
+    Blocking get; returns None (end of stream) once the pipeline is stopping.
+    """
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return None
+
+def detect_pipelined(model, cap, out_writer, conf, batch_size, width, height, preview=True, max_frames=0,
+                     detections=None, queue_size=QUEUE_SIZE):
+    """
+    Producer-consumer version of detect_batched: a decoder thread, an inference thread
+    and a render/encode thread, connected by bounded queues. Decode and encode then
+    overlap with inference instead of adding to it.
+
+    Frames are decoded into a fixed pool of batch buffers; a buffer goes back to the
+    pool once its frames are plotted, which also bounds memory. Every batch carries the
+    sequence number of its first frame and the encoder writes strictly in that order.
+    The preview (if any) runs on the calling thread and shows the newest frame.
+    Returns:
+        number of frames written
+    """
+    # When every buffer is in flight the decoder waits: that is the backpressure
+    pool = queue.Queue()
+    for _ in range(queue_size + 2):
+        pool.put(np.empty((batch_size, height, width, 3), dtype=np.uint8))
+    decoded = queue.Queue(maxsize=queue_size)    # (seq, count, buffer)
+    inferred = queue.Queue(maxsize=queue_size)   # (seq, results, buffer)
+    previews = queue.Queue(maxsize=1)            # Newest annotated frame for the preview window
+    stop = threading.Event()
+    errors = []
+    busy = {"decode": 0.0, "inference": 0.0, "render/encode": 0.0}   # Seconds each stage spent working
+    written = [0]
+
+    def decode():
+        seq = 0
+        while not max_frames or seq < max_frames:
+            buffer = _get(pool, stop)
+            if buffer is None:
+                return
+            limit = batch_size if not max_frames else min(batch_size, max_frames - seq)
+            start = time.perf_counter()
+            count = read_batch(cap, buffer[:limit])
+            busy["decode"] += time.perf_counter() - start
+            if count == 0:
+                break
+            if not _put(decoded, (seq, count, buffer), stop):
+                return
+            seq += count
+            if count < limit:
+                break # End of video
+        _put(decoded, None, stop)
+
+    def infer():
+        while True:
+            item = _get(decoded, stop)
+            if item is None:
+                break
+            seq, count, buffer = item
+            start = time.perf_counter()
+            results = model(list(buffer[:count]), conf=conf, verbose=False)
+            busy["inference"] += time.perf_counter() - start
+            if not _put(inferred, (seq, results, buffer), stop):
+                return
+        _put(inferred, None, stop)
+
+    def encode():
+        next_seq, held = 0, {}
+        while True:
+            item = _get(inferred, stop)
+            if item is None:
+                return
+            held[item[0]] = item
+            while next_seq in held:
+                seq, results, buffer = held.pop(next_seq)
+                start = time.perf_counter()
+                for i, result in enumerate(results):
+                    if detections is not None:
+                        detections.write(result, frame=seq + i)
+                    if out_writer is None:
+                        continue
+                    annotated = result.plot()
+                    out_writer.write(annotated)
+                    if preview:
+                        try:
+                            previews.put_nowait(annotated)
+                        except queue.Full:
+                            pass # The window is behind; it only needs the newest frame
+                busy["render/encode"] += time.perf_counter() - start
+                pool.put(buffer) # Plotted, so its frames may be overwritten
+                next_seq += len(results)
+                written[0] = next_seq
+
+    def run(body):
+        try:
+            body()
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    threads = [threading.Thread(target=run, args=(body,), name=f"video-{body.__name__}", daemon=True)
+               for body in (decode, infer, encode)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while threads[-1].is_alive():
+            if not preview:
+                threads[-1].join(timeout=0.5)
+                continue
+            try:
+                annotated = previews.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if not show_preview(annotated):
+                break
+    except KeyboardInterrupt:
+        print("Stopping early...")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    print("Stage busy time: " + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in busy.items()))
+    return written[0]
+
+def split_segments(total, workers):
+    """
+    Splits frames [0, total) into up to `workers` contiguous ranges of near-equal length.
+    Returns:
+        list of (start, stop) frame indices
+    """
+    bounds = [total * i // workers for i in range(workers + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(workers) if bounds[i] < bounds[i + 1]]
+
+def _detect_segment(job):
+    """
+    Worker process: loads the model once and processes frames [start, stop) of the video
+    into its own segment files. stop None = to the end of the video; out_path None = no video.
+    weights: local path of the model weights (resolved by the parent)
+    Returns:
+        number of frames processed
+    """
+    source, start, stop, out_path, detections_path, conf, batch_size, threads, weights = job
+    import torch
+    # Cores are shared between the workers instead of every process spinning up all of them
+    torch.set_num_threads(threads)
+    model = YOLO(weights)
+
+    cap, width, height, fps = open_video(source)
+    seek(cap, start)
+    out_writer = None
+    if out_path:
+        out_writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    detections = open_sink(detections_path, fps=fps, first_frame=start) if detections_path else None
+    try:
+        max_frames = 0 if stop is None else stop - start
+        return detect_batched(model, cap, out_writer, conf, batch_size, width, height,
+                              preview=False, max_frames=max_frames, detections=detections)
+    finally:
+        cap.release()
+        if out_writer is not None:
+            out_writer.release()
+        if detections is not None:
+            detections.close()
+
+def stitch_videos(paths, out_path, fps, size):
+    """
+    Joins segment videos in order. Uses ffmpeg's concat demuxer without re-encoding
+    when ffmpeg is installed, else re-encodes through cv2.VideoWriter.
+    """
+    if shutil.which("ffmpeg"):
+        list_path = out_path + ".segments.txt"
+        with open(list_path, "w") as f:
+            f.writelines(f"file '{os.path.abspath(path)}'\n" for path in paths)
+        try:
+            subprocess.run(["ffmpeg", "-v", "error", "-y", "-f", "concat", "-safe", "0", "-i", list_path,
+                            "-c", "copy", out_path], check=True)
+        finally:
+            os.remove(list_path)
+        return
+
+    out_writer = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for path in paths:
+        cap = cv2.VideoCapture(path)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            out_writer.write(frame)
+        cap.release()
     out_writer.release()
-    cv2.destroyAllWindows()
-    print(f"Done! Annotated video saved to {args.out}")
+
+def detect_sharded(source, out_path, conf, batch_size, workers, max_frames=0, detections_path=None):
+    """
+    Splits the video into `workers` segments by frame index and processes each in its
+    own process (one model load per worker), then stitches the annotated segments and
+    detection records back together in frame order. out_path None = detections only.
+    Returns:
+        number of frames processed
+    """
+    cap, width, height, fps = open_video(source)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    if total <= 0:
+        raise RuntimeError("Video frame count unknown, can't split it into segments")
+    if max_frames:
+        total = min(total, max_frames)
+
+    segments = split_segments(total, workers)
+    if not max_frames:
+        # The container's frame count can be an estimate: the last worker reads to the end
+        segments[-1] = (segments[-1][0], None)
+    threads = max(1, (os.cpu_count() or 1) // len(segments))
+    # Download the weights here once; workers started together would each fetch them
+    weights = str(attempt_download_asset(MODEL_WEIGHTS))
+
+    # Segments go next to the output, which is usually on a disk with room for them
+    extension = os.path.splitext(detections_path or "")[1]
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(out_path or detections_path))) as tmp:
+        jobs = [(source, start, stop, os.path.join(tmp, f"segment{i}.mp4") if out_path else None,
+                 os.path.join(tmp, f"segment{i}{extension}") if detections_path else None,
+                 conf, batch_size, threads, weights)
+                for i, (start, stop) in enumerate(segments)]
+
+        # spawn: torch doesn't survive fork() once its thread pools exist
+        counts = []
+        with multiprocessing.get_context("spawn").Pool(len(jobs)) as pool:
+            for i, count in enumerate(pool.imap(_detect_segment, jobs)):
+                start, stop = segments[i]
+                if stop is not None and count < stop - start:
+                    print(f"Warning: segment {i + 1} ended after {count} of {stop - start} frames")
+                print(f"Segment {i + 1}/{len(jobs)} done: frames {start}-{start + count - 1}")
+                counts.append(count)
+
+        print("Stitching segments...")
+        if out_path:
+            stitch_videos([job[3] for job in jobs], out_path, fps, (width, height))
+        if detections_path:
+            concat_files([job[4] for job in jobs], detections_path)
+    return sum(counts)
+
+def describe_outputs(out_path, detections_path):
+    outputs = []
+    if out_path:
+        outputs.append(f"Annotated video saved to {out_path}")
+    if detections_path:
+        outputs.append(f"detections saved to {detections_path}")
+    return ", ".join(outputs)
+
+def main():
+    args = parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"Error: File {args.source} not found.")
+        return
+    if args.batch_size < 1:
+        print("Error: --batch-size must be at least 1.")
+        return
+    if args.no_render and not args.detections:
+        print("Error: --no-render needs --detections, otherwise nothing is written.")
+        return
+    out_path = None if args.no_render else args.out
+
+    if args.workers > 1:
+        print(f"Processing {args.source} with {args.workers} worker processes...")
+        start = time.perf_counter()
+        frames = detect_sharded(args.source, out_path, args.conf, args.batch_size, args.workers,
+                                max_frames=args.max_frames, detections_path=args.detections)
+        elapsed = time.perf_counter() - start
+        print(f"Processed {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.1f} frames/sec, "
+              f"{args.workers} workers)")
+        print(f"Done! {describe_outputs(out_path, args.detections)}")
+        return
+
+    print("Loading model...")
+    model = YOLO(MODEL_WEIGHTS)
+
+    print(f"Opening video {args.source}...")
+    cap, width, height, fps = open_video(args.source)
+
+    # Define codec and create VideoWriter
+    out_writer = None
+    if out_path:
+        fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+        out_writer = cv2.VideoWriter(out_path, fourcc, fps, (width, height))
+    detections = open_sink(args.detections, fps=fps) if args.detections else None
+
+    preview = not args.no_preview and not args.no_render
+    print("Processing video frames..." + (" Press 'q' to stop early." if preview else ""))
+    start = time.perf_counter()
+
+    if args.pipelined:
+        frames = detect_pipelined(model, cap, out_writer, args.conf, args.batch_size, width, height,
+                                  preview=preview, max_frames=args.max_frames, detections=detections)
+    elif args.batch_size > 1:
+        frames = detect_batched(model, cap, out_writer, args.conf, args.batch_size, width, height,
+                                preview=preview, max_frames=args.max_frames, detections=detections)
+    else:
+        frames = detect_per_frame(model, cap, out_writer, args.conf, preview=preview, max_frames=args.max_frames,
+                                  detections=detections)
+
+    elapsed = time.perf_counter() - start
+    cap.release()
+    if out_writer is not None:
+        out_writer.release()
+    if detections is not None:
+        detections.close()
+    if preview:
+        cv2.destroyAllWindows()
+    print(f"Processed {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.1f} frames/sec, "
+          f"batch size {args.batch_size}{', pipelined' if args.pipelined else ''})")
+    print(f"Done! {describe_outputs(out_path, args.detections)}")
 
 if __name__ == "__main__":
     main()
@@ -3,7 +3,10 @@
 Real-time object detection from webcam using YOLOv8.
 
 Usage:
-    python scripts/detect_webcam.py
+    python scripts/detect_webcam.py [--conf 0.25] [--detections detections.jsonl] [--no-render]
+
+Example (log detections without a window, stop with Ctrl+C):
+    python scripts/detect_webcam.py --detections webcam.csv --no-render
 """
 import torch
 from ultralytics.nn.tasks import DetectionModel
@@ -11,43 +14,89 @@ from ultralytics.nn.tasks import DetectionModel
 torch.serialization.add_safe_globals([DetectionModel])
 
 from ultralytics import YOLO
+import argparse
 import cv2
+import time
+
+from detection_sinks import open_sink, SINKS
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="YOLOv8 webcam detection")
+    parser.add_argument(
+        "--camera", type=int, default=0, help="Camera index (0 = default webcam)"
+    )
+    parser.add_argument(
+        "--conf", type=float, default=0.25, help="Confidence threshold (0-1)"
+    )
+    parser.add_argument(
+        "--detections", default=None, metavar="PATH",
+        help=f"Also write boxes, classes, scores and timestamps per frame; format by extension: {', '.join(SINKS)}"
+    )
+    parser.add_argument(
+        "--no-render", action="store_true",
+        help="No window and no drawing, only write detections (requires --detections)"
+    )
+    parser.add_argument(
+        "--max-frames", type=int, default=None, help="Stop after this many frames"
+    )
+    args = parser.parse_args()
+    if args.no_render and not args.detections:
+        parser.error("--no-render requires --detections")
+    return args
+
 def main():
+    args = parse_args()
+
     print("Loading model...")
     model = YOLO("yolov8n.pt")
     
     print("Opening webcam...")
-    cap = cv2.VideoCapture(0)  # 0 = default webcam
+    cap = cv2.VideoCapture(args.camera)
     if not cap.isOpened():
         print("Error: Could not open webcam.")
         return
 
-    print("Webcam started. Press 'ESC' to exit.")
+    # Timestamps are seconds since the webcam started, the camera's frame rate isn't reliable
+    detections = open_sink(args.detections) if args.detections else None
+    print("Webcam started. Press " + ("Ctrl+C" if args.no_render else "'ESC'") + " to exit.")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Failed to grab frame")
-            break
+    start = time.perf_counter()
+    index = 0
+    try:
+        while args.max_frames is None or index < args.max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                print("Failed to grab frame")
+                break
 
-        # Inference
-        results = model(frame, conf=0.25)
-        
-        # Visualize
-        annotated = results[0].plot()
+            # Inference
+            results = model(frame, conf=args.conf, verbose=not args.no_render)
+            if detections is not None:
+                detections.write(results[0], frame=index, timestamp=time.perf_counter() - start)
+            index += 1
+            if args.no_render:
+                continue
 
-        cv2.imshow("YOLOv8 Real-Time Detection", annotated)
+            # Visualize
+            annotated = results[0].plot()
 
-        # Press ESC to exit
-        if cv2.waitKey(1) == 27:
-            result_str = "Exiting..."
-            print(result_str)
-            break
+            cv2.imshow("YOLOv8 Real-Time Detection", annotated)
 
-    cap.release()
-    cv2.destroyAllWindows()
+            # Press ESC to exit
+            if cv2.waitKey(1) == 27:
+                result_str = "Exiting..."
+                print(result_str)
+                break
+    except KeyboardInterrupt:
+        print("Exiting...")
+    finally:
+        cap.release()
+        if not args.no_render:
+            cv2.destroyAllWindows()
+        if detections is not None:
+            detections.close()
+            print(f"{detections.frames} frames, {detections.rows} detections saved to {args.detections}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,308 @@
+"""
+Streaming detection output for the detection scripts and the Streamlit UI.
+
+A sink takes ultralytics Results one frame (or image) at a time and writes them as:
+    .jsonl            one JSON object per frame / image: boxes, classes and scores as lists
+    .csv              one row per box (see COLUMNS)
+    .parquet          one row per box, written as row groups (needs pyarrow)
+    .arrow, .feather  one row per box, Arrow IPC file (needs pyarrow)
+
+Rows are buffered and written every `buffer_rows` rows, so memory stays bounded however
+long the video or image folder is.
+
+Example:
+    sink = open_sink("detections.parquet", fps=30.0)
+    for index, result in enumerate(model(frames, stream=True)):
+        sink.write(result, frame=index)
+    sink.close()
+"""
+
+import csv
+import json
+import os
+import shutil
+import numpy as np
+
+DEFAULT_BUFFER_ROWS = 4096
+
+# Columns of the row-per-box formats; frame/timestamp are empty for images, image for video
+COLUMNS = ("frame", "image", "timestamp", "class_id", "class", "score", "x1", "y1", "x2", "y2")
+
+def result_arrays(result):
+    """
+    Boxes of one ultralytics Results as NumPy arrays.
+    Returns:
+        xyxy (N, 4) float64 pixels, class ids (N,) int64, scores (N,) float64
+    """
+    boxes = result.boxes
+    return (boxes.xyxy.cpu().numpy().astype(np.float64),
+            boxes.cls.cpu().numpy().astype(np.int64),
+            boxes.conf.cpu().numpy().astype(np.float64))
+
+def detection_rows(result, frame=None, image=None, timestamp=None):
+    """
+    One dict per box with the COLUMNS keys (for tables, e.g. the Streamlit UI).
+    """
+    xyxy, class_ids, scores = result_arrays(result)
+    return [
+        {"frame": frame, "image": image, "timestamp": timestamp, "class_id": int(c),
+         "class": result.names[int(c)], "score": round(float(s), 4),
+         "x1": round(float(b[0]), 1), "y1": round(float(b[1]), 1),
+         "x2": round(float(b[2]), 1), "y2": round(float(b[3]), 1)}
+        for b, c, s in zip(xyxy, class_ids, scores)
+    ]
+
+
+class DetectionSink:
+    """
+    Base class: buffering, frame numbering and timestamps. Subclasses implement
+    _add (buffer one frame), _flush (write the buffer) and _close.
+    """
+    # True if the file can be reopened and appended to (resuming a crashed run)
+    appendable = False
+
+    def __init__(self, path, fps=None, first_frame=0, buffer_rows=DEFAULT_BUFFER_ROWS, append=False, on_flush=None):
+        """
+        path: output file
+        fps: frame rate, turns frame numbers into timestamps (None = no timestamps unless given)
+        first_frame: added to every frame number (segments of a longer video)
+        buffer_rows: rows held in memory before they are written
+        append: continue an existing file instead of replacing it (appendable formats only)
+        on_flush: called with the sink after each write of buffered rows
+        """
+        if append and not self.appendable:
+            raise ValueError(f"{path}: {type(self).__name__} files can't be appended to")
+        self.path = path
+        self.fps = fps
+        self.first_frame = first_frame
+        self.buffer_rows = buffer_rows
+        self.on_flush = on_flush
+        self.frames = 0     # Frames / images written
+        self.rows = 0       # Boxes written
+        self._buffered = 0
+
+    def write(self, result, frame=None, image=None, timestamp=None):
+        """
+        Adds the detections of one frame or image.
+        result: ultralytics Results
+        frame: frame number (relative to first_frame), for video
+        image: source path, for images
+        timestamp: seconds; defaults to frame / fps
+        """
+        if frame is not None:
+            frame += self.first_frame
+            if timestamp is None and self.fps:
+                timestamp = frame / self.fps
+        if timestamp is not None:
+            timestamp = round(timestamp, 3)
+        xyxy, class_ids, scores = result_arrays(result)
+        self._buffered += self._add(frame, image, timestamp, xyxy, class_ids, scores, result.names)
+        self.frames += 1
+        self.rows += len(scores)
+        if self._buffered >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes buffered rows, then calls on_flush.
+        """
+        if self._buffered:
+            self._flush()
+            self._buffered = 0
+        if self.on_flush is not None:
+            self.on_flush(self)
+
+    def tell(self):
+        """
+        Bytes of the file known to be complete (appendable formats), None otherwise.
+        """
+        return None
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _TextSink(DetectionSink):
+    appendable = True
+
+    def __init__(self, path, append=False, **kwargs):
+        super().__init__(path, append=append, **kwargs)
+        self.file = open(path, "a" if append else "w", newline="")
+
+    def tell(self):
+        return self.file.tell()
+
+    def _close(self):
+        self.file.close()
+
+
+class JsonlSink(_TextSink):
+    """
+    One JSON object per frame / image, including frames without detections.
+    """
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self._lines = []
+
+    def _add(self, frame, image, timestamp, xyxy, class_ids, scores, names):
+        record = {}
+        if image is not None:
+            record["image"] = image
+        if frame is not None:
+            record["frame"] = frame
+        if timestamp is not None:
+            record["timestamp"] = timestamp
+        record["boxes"] = np.round(xyxy, 1).tolist()
+        record["classes"] = [names[int(c)] for c in class_ids]
+        record["scores"] = np.round(scores, 4).tolist()
+        self._lines.append(json.dumps(record) + "\n")
+        return 1
+
+    def _flush(self):
+        self.file.write("".join(self._lines))
+        self.file.flush()
+        self._lines = []
+
+
+class CsvSink(_TextSink):
+    """
+    One row per box with a COLUMNS header.
+    """
+    def __init__(self, path, append=False, **kwargs):
+        continuing = append and os.path.exists(path) and os.path.getsize(path) > 0
+        super().__init__(path, append=append, **kwargs)
+        self._writer = csv.writer(self.file)
+        self._rows = []
+        if not continuing:
+            self._writer.writerow(COLUMNS)
+
+    def _add(self, frame, image, timestamp, xyxy, class_ids, scores, names):
+        for box, class_id, score in zip(np.round(xyxy, 1).tolist(), class_ids.tolist(), np.round(scores, 4).tolist()):
+            self._rows.append((frame, image, timestamp, class_id, names[class_id], score, *box))
+        return len(scores)
+
+    def _flush(self):
+        self._writer.writerows(self._rows)
+        self.file.flush()
+        self._rows = []
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet / Arrow output needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+def arrow_schema(pa):
+    return pa.schema([
+        ("frame", pa.int64()), ("image", pa.string()), ("timestamp", pa.float64()),
+        ("class_id", pa.int32()), ("class", pa.string()), ("score", pa.float32()),
+        ("x1", pa.float32()), ("y1", pa.float32()), ("x2", pa.float32()), ("y2", pa.float32()),
+    ])
+
+
+class _ArrowSink(DetectionSink):
+    """
+    One row per box, buffered as columns and written one record batch at a time.
+    """
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.pa = _pyarrow()
+        self.schema = arrow_schema(self.pa)
+        self._columns = {name: [] for name in COLUMNS}
+        self._writer = self._open_writer()
+
+    def _add(self, frame, image, timestamp, xyxy, class_ids, scores, names):
+        count = len(scores)
+        columns = self._columns
+        columns["frame"].extend([frame] * count)
+        columns["image"].extend([image] * count)
+        columns["timestamp"].extend([timestamp] * count)
+        columns["class_id"].extend(class_ids.tolist())
+        columns["class"].extend(names[int(c)] for c in class_ids)
+        columns["score"].extend(scores.tolist())
+        for i, name in enumerate(("x1", "y1", "x2", "y2")):
+            columns[name].extend(xyxy[:, i].tolist())
+        return count
+
+    def _flush(self):
+        table = self.pa.table(self._columns, schema=self.schema)
+        self._writer.write_table(table)
+        self._columns = {name: [] for name in COLUMNS}
+
+    def _close(self):
+        self._writer.close()
+
+
+class ParquetSink(_ArrowSink):
+    """
+    Parquet file; every flush becomes one row group.
+    """
+    def _open_writer(self):
+        return self.pa.parquet.ParquetWriter(self.path, self.schema)
+
+
+class ArrowSink(_ArrowSink):
+    """
+    Arrow IPC (Feather v2) file.
+    """
+    def _open_writer(self):
+        return self.pa.ipc.new_file(self.path, self.schema)
+
+
+SINKS = {
+    ".jsonl": JsonlSink,
+    ".csv": CsvSink,
+    ".parquet": ParquetSink,
+    ".arrow": ArrowSink,
+    ".feather": ArrowSink,
+}
+
+def open_sink(path, **kwargs):
+    """
+    Opens the sink matching the file extension (see SINKS); kwargs go to DetectionSink.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"{path}: unknown detections format, expected one of {sorted(SINKS)}")
+    return SINKS[extension](path, **kwargs)
+
+def concat_files(paths, out_path):
+    """
+    Joins sink files of the same format in order (segments of a sharded run).
+    Parquet / Arrow are copied batch by batch, so memory stays bounded.
+    """
+    extension = os.path.splitext(out_path)[1].lower()
+    if extension in (".parquet", ".arrow", ".feather"):
+        pa = _pyarrow()
+        schema = arrow_schema(pa)
+        if extension == ".parquet":
+            writer = pa.parquet.ParquetWriter(out_path, schema)
+            for path in paths:
+                for batch in pa.parquet.ParquetFile(path).iter_batches():
+                    writer.write_table(pa.Table.from_batches([batch], schema=schema))
+        else:
+            writer = pa.ipc.new_file(out_path, schema)
+            for path in paths:
+                with pa.ipc.open_file(path) as reader:
+                    for i in range(reader.num_record_batches):
+                        writer.write_batch(reader.get_batch(i))
+        writer.close()
+        return
+
+    with open(out_path, "w", newline="") as out:
+        for i, path in enumerate(paths):
+            with open(path, newline="") as segment:
+                if extension == ".csv" and i > 0:
+                    segment.readline()   # Header
+                shutil.copyfileobj(segment, out)
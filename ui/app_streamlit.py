@@ -1,11 +1,20 @@
 import streamlit as st
 import cv2
+import csv
+import io
+import json
 import numpy as np
 import tempfile
 import os
+import sys
 from ultralytics import YOLO
 from PIL import Image
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from detection_sinks import COLUMNS, CsvSink, JsonlSink, detection_rows
+
+PREVIEW_ROWS = 1000  # Video detections shown in the table; the downloads have all of them
+
 # -------------------------
 # Page Config & Styling
 # -------------------------
@@ -89,10 +98,31 @@ st.sidebar.info("YOLOv8 Object Detection System\n\nCollege Project Submission")
 # Helper Functions
 # -------------------------
 def process_frame(frame, conf):
-    """Run inference and draw boxes."""
+    """Run inference and draw boxes. Returns the annotated frame and the raw result."""
     results = model(frame, conf=conf)
     annotated_frame = results[0].plot()
-    return annotated_frame
+    return annotated_frame, results[0]
+
+def detection_downloads(rows, name):
+    """Table of detection rows (see scripts/detection_sinks.py) with CSV / JSON Lines downloads."""
+    st.dataframe(rows, use_container_width=True)
+    csv_file = io.StringIO()
+    writer = csv.DictWriter(csv_file, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(rows)
+    col1, col2 = st.columns(2)
+    col1.download_button("Download CSV", csv_file.getvalue(), f"{name}.csv", "text/csv")
+    col2.download_button("Download JSON Lines", "".join(json.dumps(row) + "\n" for row in rows),
+                         f"{name}.jsonl", "application/jsonl")
+
+def detection_file_downloads(preview, csv_path, jsonl_path, name):
+    """Table of the first detection rows, with the CSV / JSON Lines files written by the sinks as downloads."""
+    st.dataframe(preview, use_container_width=True)
+    col1, col2 = st.columns(2)
+    with open(csv_path, "rb") as f:
+        col1.download_button("Download CSV", f, f"{name}.csv", "text/csv")
+    with open(jsonl_path, "rb") as f:
+        col2.download_button("Download JSON Lines", f, f"{name}.jsonl", "application/jsonl")
 
 # -------------------------
 # Main App Logic
@@ -119,7 +149,7 @@ if mode == "Image Detection":
             # Convert RGB to BGR for OpenCV
             np_img = cv2.cvtColor(np_img, cv2.COLOR_RGB2BGR)
             
-            annotated_frame = process_frame(np_img, confidence)
+            annotated_frame, result = process_frame(np_img, confidence)
             
             # Convert back to RGB for display
             annotated_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
@@ -129,7 +159,8 @@ if mode == "Image Detection":
             
         # Optional: Show detection data
         with st.expander("See Detection Details"):
-            st.json(model(np_img, conf=confidence)[0].summary())
+            rows = detection_rows(result, image=uploaded_file.name)
+            detection_downloads(rows, os.path.splitext(uploaded_file.name)[0] + "_detections")
 
 elif mode == "Video Detection":
     st.write("#### 🎥 Upload a Video")
@@ -142,25 +173,46 @@ elif mode == "Video Detection":
         tfile.close()
         
         cap = cv2.VideoCapture(tfile.name)
+        fps = cap.get(cv2.CAP_PROP_FPS) or None
         
         st_frame = st.empty()
         
         stop_button = st.button("Stop Processing")
         
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret or stop_button:
-                break
-            
-            # Process
-            annotated_frame = process_frame(frame, confidence)
-            
-            # Display
-            annotated_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
-            st_frame.image(annotated_rgb, caption="Processing Video...", use_container_width=True, channels="RGB")
-        
-        cap.release()
-        os.remove(tfile.name)
+        # Detections stream to files as frames are processed; only a preview stays in memory
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "detections.csv")
+            jsonl_path = os.path.join(tmp, "detections.jsonl")
+            preview = []
+            frame_index = 0
+            with CsvSink(csv_path, fps=fps) as csv_sink, JsonlSink(jsonl_path, fps=fps) as jsonl_sink:
+                while cap.isOpened():
+                    ret, frame = cap.read()
+                    if not ret or stop_button:
+                        break
+
+                    # Process
+                    annotated_frame, result = process_frame(frame, confidence)
+                    csv_sink.write(result, frame=frame_index)
+                    jsonl_sink.write(result, frame=frame_index)
+                    if len(preview) < PREVIEW_ROWS:
+                        timestamp = round(frame_index / fps, 3) if fps else None
+                        rows = detection_rows(result, frame=frame_index, timestamp=timestamp)
+                        preview.extend(rows[:PREVIEW_ROWS - len(preview)])
+                    frame_index += 1
+
+                    # Display
+                    annotated_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
+                    st_frame.image(annotated_rgb, caption="Processing Video...", use_container_width=True, channels="RGB")
+
+            cap.release()
+            os.remove(tfile.name)
+
+            with st.expander(f"Detections ({csv_sink.rows} boxes in {frame_index} frames)"):
+                if csv_sink.rows > len(preview):
+                    st.caption(f"Showing the first {len(preview)} boxes; the downloads contain all of them.")
+                detection_file_downloads(preview, csv_path, jsonl_path,
+                                         os.path.splitext(uploaded_video.name)[0] + "_detections")
 
 elif mode == "Live Webcam":
     st.write("#### 🔴 Live Webcam Feed")
@@ -181,7 +233,7 @@ elif mode == "Live Webcam":
                     st.error("Failed to capture image")
                     break
                 
-                annotated_frame = process_frame(frame, confidence)
+                annotated_frame, _ = process_frame(frame, confidence)
                 
                 # Streamlit requires RGB
                 annotated_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)